@@ -0,0 +1,236 @@
+"""
+Activity log writer.
+
+``log_user_activity`` used to issue one INSERT per event on the request path.
+The writer below keeps that behaviour in ``sync`` mode (the default, and the
+mode tests rely on) and adds a ``buffered`` mode that queues events in-process
+and flushes them with ``bulk_create`` once ``ACTIVITY_LOG_BATCH_SIZE`` events
+are pending or ``ACTIVITY_LOG_FLUSH_INTERVAL`` seconds have passed.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DatabaseError, close_old_connections, transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import UserActivityLog
+from .rollups import record_logins
+
+logger = logging.getLogger(__name__)
+
+SYNC = "sync"
+BUFFERED = "buffered"
+MODES = (SYNC, BUFFERED)
+
+
+class ActivityLogWriter:
+    def __init__(self, mode=SYNC, batch_size=200, flush_interval=1.0,
+                 max_queue_size=10000):
+        if mode not in MODES:
+            raise ValueError(f"Unsupported activity log mode: {mode}")
+        self.mode = mode
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._worker = None
+        self._counters = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "delayed": 0,
+            "flushes": 0,
+        }
+        self._max_delay = 0.0
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            mode=getattr(settings, "ACTIVITY_LOG_MODE", SYNC),
+            batch_size=getattr(settings, "ACTIVITY_LOG_BATCH_SIZE", 200),
+            flush_interval=getattr(settings, "ACTIVITY_LOG_FLUSH_INTERVAL", 1.0),
+            max_queue_size=getattr(settings, "ACTIVITY_LOG_MAX_QUEUE_SIZE", 10000),
+        )
+
+    def log(self, user, activity_type, description, ip_address=None,
+            user_agent=""):
+        entry = self._entry(
+            user, activity_type, description, ip_address, user_agent)
+
+        if self.mode == SYNC or self._stopping.is_set():
+            entry.save()
+            self._count_written()
+            return
+
+        # Rows must not reach the queue before the surrounding transaction
+        # commits: a rolled back registration would otherwise leave the
+        # flush with a dangling user id.
+        transaction.on_commit(lambda: self._enqueue(entry))
+
+    async def alog(self, user, activity_type, description, ip_address=None,
+                   user_agent=""):
+        """``log`` for async views, which never run inside a transaction."""
+        entry = self._entry(
+            user, activity_type, description, ip_address, user_agent)
+
+        if self.mode == SYNC or self._stopping.is_set():
+            await entry.asave()
+            self._count_written()
+            return
+        self._enqueue(entry)
+
+    @staticmethod
+    def _entry(user, activity_type, description, ip_address, user_agent):
+        return UserActivityLog(
+            user_id=user.pk,
+            activity_type=activity_type,
+            description=description,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            timestamp=timezone.now(),
+        )
+
+    def _count_written(self):
+        with self._lock:
+            self._counters["enqueued"] += 1
+            self._counters["written"] += 1
+
+    def flush(self):
+        """Write every pending event. Safe to call from any thread."""
+        with self._flush_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    return
+                self._write(batch)
+
+    def shutdown(self, timeout=5.0):
+        """Stop the worker and flush; later events are written synchronously."""
+        self._stopping.set()
+        self._wakeup.set()
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "mode": self.mode,
+                **self._counters,
+                "pending": len(self._queue),
+                "max_delay_seconds": round(self._max_delay, 3),
+            }
+
+    def _enqueue(self, entry):
+        with self._lock:
+            if len(self._queue) >= self.max_queue_size:
+                self._counters["dropped"] += 1
+                logger.warning(
+                    "Activity log queue is full (%s events); dropping %s event",
+                    self.max_queue_size, entry.activity_type)
+                return
+            self._queue.append((entry, time.monotonic()))
+            self._counters["enqueued"] += 1
+            pending = len(self._queue)
+
+        if self._stopping.is_set():
+            # Committed after shutdown (e.g. a later atexit hook): no worker
+            # will pick this up.
+            self.flush()
+            return
+        self._ensure_worker()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _drain(self):
+        with self._lock:
+            count = min(self.batch_size, len(self._queue))
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _write(self, batch):
+        entries = [entry for entry, _ in batch]
+        try:
+            with transaction.atomic():
+                UserActivityLog.objects.bulk_create(
+                    entries, batch_size=self.batch_size)
+                record_logins([
+                    entry.timestamp for entry in entries
+                    if entry.activity_type == "login"
+                ])
+        except DatabaseError:
+            logger.exception(
+                "Failed to write %s activity log events", len(batch))
+            with self._lock:
+                self._counters["dropped"] += len(batch)
+            return
+
+        now = time.monotonic()
+        delays = [now - queued_at for _, queued_at in batch]
+        with self._lock:
+            self._counters["written"] += len(batch)
+            self._counters["flushes"] += 1
+            self._counters["delayed"] += sum(
+                1 for delay in delays if delay > self.flush_interval)
+            self._max_delay = max(self._max_delay, *delays)
+
+    def _ensure_worker(self):
+        if self._worker is not None or self._stopping.is_set():
+            return
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(
+                target=self._run, name="activity-log-writer", daemon=True)
+            self._worker.start()
+        atexit.register(self.shutdown)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if not self._queue:
+                continue
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:  # pragma: no cover - keep the worker alive
+                logger.exception("Activity log flush failed")
+        close_old_connections()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_activity_log_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ActivityLogWriter.from_settings()
+    return _writer
+
+
+@receiver(setting_changed)
+def _reset_writer(setting, **kwargs):
+    global _writer
+    if not setting.startswith("ACTIVITY_LOG_"):
+        return
+    with _writer_lock:
+        if _writer is not None:
+            _writer.shutdown()
+        _writer = None
@@ -3,6 +3,7 @@ from typing import cast
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from .models import User, UserActivityLog
+from .search import search_users
 
 
 @admin.register(User)
@@ -13,6 +14,13 @@ class CustomUserAdmin(UserAdmin):
     search_fields = ('email', 'username', 'first_name', 'last_name')
     ordering = ('-created_at',)
 
+    def get_search_results(self, request, queryset, search_term):
+        # Use the trigram-indexed search instead of four unindexed
+        # icontains scans over search_fields.
+        if not search_term.strip():
+            return queryset, False
+        return search_users(queryset, search_term), False
+
     fieldsets = cast(tuple, UserAdmin.fieldsets) + (
         (
             'Custom Fields',
@@ -34,6 +42,7 @@ class CustomUserAdmin(UserAdmin):
 @admin.register(UserActivityLog)
 class UserActivityLogAdmin(admin.ModelAdmin):
     list_display = ('user', 'activity_type', 'ip_address', 'timestamp')
+    list_select_related = ('user',)
     list_filter = ('activity_type', 'timestamp')
     search_fields = ('user__email', 'user__username', 'description')
     readonly_fields = ('timestamp',)
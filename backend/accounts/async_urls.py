@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import async_views
+
+urlpatterns = [
+    path("register/", async_views.register_user, name="async_register"),
+    path("login/", async_views.login_user, name="async_login"),
+    path("profile/", async_views.user_profile, name="async_profile"),
+    path("activity-logs/", async_views.activity_logs, name="async_activity_logs"),
+]
@@ -0,0 +1,224 @@
+"""
+Async variants of the login, register, profile and activity log endpoints,
+served under ``/api/async/auth/`` for ASGI deployments.
+
+Under ASGI, Django runs every sync view through ``sync_to_async`` on one
+shared thread, so a login spending hundreds of milliseconds in PBKDF2 holds
+up every other sync request of the process. These views stay on the event
+loop instead:
+
+* queries use the async ORM and the cache's async API;
+* password hashing runs on the bounded ``PASSWORD_HASHING_WORKERS`` pool
+  (``accounts.hashers``), so at most that many hashes run at once and the
+  rest queue without blocking reads;
+* registration, which must be atomic, writes the user, its activity log row
+  and its refresh token in a single ``sync_to_async`` call, since Django
+  transactions cannot span awaits.
+
+Request and response bodies, status codes, throttles and error payloads
+match the DRF endpoints under ``/api/auth/``. Unlike the sync login these do
+not create a Django session; the API authenticates with JWTs only. Profile
+updates stay on the sync endpoint.
+"""
+
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import JsonResponse
+from django.utils import timezone
+from rest_framework.exceptions import (
+    APIException, NotAuthenticated, ParseError, Throttled,
+)
+
+from .activity import get_activity_log_writer
+from .authentication import CachedJWTAuthentication
+from .conditional import not_modified, profile_validators, set_validators
+from .hashers import acheck_password, amake_password
+from .models import User, UserActivityLog
+from .pagination import ActivityLogPagination
+from .serializers import (
+    LoginCredentialsSerializer, UserActivityLogSerializer,
+    UserProfileSerializer, UserRegistrationSerializer,
+    afind_user_by_identifier,
+)
+from .throttling import (
+    LoginIdentifierThrottle, LoginIPThrottle, RegisterIPThrottle,
+)
+from .tokens import RefreshToken, acreate_refresh_token
+from .utils import get_client_ip
+
+authenticator = CachedJWTAuthentication()
+
+
+def api_view(methods):
+    """
+    Async counterpart of DRF's ``@api_view``: restrict methods, exempt from
+    CSRF and render ``APIException`` as DRF's exception handler would.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                response = JsonResponse(
+                    {"detail": f'Method "{request.method}" not allowed.'},
+                    status=405)
+                response["Allow"] = ", ".join(methods)
+                return response
+            try:
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                return error_response(request, exc)
+
+        # csrf_exempt() in Django 4.2 would wrap the coroutine function in a
+        # sync one; the attribute is all the middleware looks at.
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+def error_response(request, exc):
+    data = exc.detail if isinstance(exc.detail, (dict, list)) else {
+        "detail": exc.detail}
+    response = JsonResponse(data, status=exc.status_code, safe=False)
+    if exc.status_code == 401:
+        response["WWW-Authenticate"] = authenticator.authenticate_header(request)
+    if getattr(exc, "wait", None):
+        response["Retry-After"] = "%d" % exc.wait
+    return response
+
+
+def parse_body(request):
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+    return request.POST
+
+
+async def check_throttles(request, throttle_classes):
+    waits = []
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        if not await throttle.aallow_request(request, None):
+            waits.append(throttle.wait())
+    if waits:
+        raise Throttled(max(waits))
+
+
+async def authenticate(request):
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header else None
+    if raw_token is None:
+        raise NotAuthenticated()
+    return await authenticator.aget_user(
+        authenticator.get_validated_token(raw_token))
+
+
+def token_pair(refresh):
+    return {"access": str(refresh.access_token), "refresh": str(refresh)}
+
+
+@api_view(["POST"])
+async def register_user(request):
+    # Set like DRF's request.data so the throttles can read it.
+    request.data = parse_body(request)
+    await check_throttles(request, [RegisterIPThrottle])
+
+    serializer = UserRegistrationSerializer(data=request.data)
+    # Uniqueness validators query the database.
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=400)
+
+    encoded = await amake_password(serializer.validated_data["password"])
+    user, refresh = await sync_to_async(create_registered_user)(
+        serializer.validated_data, encoded, get_client_ip(request),
+        request.META.get("HTTP_USER_AGENT", ""))
+    return JsonResponse({
+        "message": "User created successfully",
+        "user": UserProfileSerializer(user).data,
+        "tokens": token_pair(refresh),
+    }, status=201)
+
+
+def create_registered_user(data, encoded_password, ip_address, user_agent):
+    with transaction.atomic():
+        user = User(
+            email=User.objects.normalize_email(data["email"]),
+            username=User.normalize_username(data["username"]),
+            first_name=data["first_name"],
+            last_name=data["last_name"],
+            password=encoded_password,
+        )
+        user.save()
+        get_activity_log_writer().log(
+            user, "register", "User registered successfully",
+            ip_address=ip_address, user_agent=user_agent)
+        refresh = RefreshToken.for_user(user)
+    return user, refresh
+
+
+@api_view(["POST"])
+async def login_user(request):
+    request.data = parse_body(request)
+    await check_throttles(request, [LoginIPThrottle, LoginIdentifierThrottle])
+
+    serializer = LoginCredentialsSerializer(data=request.data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    credentials = serializer.validated_data
+
+    user = await afind_user_by_identifier(credentials["identifier"])
+    correct, rehashed = False, None
+    if user is not None:
+        correct, rehashed = await acheck_password(
+            credentials["password"], user.password)
+    if not correct:
+        return JsonResponse({"non_field_errors": ["Invalid credentials"]}, status=400)
+    if not user.is_active:
+        return JsonResponse(
+            {"non_field_errors": ["User account is disabled"]}, status=400)
+
+    ip_address = get_client_ip(request)
+    user.last_login = timezone.now()
+    user.last_login_ip = ip_address
+    update_fields = ["last_login", "last_login_ip"]
+    if rehashed:
+        user.password = rehashed
+        update_fields.append("password")
+    await user.asave(update_fields=update_fields)
+
+    await get_activity_log_writer().alog(
+        user, "login", "User logged in successfully", ip_address=ip_address,
+        user_agent=request.META.get("HTTP_USER_AGENT", ""))
+    refresh = await acreate_refresh_token(user)
+    return JsonResponse({
+        "message": "Login successful",
+        "user": UserProfileSerializer(user).data,
+        "tokens": token_pair(refresh),
+    })
+
+
+@api_view(["GET"])
+async def user_profile(request):
+    user = await authenticate(request)
+    etag, last_modified = profile_validators(user)
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        response = set_validators(JsonResponse(
+            UserProfileSerializer(user, context={"request": request}).data),
+            etag, last_modified)
+    return response
+
+
+@api_view(["GET"])
+async def activity_logs(request):
+    user = await authenticate(request)
+    paginator = ActivityLogPagination()
+    rows = await paginator.apaginate_queryset(
+        UserActivityLog.objects.filter(user=user).select_related("user"),
+        request)
+    return JsonResponse(paginator.get_paginated_data(
+        UserActivityLogSerializer(rows, many=True).data))
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .caching import (
+    aget_cached_user, aget_user_version, aset_cached_user, get_cached_user,
+    get_user_version, set_cached_user,
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that serves ``request.user`` from the cache.
+
+    Entries live for ``AUTH_USER_CACHE_TTL`` seconds and are keyed by the
+    user's version stamp, which is bumped whenever the user row changes.
+    """
+
+    def get_user(self, validated_token):
+        if settings.AUTH_USER_CACHE_TTL <= 0:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        version = get_user_version(user_id)
+        user = get_cached_user(user_id, version)
+        if user is None:
+            user = super().get_user(validated_token)
+            set_cached_user(user, version)
+            return user
+
+        self.check_user(user, validated_token)
+        return user
+
+    async def aget_user(self, validated_token):
+        """``get_user`` for async views, through the async cache and ORM."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cached = settings.AUTH_USER_CACHE_TTL > 0
+        if cached:
+            version = await aget_user_version(user_id)
+            user = await aget_cached_user(user_id, version)
+            if user is not None:
+                if api_settings.CHECK_REVOKE_TOKEN:
+                    # The hash is not cached, and check_user needs it.
+                    await user.arefresh_from_db(fields=["password"])
+                self.check_user(user, validated_token)
+                return user
+
+        try:
+            user = await self.user_model.objects.aget(
+                **{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        self.check_user(user, validated_token)
+        if cached:
+            await aset_cached_user(user, version)
+        return user
+
+    def check_user(self, user, validated_token):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
@@ -0,0 +1,203 @@
+"""
+Helpers shared by the ``bench_*`` management commands.
+
+Benchmarks run against a throwaway copy of the configured database (the same
+one ``manage.py test`` would create), so seeding millions of rows never
+touches real data. Point ``DATABASE_URL``/``DB_ENGINE`` at PostgreSQL to
+benchmark Postgres instead of SQLite.
+"""
+
+import json
+import os
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from .models import User, UserActivityLog
+
+BENCH_PASSWORD = "BenchmarkPass123!"
+
+
+@contextmanager
+def benchmark_database(keepdb=False, verbosity=0, test_name=None):
+    """
+    Create the throwaway database; ``test_name`` overrides its name, e.g. to
+    put a SQLite benchmark in a file, which unlike the shared in-memory
+    database lets concurrent threads wait for locks instead of failing.
+    """
+    old_name = connection.settings_dict["NAME"]
+    old_test_name = connection.settings_dict["TEST"].get("NAME")
+    if test_name:
+        connection.settings_dict["TEST"]["NAME"] = test_name
+    try:
+        connection.creation.create_test_db(
+            verbosity=verbosity, autoclobber=True, keepdb=keepdb,
+            serialize=False)
+        try:
+            yield connection.settings_dict["NAME"]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity, keepdb)
+    finally:
+        connection.settings_dict["TEST"]["NAME"] = old_test_name
+
+
+def database_env(name):
+    """
+    Environment for a subprocess (server, fresh interpreter) that should use
+    the throwaway database ``name`` created by ``benchmark_database``.
+    """
+    env = dict(os.environ)
+    if connection.vendor == "sqlite":
+        env.update(DATABASE_URL="", DB_ENGINE="sqlite", SQLITE_PATH=name)
+    elif settings.DATABASE_URL:
+        env["DATABASE_URL"] = urlparse(settings.DATABASE_URL)._replace(
+            path=f"/{name}").geturl()
+    else:
+        env["DB_NAME"] = name
+    return env
+
+
+def throttle_rates(**rates):
+    """
+    Override the DRF throttle rates; with no arguments, disable throttling.
+
+    Benchmarks send far more logins from one address than the production
+    limits allow.
+    """
+    return override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates,
+    })
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Summarize a list of durations in seconds as milliseconds."""
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "min_ms": round(min(samples) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
+
+
+def format_summary(summary):
+    if not summary.get("count"):
+        return "no samples"
+    return (
+        f"n={summary['count']} mean={summary['mean_ms']}ms "
+        f"p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms "
+        f"p99={summary['p99_ms']}ms"
+    )
+
+
+def measure(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def seed_users(count, batch_size=5000, prefix="bench", role="user"):
+    """Insert ``count`` users sharing one pre-computed password hash."""
+    password = make_password(BENCH_PASSWORD)
+    start = User.objects.filter(username__startswith=prefix).count()
+    for offset in range(0, count, batch_size):
+        User.objects.bulk_create(
+            [
+                User(
+                    email=f"{prefix}{i}@example.com",
+                    username=f"{prefix}{i}",
+                    first_name="Bench",
+                    last_name=f"User{i}",
+                    password=password,
+                    role=role,
+                )
+                for i in range(start + offset,
+                               start + min(offset + batch_size, count))
+            ],
+            batch_size=batch_size,
+        )
+    return list(User.objects.values_list("id", flat=True))
+
+
+def seed_activity_logs(rows, user_ids, batch_size=10000, days=30, seed=0):
+    """Insert ``rows`` activity log entries spread over the last ``days``."""
+    rng = random.Random(seed)
+    activity_types = [choice for choice, _ in UserActivityLog.ACTIVITY_TYPES]
+    now = timezone.now()
+    window = int(timedelta(days=days).total_seconds())
+    for offset in range(0, rows, batch_size):
+        UserActivityLog.objects.bulk_create(
+            [
+                UserActivityLog(
+                    user_id=rng.choice(user_ids),
+                    activity_type=rng.choice(activity_types),
+                    description="Seeded by benchmark",
+                    ip_address="127.0.0.1",
+                    user_agent="benchmark",
+                    timestamp=now - timedelta(seconds=rng.randrange(window)),
+                )
+                for _ in range(min(batch_size, rows - offset))
+            ],
+            batch_size=batch_size,
+        )
+
+
+def benchmark_host():
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != "*"]
+    return (hosts or ["localhost"])[0].lstrip(".")
+
+
+def wsgi_request(app, method, path, data=None, **extra):
+    """
+    Run one request through a WSGI ``app`` the way a server would.
+
+    Unlike the test client this keeps Django's ``request_started`` and
+    ``request_finished`` connection handling, so CONN_MAX_AGE applies.
+    Returns ``(status_code, body)``.
+    """
+    extra.setdefault("HTTP_HOST", benchmark_host())
+    factory = RequestFactory()
+    build = getattr(factory, method.lower())
+    if data is not None and method.upper() != "GET":
+        extra.setdefault("content_type", "application/json")
+        data = json.dumps(data)
+    environ = build(path, data, secure=True, **extra).environ
+
+    status_holder = []
+    response = app(environ, lambda status, headers, *args: status_holder.append(status))
+    try:
+        body = b"".join(response)
+    finally:
+        if hasattr(response, "close"):
+            response.close()
+    return int(status_holder[0].split()[0]), body
+
+
+def write_json(path, payload):
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=2, sort_keys=True, default=str)
+        handle.write("\n")
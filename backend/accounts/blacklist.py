@@ -0,0 +1,241 @@
+"""
+In-process index in front of the refresh token blacklist.
+
+simplejwt checks ``BlacklistedToken`` with a join query on every refresh
+token verification. ``BlacklistIndex`` answers most checks from memory:
+
+* a bloom filter of every unexpired blacklisted JTI. A miss means "not
+  blacklisted" without touching the database;
+* an LRU of recently confirmed blacklisted JTIs, so repeated use of a revoked
+  token is rejected without a query either.
+
+A bloom filter hit that is not in the LRU is confirmed with the usual query,
+so false positives cost one query and never reject a valid token.
+
+The index is loaded on first use. Tokens blacklisted by this process are
+added right away; tokens blacklisted by other workers are picked up by
+fetching ``BlacklistedToken`` rows with a higher id than the last one seen,
+at most every ``TOKEN_BLACKLIST_SYNC_INTERVAL`` seconds. That interval is
+how long another worker may still accept a just-revoked token; set it to 0
+to sync before every check.
+
+Ids are assigned at insert but become visible at commit, so a row can show
+up after one with a higher id. Ids skipped below the last one seen are kept
+as gaps and fetched again on every sync for ``gap_timeout`` seconds, after
+which they are assumed to belong to rolled-back inserts.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import Q
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class BlacklistIndex:
+    # Gaps further than this below the newest id are not tracked; far more
+    # than the number of revocations that can be in flight at once.
+    max_gap_span = 1000
+
+    def __init__(self, capacity=100000, error_rate=0.001, lru_size=10000,
+                 sync_interval=1.0, gap_timeout=60.0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.lru_size = lru_size
+        self.sync_interval = sync_interval
+        self.gap_timeout = gap_timeout
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._recent = OrderedDict()
+        self._last_id = 0
+        self._gaps = {}
+        self._synced_at = 0.0
+        self._counters = {"checks": 0, "bloom_misses": 0, "lru_hits": 0,
+                          "db_checks": 0}
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            capacity=settings.TOKEN_BLACKLIST_BLOOM_CAPACITY,
+            error_rate=settings.TOKEN_BLACKLIST_BLOOM_ERROR_RATE,
+            lru_size=settings.TOKEN_BLACKLIST_LRU_SIZE,
+            sync_interval=settings.TOKEN_BLACKLIST_SYNC_INTERVAL,
+        )
+
+    def load(self):
+        """(Re)build the bloom filter from unexpired blacklisted tokens."""
+        rows = (
+            BlacklistedToken.objects
+            .filter(token__expires_at__gt=timezone.now())
+            .values_list("id", "token__jti")
+        )
+        jtis, last_id = [], 0
+        for row_id, jti in rows.iterator(chunk_size=10000):
+            jtis.append(jti)
+            last_id = max(last_id, row_id)
+        last_id = max(
+            last_id,
+            BlacklistedToken.objects.order_by("-id")
+            .values_list("id", flat=True).first() or 0,
+        )
+        floor = max(0, last_id - self.max_gap_span)
+        seen = set(
+            BlacklistedToken.objects.filter(id__gt=floor)
+            .values_list("id", flat=True)
+        )
+
+        bloom = BloomFilter(max(self.capacity, len(jtis) * 2), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        with self._lock:
+            self._bloom = bloom
+            self._last_id = last_id
+            self._gaps = {}
+            self._add_gaps(floor, last_id, seen, time.monotonic())
+            self._synced_at = time.monotonic()
+
+    def _add_gaps(self, after, upto, seen, now):
+        for row_id in range(max(after, upto - self.max_gap_span) + 1, upto):
+            if row_id not in seen:
+                self._gaps.setdefault(row_id, now)
+
+    def sync(self, force=False):
+        """Add tokens blacklisted since the last sync (by any process)."""
+        if self._bloom is None:
+            self.load()
+            return
+        if not force and time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        with self._lock:
+            last_id, gaps = self._last_id, list(self._gaps)
+        rows = list(
+            BlacklistedToken.objects.filter(Q(id__gt=last_id) | Q(id__in=gaps))
+            .order_by("id")
+            .values_list("id", "token__jti")
+        )
+        now = time.monotonic()
+        with self._lock:
+            seen = set()
+            for row_id, jti in rows:
+                if (row_id > self._last_id
+                        or self._gaps.pop(row_id, None) is not None):
+                    self._bloom.add(jti)
+                seen.add(row_id)
+            newest = max(seen, default=0)
+            if newest > self._last_id:
+                self._add_gaps(self._last_id, newest, seen, now)
+                self._last_id = newest
+            self._gaps = {
+                row_id: first_missed
+                for row_id, first_missed in self._gaps.items()
+                if now - first_missed < self.gap_timeout
+            }
+            self._synced_at = now
+            overfull = self._bloom.count > self._bloom.capacity
+        if overfull:
+            # Past capacity the false-positive rate climbs; rebuilding also
+            # drops tokens that have expired since the last load.
+            self.load()
+
+    def add(self, jti):
+        """
+        Record a token this process is blacklisting.
+
+        The bloom filter is updated at once (a false positive only costs a
+        query); the LRU, which is trusted without a query, only once the
+        blacklist row has committed.
+        """
+        if self._bloom is None:
+            self.load()
+        with self._lock:
+            self._bloom.add(jti)
+        transaction.on_commit(lambda: self._remember(jti))
+
+    def _remember(self, jti):
+        with self._lock:
+            self._recent[jti] = True
+            self._recent.move_to_end(jti)
+            while len(self._recent) > self.lru_size:
+                self._recent.popitem(last=False)
+
+    def is_blacklisted(self, jti):
+        self.sync()
+        with self._lock:
+            self._counters["checks"] += 1
+            if jti not in self._bloom:
+                self._counters["bloom_misses"] += 1
+                return False
+            if jti in self._recent:
+                self._recent.move_to_end(jti)
+                self._counters["lru_hits"] += 1
+                return True
+            self._counters["db_checks"] += 1
+
+        blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        if blacklisted:
+            self._remember(jti)
+        return blacklisted
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._counters,
+                "bloom_entries": self._bloom.count if self._bloom else 0,
+                "recent": len(self._recent),
+            }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_blacklist_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = BlacklistIndex.from_settings()
+    return _index
+
+
+@receiver(setting_changed)
+def _reset_index(setting, **kwargs):
+    global _index
+    if setting.startswith("TOKEN_BLACKLIST_"):
+        with _index_lock:
+            _index = None
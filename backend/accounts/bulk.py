@@ -0,0 +1,120 @@
+"""
+Bulk role and active-status changes for the admin ``users/bulk/`` endpoint.
+
+Matching users are processed in primary-key batches. Each batch is locked,
+updated with a single ``UPDATE``, logged with one ``bulk_create`` and has its
+stat counter deltas applied, all in one transaction. Because ``update()``
+skips model signals, cached users are invalidated explicitly once the batch
+commits, and deactivation blacklists every outstanding refresh token.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken, OutstandingToken,
+)
+
+from .blacklist import get_blacklist_index
+from .caching import bump_user_version
+from .models import User, UserActivityLog
+from .stats import apply_deltas, counter_deltas
+
+SET_ROLE = "set_role"
+DEACTIVATE = "deactivate"
+REACTIVATE = "reactivate"
+ACTIONS = (SET_ROLE, DEACTIVATE, REACTIVATE)
+
+
+def _changes(action, role=None):
+    """Return ``(fields to set, activity type)`` for ``action``."""
+    if action == SET_ROLE:
+        return {"role": role}, "role_change"
+    if action == DEACTIVATE:
+        return {"is_active": False}, "deactivation"
+    return {"is_active": True}, "reactivation"
+
+
+def revoke_refresh_tokens(user_ids):
+    """Blacklist every unexpired refresh token of ``user_ids``."""
+    tokens = list(
+        OutstandingToken.objects.filter(
+            user_id__in=user_ids, expires_at__gt=timezone.now())
+        .exclude(blacklistedtoken__isnull=False)
+        .values_list("id", "jti")
+    )
+    BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token_id=token_id) for token_id, _ in tokens],
+        ignore_conflicts=True,
+    )
+    index = get_blacklist_index()
+    for _, jti in tokens:
+        index.add(jti)
+    return len(tokens)
+
+
+def apply_bulk_action(queryset, action, actor, role=None, ip_address=None,
+                      user_agent="", batch_size=None):
+    """
+    Apply ``action`` to the users in ``queryset`` except ``actor``.
+
+    Users already in the target state are skipped. Returns a summary with the
+    number of users updated and refresh tokens revoked.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unsupported bulk action: {action}")
+    batch_size = batch_size or settings.BULK_USER_BATCH_SIZE
+    changes, activity_type = _changes(action, role)
+    queryset = queryset.exclude(pk=actor.pk).exclude(**changes)
+
+    summary = {"updated": 0, "tokens_revoked": 0}
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queryset.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .select_for_update()
+                .values_list("pk", "role", "is_active")[:batch_size]
+            )
+            if not rows:
+                return summary
+            user_ids = [row[0] for row in rows]
+            now = timezone.now()
+            User.objects.filter(pk__in=user_ids).update(
+                **changes, updated_at=now)
+
+            deltas = Counter()
+            logs = []
+            for user_id, old_role, old_active in rows:
+                new_role = changes.get("role", old_role)
+                new_active = changes.get("is_active", old_active)
+                deltas.update(counter_deltas(
+                    (old_role, old_active), (new_role, new_active)))
+                logs.append(UserActivityLog(
+                    user_id=user_id,
+                    activity_type=activity_type,
+                    description=_describe(action, old_role, new_role, actor),
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                    timestamp=now,
+                ))
+            apply_deltas(deltas)
+            UserActivityLog.objects.bulk_create(logs)
+            if action == DEACTIVATE:
+                summary["tokens_revoked"] += revoke_refresh_tokens(user_ids)
+            transaction.on_commit(
+                lambda user_ids=user_ids: bump_user_version(*user_ids))
+
+        summary["updated"] += len(rows)
+        last_pk = user_ids[-1]
+
+
+def _describe(action, old_role, new_role, actor):
+    if action == SET_ROLE:
+        return f"Role changed from {old_role} to {new_role} by {actor.email}"
+    if action == DEACTIVATE:
+        return f"Account deactivated by {actor.email}"
+    return f"Account reactivated by {actor.email}"
@@ -0,0 +1,82 @@
+"""
+Versioned cache entries for users.
+
+Each user has a version stamp in the cache. Cached user objects are keyed by
+``(user id, version)``, so bumping the stamp on save, deactivation, role or
+password change makes every previously cached copy unreachable at once, in
+every process sharing the cache backend.
+
+The password hash is never written to the cache: cached users come back with
+``password`` deferred, so code that needs it (``check_password``, password
+changes) loads it from the database.
+"""
+
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.fields.files import FieldFile
+
+USER_VERSION_KEY = "accounts:user-version:{}"
+USER_KEY = "accounts:user:{}:{}"
+
+
+def get_user_version(user_id):
+    key = USER_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_user_version(*user_ids):
+    if user_ids:
+        cache.set_many(
+            {USER_VERSION_KEY.format(user_id): uuid4().hex for user_id in user_ids},
+            timeout=None,
+        )
+
+
+def get_cached_user(user_id, version):
+    return cache.get(USER_KEY.format(user_id, version))
+
+
+def set_cached_user(user, version):
+    cache.set(USER_KEY.format(user.pk, version), without_password(user),
+              timeout=settings.AUTH_USER_CACHE_TTL)
+
+
+def without_password(user):
+    """A copy of ``user`` with the ``password`` field deferred."""
+    names = [
+        field.attname for field in user._meta.concrete_fields
+        if field.attname != "password" and field.attname in user.__dict__
+    ]
+    # File fields are stored by name; their FieldFile points back at the
+    # original instance, hash included.
+    values = [
+        value.name if isinstance(value, FieldFile) else value
+        for value in (getattr(user, name) for name in names)
+    ]
+    return type(user).from_db(user._state.db, names, values)
+
+
+# Async counterparts for the views in accounts/async_views.py.
+
+async def aget_user_version(user_id):
+    key = USER_VERSION_KEY.format(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, uuid4().hex, timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+async def aget_cached_user(user_id, version):
+    return await cache.aget(USER_KEY.format(user_id, version))
+
+
+async def aset_cached_user(user, version):
+    await cache.aset(USER_KEY.format(user.pk, version), without_password(user),
+                     timeout=settings.AUTH_USER_CACHE_TTL)
@@ -0,0 +1,176 @@
+"""
+Negotiated response compression.
+
+``CompressionMiddleware`` compresses text and JSON responses to GET and HEAD
+requests with brotli (when the ``brotli`` package is installed) or gzip,
+whichever the client's ``Accept-Encoding`` prefers. Buffered responses are
+compressed only from ``COMPRESSION_MIN_SIZE`` bytes and only when that
+makes them smaller. Streaming responses (the exports) are compressed chunk
+by chunk, so memory stays flat.
+
+Like Django's ``GZipMiddleware``, it leaves responses that already have a
+``Content-Encoding`` (WhiteNoise's precompressed static files) untouched and
+weakens strong ETags. Unlike it, it runs natively in async mode, and it
+skips responses to other methods: those carry freshly issued tokens, which
+compression could leak to a BREACH-style attack.
+"""
+
+from gzip import GzipFile
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import StreamingBuffer, compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+# Same BREACH mitigation as Django's GZipMiddleware: a random-length gzip
+# filename.
+GZIP_MAX_RANDOM_BYTES = 100
+
+
+def accepted_encodings(header):
+    """``{coding: q}`` from an ``Accept-Encoding`` header."""
+    encodings = {}
+    for item in header.split(","):
+        coding, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip():
+            encodings[coding.strip().lower()] = quality
+    return encodings
+
+
+def choose_encoding(header):
+    """The best coding we support for ``Accept-Encoding``, or ``None``."""
+    accepted = accepted_encodings(header)
+    default = accepted.get("*", 0.0)
+    available = ["br", "gzip"] if brotli else ["gzip"]
+    best = max(available, key=lambda coding: accepted.get(coding, default))
+    return best if accepted.get(best, default) > 0 else None
+
+
+def compress(coding, data):
+    if coding == "br":
+        return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return compress_string(data, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+def compress_chunks(coding, chunks):
+    if coding == "gzip":
+        return compress_sequence(chunks, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+    return _brotli_sequence(chunks)
+
+
+def _brotli_sequence(chunks):
+    compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+    for chunk in chunks:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_chunks(coding, chunks):
+    if coding == "br":
+        compressor = brotli.Compressor(
+            quality=settings.COMPRESSION_BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    else:
+        buffer = StreamingBuffer()
+        gzip_file = GzipFile(mode="wb", compresslevel=6, fileobj=buffer, mtime=0)
+
+        def process(chunk):
+            gzip_file.write(chunk)
+            return buffer.read()
+
+        def finish():
+            gzip_file.close()
+            return buffer.read()
+
+    async for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if not self.compressible(request, response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_chunks(
+                    coding, response.streaming_content)
+            else:
+                response.streaming_content = compress_chunks(
+                    coding, response.streaming_content)
+            # The compressed size is only known once streaming is done.
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(coding, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # RFC 9110 8.8.1: the compressed body is not byte-identical.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = coding
+        return response
+
+    @staticmethod
+    def compressible(request, response):
+        if request.method not in ("GET", "HEAD"):
+            return False
+        if response.has_header("Content-Encoding") or response.has_header(
+                "Content-Range"):
+            return False
+        if "no-transform" in response.get("Cache-Control", ""):
+            return False
+        if not response.get("Content-Type", "").startswith(COMPRESSIBLE_TYPES):
+            return False
+        return response.streaming or (
+            len(response.content) >= settings.COMPRESSION_MIN_SIZE)
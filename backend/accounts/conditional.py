@@ -0,0 +1,53 @@
+"""
+Conditional GET for the endpoints the frontend polls.
+
+A view computes its validators, an ETag and a Last-Modified time, from data
+it already has or can read with a primary-key lookup (the authenticated
+user's ``updated_at``, the stats version row) and calls ``not_modified``
+before building the payload. If the client's ``If-None-Match`` or
+``If-Modified-Since`` still matches, it gets a 304 and nothing is queried or
+serialized.
+
+ETags are weak: the same data may be sent with a different renderer or
+content encoding.
+"""
+
+import hashlib
+
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers,
+)
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(
+        ":".join(map(str, parts)).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def profile_validators(user):
+    # last_login is saved without touching updated_at.
+    changed = [user.updated_at, user.last_login]
+    return (
+        make_etag("profile", user.pk, *changed),
+        max(value for value in changed if value is not None),
+    )
+
+
+def not_modified(request, etag, last_modified):
+    """Return a 304 (or 412) response if the client's copy is current."""
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()))
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+    # Browsers may keep the response but must revalidate it before reuse.
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Authorization"])
+    return response
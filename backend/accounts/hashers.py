@@ -0,0 +1,130 @@
+"""
+Password hashers whose cost is read from settings.
+
+Each class keeps the algorithm name of the Django hasher it extends, so
+existing hashes keep verifying. When the configured cost differs from the
+one stored in a hash, ``must_update`` reports it and Django's
+``check_password`` re-hashes the password on the next successful login.
+
+The async views hash through ``acheck_password``/``amake_password``, which
+run on a pool of ``PASSWORD_HASHING_WORKERS`` threads (the PBKDF2, scrypt
+and Argon2 implementations release the GIL) so the event loop keeps serving
+other requests.
+"""
+
+import asyncio
+import base64
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher,
+    check_password, make_password,
+)
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+def scrypt_maxmem(n, r, p):
+    # OpenSSL refuses to allocate more than 32 MiB unless told otherwise;
+    # allow twice the 128 * n * r * p bytes scrypt actually needs.
+    return 256 * n * r * p
+
+
+class TunableScryptPasswordHasher(ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        # Django passes the same maxmem for every hash, but verify() re-encodes
+        # with the stored n, r and p, which may exceed the configured ones.
+        self._check_encode_args(password, salt)
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash_ = hashlib.scrypt(
+            password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+            maxmem=scrypt_maxmem(n, r, p), dklen=64)
+        hash_ = base64.b64encode(hash_).decode("ascii").strip()
+        return "%s$%d$%s$%d$%d$%s" % (self.algorithm, n, salt, r, p, hash_)
+
+
+class TunableArgon2PasswordHasher(Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASHING_WORKERS,
+                    thread_name_prefix="password-hashing")
+    return _executor
+
+
+def _check(raw_password, encoded):
+    rehashed = []
+    correct = check_password(
+        raw_password, encoded,
+        setter=lambda raw: rehashed.append(make_password(raw)))
+    return correct, rehashed[0] if rehashed else None
+
+
+async def acheck_password(raw_password, encoded):
+    """
+    Return ``(correct, new_encoded)``.
+
+    ``new_encoded`` is the password re-hashed with the preferred hasher when
+    the stored hash is outdated (as ``check_password``'s setter would), else
+    None; saving it is left to the caller.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_executor(), _check, raw_password, encoded)
+
+
+async def amake_password(raw_password):
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_executor(), make_password, raw_password)
+
+
+@receiver(setting_changed)
+def _reset_executor(setting, **kwargs):
+    global _executor
+    if setting == "PASSWORD_HASHING_WORKERS":
+        with _executor_lock:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = None
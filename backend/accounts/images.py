@@ -0,0 +1,267 @@
+"""
+Resized variants of profile pictures.
+
+``render_variants`` decodes an upload once and derives every size in
+``VARIANTS`` from it, largest first, each from the previous result. For
+JPEG input Pillow's ``draft`` mode decodes straight at a reduced scale.
+EXIF orientation is applied, then all metadata (EXIF, GPS, ICC, comments)
+is dropped. ``render_picture`` does the same from a full-size decode and
+also re-encodes the original without metadata, since it is stored and
+served as well. Pillow is imported on first use, not with the views.
+
+``schedule_variants`` runs the pipeline after the upload commits: in a
+small thread pool (``PROFILE_PICTURE_PROCESSING=background``, the default)
+or inline (``sync``, used by tests). The request only checks the header;
+the stripped original replaces the upload when the pipeline finishes.
+Variants are stored with the name of the picture they were rendered from,
+so until they are regenerated for a new upload the serializer exposes none
+and clients fall back to the original.
+"""
+
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.signals import setting_changed
+from django.db import close_old_connections, transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import bump_user_version
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels. The dashboard avatar is 40px; "small" covers it
+# at 2x density.
+VARIANTS = {"large": 1024, "medium": 256, "small": 96}
+VARIANT_DIR = "profile_pics/variants"
+
+SYNC = "sync"
+BACKGROUND = "background"
+
+
+class ImageRejected(ValueError):
+    pass
+
+
+def output_format():
+    from PIL import features
+
+    if settings.PROFILE_PICTURE_FORMAT == "webp" and features.check("webp"):
+        return "WEBP", "webp"
+    return "JPEG", "jpg"
+
+
+def check_upload(fileobj):
+    """
+    Reject uploads that are too large before any pixels are decoded.
+
+    Only the header is parsed, so a small file claiming huge dimensions (a
+    decompression bomb) is refused as cheaply as an oversized one.
+    """
+    if fileobj.size > settings.PROFILE_PICTURE_MAX_BYTES:
+        raise ImageRejected(
+            f"Image files may be at most "
+            f"{settings.PROFILE_PICTURE_MAX_BYTES // (1024 * 1024)} MB.")
+    from PIL import Image
+
+    position = fileobj.tell()
+    try:
+        with Image.open(fileobj) as image:
+            width, height = image.size
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise ImageRejected("Upload a valid image.") from exc
+    finally:
+        fileobj.seek(position)
+    if width * height > settings.PROFILE_PICTURE_MAX_PIXELS:
+        raise ImageRejected(
+            f"Images may be at most {settings.PROFILE_PICTURE_MAX_PIXELS} pixels.")
+
+
+# Formats an original is re-encoded in as uploaded; anything else (GIF,
+# BMP, TIFF...) becomes PNG.
+ORIGINAL_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+
+
+def render_variants(fileobj, variants=VARIANTS, quality=None, draft=True):
+    """Return ``{name: encoded bytes}`` for every variant of ``fileobj``."""
+    from PIL import Image, ImageOps
+
+    fmt, _ = output_format()
+    largest = max(variants.values())
+
+    with Image.open(fileobj) as source:
+        # JPEG only: decode at the smallest power-of-two scale that is still
+        # at least as large as the biggest variant.
+        if draft:
+            source.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(source)
+    return _encode_variants(image, variants, quality)
+
+
+def render_picture(fileobj, variants=VARIANTS, quality=None):
+    """
+    Decode ``fileobj`` once at full size and return ``(original, extension,
+    variants)``: the upload re-encoded without metadata, and the output of
+    ``render_variants``.
+
+    The orientation is applied first, so the picture still displays upright.
+    JPEG and WebP originals are saved at high quality to keep their detail.
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(fileobj) as source:
+            fmt = source.format if source.format in ORIGINAL_FORMATS else "PNG"
+            image = ImageOps.exif_transpose(source)
+    except OSError as exc:
+        raise ImageRejected("Upload a valid image.") from exc
+
+    original = image
+    if fmt == "JPEG":
+        original = original.convert("RGB")
+    elif original.mode not in ("RGB", "RGBA", "L", "LA"):
+        original = original.convert("RGBA")
+    original.info = {}
+    options = {"quality": 95} if fmt in ("JPEG", "WEBP") else {"optimize": True}
+    buffer = io.BytesIO()
+    original.save(buffer, fmt, **options)
+
+    rendered = _encode_variants(image, variants, quality)
+    return buffer.getvalue(), ORIGINAL_FORMATS[fmt], rendered
+
+
+def _encode_variants(image, variants, quality):
+    from PIL import Image
+
+    fmt, _ = output_format()
+    quality = quality or settings.PROFILE_PICTURE_QUALITY
+    keep_alpha = fmt == "WEBP" and image.mode in ("RGBA", "LA", "PA")
+    image = image.convert("RGBA" if keep_alpha else "RGB")
+    # Pillow only writes EXIF/ICC data passed to save(); clearing info makes
+    # sure nothing from the upload is carried along.
+    image.info = {}
+
+    options = {"quality": quality}
+    if fmt == "WEBP":
+        options["method"] = 4
+    else:
+        options["optimize"] = True
+
+    rendered = {}
+    for name, edge in sorted(variants.items(), key=lambda item: -item[1]):
+        # Each variant is downscaled from the previous, larger one.
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, fmt, **options)
+        rendered[name] = buffer.getvalue()
+    return rendered
+
+
+def variant_paths(user):
+    """Stored variant paths, if they were rendered from the current picture."""
+    variants = user.profile_picture_variants or {}
+    if not user.profile_picture or variants.get("source") != user.profile_picture.name:
+        return {}
+    return {name: path for name, path in variants.items() if name != "source"}
+
+
+def generate_variants(user_id):
+    """
+    Replace the user's current picture with a copy stripped of metadata and
+    render and store its variants.
+    """
+    user = (User.objects.filter(pk=user_id)
+            .only("profile_picture", "profile_picture_variants").first())
+    if user is None or not user.profile_picture:
+        return {}
+    uploaded = user.profile_picture.name
+
+    with user.profile_picture.open("rb") as handle:
+        original, original_extension, rendered = render_picture(handle)
+
+    stem = os.path.splitext(os.path.basename(uploaded))[0]
+    cleaned = default_storage.save(
+        f"{os.path.dirname(uploaded)}/{stem}.{original_extension}",
+        ContentFile(original))
+    _, extension = output_format()
+    stored = {
+        name: default_storage.save(
+            f"{VARIANT_DIR}/{user_id}/{stem}-{name}.{extension}",
+            ContentFile(data))
+        for name, data in rendered.items()
+    }
+
+    # Only swap in the results if the picture was not replaced meanwhile.
+    updated = User.objects.filter(pk=user_id, profile_picture=uploaded).update(
+        profile_picture=cleaned,
+        profile_picture_variants={"source": cleaned, **stored},
+        updated_at=timezone.now())
+    if updated:
+        bump_user_version(user_id)
+        stale = [uploaded, *(
+            path for name, path in (user.profile_picture_variants or {}).items()
+            if name != "source")]
+    else:
+        stale = [cleaned, *stored.values()]
+    for path in stale:
+        default_storage.delete(path)
+    return stored if updated else {}
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.PROFILE_PICTURE_WORKERS,
+                    thread_name_prefix="profile-picture")
+    return _executor
+
+
+def _generate_logged(user_id):
+    # The profile update has already committed; a bad image or a storage
+    # error must not turn it into a 500.
+    try:
+        generate_variants(user_id)
+    except Exception:
+        logger.exception("Failed to render profile picture variants for user %s",
+                         user_id)
+
+
+def _generate_in_background(user_id):
+    close_old_connections()
+    try:
+        _generate_logged(user_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(user_id):
+    """Render variants once the current transaction commits."""
+    if settings.PROFILE_PICTURE_PROCESSING == SYNC:
+        transaction.on_commit(lambda: _generate_logged(user_id))
+    else:
+        transaction.on_commit(
+            lambda: _get_executor().submit(_generate_in_background, user_id))
+
+
+@receiver(setting_changed)
+def _reset_executor(setting, **kwargs):
+    global _executor
+    if setting == "PROFILE_PICTURE_WORKERS":
+        with _executor_lock:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = None
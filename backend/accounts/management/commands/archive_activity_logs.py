@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.retention import archive_activity_logs, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Move activity logs older than the retention horizon into gzipped "
+        "NDJSON archives, deleting them in bounded batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int,
+            help="Retention horizon (defaults to ACTIVITY_LOG_RETENTION_DAYS).")
+        parser.add_argument(
+            "--archive-dir",
+            help="Output directory (defaults to ACTIVITY_LOG_ARCHIVE_DIR).")
+        parser.add_argument(
+            "--batch-size", type=int,
+            help="Rows per file and transaction "
+                 "(defaults to ACTIVITY_LOG_ARCHIVE_BATCH_SIZE).")
+        parser.add_argument(
+            "--max-batches", type=int,
+            help="Stop after this many batches, e.g. to fit a maintenance "
+                 "window.")
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Report how many rows would be archived without writing.")
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days is not None and days < 0:
+            raise CommandError("--days must not be negative.")
+        cutoff = retention_cutoff(days)
+        directory = options["archive_dir"] or settings.ACTIVITY_LOG_ARCHIVE_DIR
+
+        summary = archive_activity_logs(
+            cutoff,
+            directory=directory,
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+            max_batches=options["max_batches"],
+            progress=self.report_batch if options["verbosity"] > 1 else None,
+        )
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(
+                f"{summary['rows']} activity logs older than "
+                f"{cutoff.isoformat()} would be archived in "
+                f"{summary['batches']} batches (dry run, nothing written)."))
+            return
+
+        rate = summary["rows"] / summary["elapsed"] if summary["elapsed"] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {summary['rows']} activity logs older than "
+            f"{cutoff.isoformat()} into {summary['batches']} files in "
+            f"{directory} ({summary['bytes']} bytes, "
+            f"{summary['elapsed']:.2f}s, {rate:.0f} rows/sec)."))
+
+    def report_batch(self, summary):
+        rate = summary["rows"] / summary["elapsed"] if summary["elapsed"] else 0
+        self.stdout.write(
+            f"  batch {summary['batches']}: {summary['rows']} rows, "
+            f"{summary['bytes']} bytes, {rate:.0f} rows/sec "
+            f"-> {summary['files'][-1]}")
@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models
+from django.utils import timezone
+
+from accounts.benchmarking import (
+    benchmark_database, format_summary, measure, seed_activity_logs,
+    seed_users, summarize, write_json,
+)
+from accounts.models import UserActivityLog
+
+# The user_id FK index the table had before the composite indexes replaced
+# it; restored for the baseline phase so it measures the real starting point.
+BASELINE_INDEXES = [
+    models.Index(fields=["user"], name="activity_user_fk_bench_idx"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database with activity logs and compare query "
+        "plans and latencies of the activity log read paths with the "
+        "composite indexes and with the original user_id index instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--keepdb", action="store_true",
+                            help="Reuse a previously seeded benchmark database.")
+        parser.add_argument("--json", dest="json_path",
+                            help="Write results to this JSON file.")
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options["keepdb"]):
+            if not UserActivityLog.objects.exists():
+                self.stdout.write(
+                    f"Seeding {options['users']} users and "
+                    f"{options['rows']} activity logs...")
+                user_ids = seed_users(options["users"], options["batch_size"])
+                seed_activity_logs(
+                    options["rows"], user_ids, options["batch_size"])
+            results = self.run_benchmarks(options["repeat"])
+
+        for phase, queries in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(phase))
+            for name, result in queries.items():
+                self.stdout.write(
+                    f"  {name}: {format_summary(result['latency'])}")
+                for line in result["plan"].splitlines():
+                    self.stdout.write(f"    {line}")
+
+        if options["json_path"]:
+            write_json(options["json_path"], {
+                "vendor": connection.vendor,
+                "rows": options["rows"],
+                "users": options["users"],
+                "results": results,
+            })
+
+    def run_benchmarks(self, repeat):
+        user_id = (
+            UserActivityLog.objects.values_list("user_id", flat=True).first())
+        since = timezone.now() - timedelta(hours=24)
+        queries = {
+            "user_timeline": lambda: (
+                UserActivityLog.objects.filter(user_id=user_id)
+                .order_by("-timestamp")[:50]
+            ),
+            "logins_last_24h": lambda: UserActivityLog.objects.filter(
+                activity_type="login", timestamp__gte=since),
+            "latest_login": lambda: (
+                UserActivityLog.objects.filter(activity_type="login")
+                .order_by("-timestamp")
+                .values_list("timestamp", flat=True)[:1]
+            ),
+        }
+        evaluators = {
+            "user_timeline": lambda qs: list(qs),
+            "logins_last_24h": lambda qs: qs.count(),
+            "latest_login": lambda qs: list(qs),
+        }
+
+        def run_phase():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"ANALYZE {UserActivityLog._meta.db_table}")
+            return {
+                name: {
+                    "plan": build().explain(),
+                    "latency": summarize(
+                        measure(lambda: evaluators[name](build()), repeat)),
+                }
+                for name, build in queries.items()
+            }
+
+        indexes = UserActivityLog._meta.indexes
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(UserActivityLog, index)
+            for index in BASELINE_INDEXES:
+                editor.add_index(UserActivityLog, index)
+        baseline = run_phase()
+        with connection.schema_editor() as editor:
+            for index in BASELINE_INDEXES:
+                editor.remove_index(UserActivityLog, index)
+            for index in indexes:
+                editor.add_index(UserActivityLog, index)
+        with_indexes = run_phase()
+
+        return {"baseline": baseline, "with_indexes": with_indexes}
@@ -0,0 +1,297 @@
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.benchmarking import (
+    BENCH_PASSWORD, benchmark_database, benchmark_host, database_env,
+    format_summary, seed_activity_logs, seed_users, summarize, write_json,
+)
+from accounts.models import User
+
+# (name, server interface, URL prefix of the auth endpoints)
+TARGETS = {
+    "wsgi": ("wsgi", "/api/auth/"),
+    "asgi-sync": ("asgi", "/api/auth/"),
+    "asgi-async": ("asgi", "/api/async/auth/"),
+}
+SCENARIOS = ("login", "profile", "activity-logs", "mixed")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and latency with many concurrent connections for "
+        "the WSGI deployment (gunicorn gthread), the sync views under uvicorn "
+        "and the async views under /api/async/auth/ under uvicorn. Each "
+        "server runs in a subprocess against a seeded throwaway database. "
+        "Requires gunicorn and uvicorn."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--logs-per-user", type=int, default=10)
+        parser.add_argument("--concurrency", type=int, default=32,
+                            help="Open keep-alive connections.")
+        parser.add_argument("--duration", type=float, default=10.0,
+                            help="Seconds per target and scenario.")
+        parser.add_argument("--targets", default=",".join(TARGETS))
+        parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+        parser.add_argument(
+            "--threads", type=int, default=8,
+            help="gunicorn threads for the WSGI target.")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--json", dest="json_path")
+
+    def handle(self, *args, **options):
+        targets = options["targets"].split(",")
+        scenarios = options["scenarios"].split(",")
+        for name in targets:
+            if name not in TARGETS:
+                raise CommandError(f"Unknown target: {name}")
+            server = "gunicorn" if TARGETS[name][0] == "wsgi" else "uvicorn"
+            if importlib.util.find_spec(server) is None:
+                raise CommandError(
+                    f"The {name} target needs {server}: pip install {server}")
+        for name in scenarios:
+            if name not in SCENARIOS:
+                raise CommandError(f"Unknown scenario: {name}")
+
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            test_name = (os.path.join(directory, "bench.sqlite3")
+                         if connection.vendor == "sqlite" else None)
+            with benchmark_database(test_name=test_name) as name:
+                self.seed(options["users"], options["logs_per_user"])
+                env = self.server_env(name)
+                for target in targets:
+                    with self.server(target, env, options) as description:
+                        self.stdout.write(self.style.MIGRATE_HEADING(
+                            f"{target}: {description}"))
+                        results[target] = {}
+                        for scenario in scenarios:
+                            result = asyncio.run(
+                                self.run_scenario(target, scenario, options))
+                            results[target][scenario] = result
+                            self.report(scenario, result)
+
+        self.compare(results)
+        if options["json_path"]:
+            write_json(options["json_path"], {
+                "meta": {
+                    "vendor": connection.vendor,
+                    "concurrency": options["concurrency"],
+                    "duration": options["duration"],
+                },
+                "results": results,
+            })
+
+    def seed(self, users, logs_per_user):
+        seed_users(users)
+        seed_activity_logs(
+            users * logs_per_user, list(User.objects.values_list("id", flat=True)))
+        self.tokens = [
+            str(AccessToken.for_user(user))
+            for user in User.objects.order_by("pk")[:users]
+        ]
+        self.users = users
+
+    @staticmethod
+    def server_env(name):
+        """Point the server subprocess at the benchmark database."""
+        return {
+            **database_env(name),
+            "PYTHONUNBUFFERED": "1",
+            # Every login comes from 127.0.0.1.
+            "THROTTLE_RATE_LOGIN_IP": "",
+            "THROTTLE_RATE_LOGIN_IDENTIFIER": "",
+            "THROTTLE_RATE_REGISTER_IP": "",
+        }
+
+    def server(self, target, env, options):
+        interface, _ = TARGETS[target]
+        if interface == "wsgi":
+            command = [
+                sys.executable, "-m", "gunicorn", "user_management.wsgi:application",
+                "--worker-class", "gthread", "--workers", "1",
+                "--threads", str(options["threads"]),
+                "--bind", f"127.0.0.1:{options['port']}",
+            ]
+            description = f"gunicorn gthread, 1 worker, {options['threads']} threads"
+        else:
+            command = [
+                sys.executable, "-m", "uvicorn", "user_management.asgi:application",
+                "--port", str(options["port"]), "--log-level", "warning",
+                "--no-access-log",
+            ]
+            description = "uvicorn, 1 worker"
+        return RunningServer(command, env, settings.BASE_DIR,
+                             options["port"], description)
+
+    async def run_scenario(self, target, scenario, options):
+        _, prefix = TARGETS[target]
+        samples = {}
+        statuses = {}
+        deadline = time.perf_counter() + options["duration"]
+
+        async def worker(index):
+            client = await HttpClient.connect(options["port"])
+            try:
+                while time.perf_counter() < deadline:
+                    kind = scenario
+                    if scenario == "mixed":
+                        # One connection in four logs in; the rest read.
+                        kind = "login" if index % 4 == 0 else "profile"
+                    method, path, body, headers = self.build_request(
+                        prefix, kind)
+                    started = time.perf_counter()
+                    status_code = await client.request(method, path, body, headers)
+                    samples.setdefault(kind, []).append(
+                        time.perf_counter() - started)
+                    statuses[status_code] = statuses.get(status_code, 0) + 1
+            finally:
+                client.close()
+
+        await asyncio.gather(*(worker(i) for i in range(options["concurrency"])))
+        return {
+            "latency": {kind: summarize(values) for kind, values in samples.items()},
+            "throughput_rps": round(
+                sum(map(len, samples.values())) / options["duration"], 2),
+            "status_codes": {str(code): n for code, n in statuses.items()},
+        }
+
+    def build_request(self, prefix, kind):
+        index = random.randrange(self.users)
+        if kind == "login":
+            body = json.dumps({
+                "identifier": f"bench{index}@example.com",
+                "password": BENCH_PASSWORD,
+            }).encode()
+            return "POST", f"{prefix}login/", body, {
+                "Content-Type": "application/json"}
+        headers = {"Authorization": f"Bearer {self.tokens[index]}"}
+        if kind == "profile":
+            return "GET", f"{prefix}profile/", b"", headers
+        query = urlencode({"page_size": 20})
+        return "GET", f"{prefix}activity-logs/?{query}", b"", headers
+
+    def report(self, scenario, result):
+        for kind, latency in result["latency"].items():
+            self.stdout.write(
+                f"  {scenario:<14} {kind:<14} {format_summary(latency)}")
+        self.stdout.write(
+            f"  {scenario:<14} {'total':<14} rps={result['throughput_rps']} "
+            f"status={result['status_codes']}")
+
+    def compare(self, results):
+        baseline = results.get("wsgi")
+        if not baseline:
+            return
+        self.stdout.write(self.style.MIGRATE_HEADING("Throughput vs wsgi"))
+        for target, scenarios in results.items():
+            if target == "wsgi":
+                continue
+            for scenario, result in scenarios.items():
+                before = baseline.get(scenario, {}).get("throughput_rps")
+                if before:
+                    self.stdout.write(
+                        f"  {target:<11} {scenario:<14} "
+                        f"{result['throughput_rps'] / before:.2f}x")
+
+
+class RunningServer:
+    def __init__(self, command, env, cwd, port, description):
+        self.command = command
+        self.env = env
+        self.cwd = cwd
+        self.port = port
+        self.description = description
+        self.process = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(self.command, env=self.env, cwd=self.cwd)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f"Server exited: {' '.join(self.command)}")
+            try:
+                asyncio.run(self.ping())
+                return self.description
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise CommandError(f"Server did not start: {' '.join(self.command)}")
+
+    async def ping(self):
+        client = await HttpClient.connect(self.port)
+        try:
+            await client.request("GET", "/health/", b"", {})
+        finally:
+            client.close()
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class HttpClient:
+    """Minimal HTTP/1.1 keep-alive client; enough for JSON endpoints."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        return cls(reader, writer)
+
+    async def request(self, method, path, body, headers):
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {benchmark_host()}",
+            # Production settings redirect plain HTTP behind a proxy.
+            "X-Forwarded-Proto: https",
+            f"Content-Length: {len(body)}",
+            *(f"{name}: {value}" for name, value in headers.items()),
+        ]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Server closed the connection")
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            await self.reader.readexactly(
+                int(response_headers.get("content-length", 0)))
+        return int(status_line.split()[1])
+
+    def close(self):
+        self.writer.close()
@@ -0,0 +1,173 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.benchmarking import (
+    BENCH_PASSWORD, benchmark_database, benchmark_host, database_env,
+    seed_users, write_json,
+)
+from accounts.models import User
+
+PROFILES = ("user_management.settings", "user_management.settings_api")
+
+# Runs in a fresh interpreter: import the serverless entry point, then send
+# the same request twice through it.
+CHILD = """
+import io, json, os, sys, time
+started = time.perf_counter()
+from api.index import app
+imported = time.perf_counter()
+request = json.loads(os.environ["COLD_START_REQUEST"])
+
+def call():
+    body = request["body"].encode()
+    environ = {
+        "REQUEST_METHOD": request["method"], "PATH_INFO": request["path"],
+        "QUERY_STRING": "", "SERVER_NAME": request["host"],
+        "SERVER_PORT": "443", "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": request["host"], "HTTP_X_FORWARDED_PROTO": "https",
+        "REMOTE_ADDR": "127.0.0.1", "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)), "wsgi.input": io.BytesIO(body),
+        "wsgi.url_scheme": "https", "wsgi.errors": sys.stderr,
+        "wsgi.multithread": False, "wsgi.multiprocess": True,
+        "wsgi.run_once": False, "wsgi.version": (1, 0),
+        **{key: value for key, value in request["headers"].items()},
+    }
+    status = []
+    response = app(environ, lambda value, headers, *args: status.append(value))
+    try:
+        b"".join(response)
+    finally:
+        response.close()
+    return int(status[0].split()[0])
+
+status_code = call()
+first = time.perf_counter()
+call()
+warm = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "first_request_ms": (first - imported) * 1000,
+    "warm_request_ms": (warm - first) * 1000,
+    "status": status_code,
+    "modules": len(sys.modules),
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure serverless cold starts: start fresh interpreters that import "
+        "api/index.py under each settings profile and time the import, the "
+        "first request and a warm request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=10,
+                            help="Fresh processes per settings profile.")
+        parser.add_argument("--settings-modules", default=",".join(PROFILES))
+        parser.add_argument(
+            "--request", choices=("login", "profile", "health"), default="login",
+            help="First request: a login, an authenticated profile read or "
+                 "the health check.")
+        parser.add_argument("--json", dest="json_path")
+
+    def handle(self, *args, **options):
+        profiles = options["settings_modules"].split(",")
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            test_name = (os.path.join(directory, "bench.sqlite3")
+                         if connection.vendor == "sqlite" else None)
+            with benchmark_database(test_name=test_name) as name:
+                seed_users(1)
+                request = self.build_request(options["request"])
+                for profile in profiles:
+                    env = {
+                        **database_env(name),
+                        "DJANGO_SETTINGS_MODULE": profile,
+                        "COLD_START_REQUEST": json.dumps(request),
+                    }
+                    # Let the discarded first run write bytecode, so later
+                    # runs measure imports rather than compiling.
+                    env.pop("PYTHONDONTWRITEBYTECODE", None)
+                    self.run_child(env)
+                    runs = [self.run_child(env) for _ in range(options["runs"])]
+                    results[profile] = self.summarize(runs)
+                    self.report(profile, results[profile])
+
+        self.compare(results)
+        if options["json_path"]:
+            write_json(options["json_path"], {
+                "meta": {"request": options["request"], "runs": options["runs"]},
+                "results": results,
+            })
+
+    def build_request(self, kind):
+        request = {"host": benchmark_host(), "headers": {}, "body": ""}
+        if kind == "login":
+            request.update(method="POST", path="/api/auth/login/", body=json.dumps({
+                "identifier": "bench0@example.com", "password": BENCH_PASSWORD}))
+        elif kind == "profile":
+            token = AccessToken.for_user(User.objects.get(username="bench0"))
+            request.update(method="GET", path="/api/auth/profile/")
+            request["headers"]["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        else:
+            request.update(method="GET", path="/health/")
+        return request
+
+    def run_child(self, env):
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-c", CHILD], env=env, cwd=settings.BASE_DIR,
+            capture_output=True, text=True)
+        elapsed = (time.perf_counter() - started) * 1000
+        if completed.returncode:
+            raise CommandError(completed.stderr)
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if result["status"] >= 400:
+            raise CommandError(
+                f"First request returned {result['status']}:\n{completed.stderr}")
+        result["process_ms"] = elapsed
+        return result
+
+    @staticmethod
+    def summarize(runs):
+        summary = {
+            key: round(statistics.median(run[key] for run in runs), 1)
+            for key in ("import_ms", "first_request_ms", "warm_request_ms",
+                        "process_ms")
+        }
+        summary["import_and_first_request_ms"] = round(
+            statistics.median(
+                run["import_ms"] + run["first_request_ms"] for run in runs), 1)
+        summary["modules"] = runs[-1]["modules"]
+        return summary
+
+    def report(self, profile, summary):
+        self.stdout.write(self.style.MIGRATE_HEADING(profile))
+        self.stdout.write(
+            f"  import={summary['import_ms']}ms "
+            f"first_request={summary['first_request_ms']}ms "
+            f"warm_request={summary['warm_request_ms']}ms "
+            f"process={summary['process_ms']}ms modules={summary['modules']}")
+
+    def compare(self, results):
+        baseline = results.get(PROFILES[0])
+        if not baseline:
+            return
+        for profile, summary in results.items():
+            if profile == PROFILES[0]:
+                continue
+            key = "import_and_first_request_ms"
+            self.stdout.write(
+                f"{profile}: import + first request "
+                f"{summary[key] / baseline[key]:.2f}x of {PROFILES[0]}")
@@ -0,0 +1,57 @@
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from accounts.benchmarking import (
+    format_summary, measure, summarize, wsgi_request, write_json,
+)
+from user_management.settings import database_connection_options
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare request latency through the WSGI handler for each "
+        "DB_CONNECTION_MODE against the configured database. Point "
+        "DATABASE_URL at a local Postgres (and at a pooler for 'pooled')."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--modes", default="per_request,persistent,pooled",
+            help="Comma-separated connection modes to compare.")
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--conn-max-age", type=int, default=60)
+        parser.add_argument("--path", default="/health/",
+                            help="Read-only endpoint to request.")
+        parser.add_argument("--json", dest="json_path")
+
+    def handle(self, *args, **options):
+        app = WSGIHandler()
+        original = dict(connection.settings_dict)
+        results = {}
+
+        try:
+            for mode in options["modes"].split(","):
+                connection.close()
+                connection.settings_dict.update(
+                    database_connection_options(mode, options["conn_max_age"]))
+
+                def request():
+                    status_code, _ = wsgi_request(app, "GET", options["path"])
+                    if status_code != 200:
+                        raise RuntimeError(
+                            f"{options['path']} returned {status_code}")
+
+                results[mode] = summarize(measure(request, options["requests"]))
+                self.stdout.write(f"{mode}: {format_summary(results[mode])}")
+        finally:
+            connection.close()
+            connection.settings_dict.clear()
+            connection.settings_dict.update(original)
+
+        if options["json_path"]:
+            write_json(options["json_path"], {
+                "vendor": connection.vendor,
+                "path": options["path"],
+                "results": results,
+            })
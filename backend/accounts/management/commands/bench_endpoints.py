@@ -0,0 +1,231 @@
+import json
+import subprocess
+import time
+from itertools import count
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.benchmarking import (
+    BENCH_PASSWORD, benchmark_database, benchmark_host, format_summary,
+    seed_activity_logs, seed_users, summarize, throttle_rates, wsgi_request,
+    write_json,
+)
+from accounts.models import User
+from accounts.stats import reconcile_user_counters
+from accounts.tokens import RefreshToken
+
+CLIENTS = ("test", "wsgi")
+ENDPOINTS = (
+    "register", "login", "refresh", "profile", "activity-logs", "users",
+    "stats",
+)
+# Endpoints dominated by password hashing get fewer samples by default.
+HASHING_ENDPOINTS = {"register", "login"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the auth API endpoints through the Django test client and "
+        "the WSGI handler against a seeded throwaway database, reporting "
+        "throughput, latency percentiles and queries per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--logs-per-user", type=int, default=20)
+        parser.add_argument("--requests", type=int, default=200,
+                            help="Requests per endpoint.")
+        parser.add_argument("--hashing-requests", type=int, default=20,
+                            help="Requests for register and login.")
+        parser.add_argument("--clients", default=",".join(CLIENTS))
+        parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+        parser.add_argument("--keepdb", action="store_true")
+        parser.add_argument("--json", dest="json_path",
+                            help="Write results to this JSON file.")
+        parser.add_argument("--compare", dest="baseline_path",
+                            help="Diff results against a previous JSON file.")
+
+    def handle(self, *args, **options):
+        clients = options["clients"].split(",")
+        endpoints = options["endpoints"].split(",")
+        for name in clients:
+            if name not in CLIENTS:
+                raise CommandError(f"Unknown client: {name}")
+        for name in endpoints:
+            if name not in ENDPOINTS:
+                raise CommandError(f"Unknown endpoint: {name}")
+
+        with benchmark_database(keepdb=options["keepdb"]), throttle_rates():
+            self.seed(options["users"], options["logs_per_user"])
+            self.admin = User.objects.get(username="bench-admin")
+            self.member = User.objects.filter(role="user").order_by("pk").first()
+            self.registrations = count()
+            results = {
+                client: {
+                    endpoint: self.run_endpoint(client, endpoint, options)
+                    for endpoint in endpoints
+                }
+                for client in clients
+            }
+
+        payload = {
+            "meta": {
+                "commit": self.git_commit(),
+                "vendor": connection.vendor,
+                "users": options["users"],
+                "logs_per_user": options["logs_per_user"],
+                "generated_at": timezone.now().isoformat(),
+            },
+            "results": results,
+        }
+        self.report(results)
+        if options["baseline_path"]:
+            self.compare(options["baseline_path"], results)
+        if options["json_path"]:
+            write_json(options["json_path"], payload)
+
+    def seed(self, users, logs_per_user):
+        if User.objects.filter(username="bench-admin").exists():
+            return
+        self.stdout.write(
+            f"Seeding {users} users with {logs_per_user} activity logs each...")
+        seed_users(1, prefix="bench-admin-", role="admin")
+        User.objects.filter(username="bench-admin-0").update(
+            username="bench-admin")
+        user_ids = seed_users(users)
+        seed_activity_logs(users * logs_per_user, user_ids)
+        reconcile_user_counters()
+
+    def build_request(self, endpoint):
+        """Return ``(method, path, data, user)`` for one request."""
+        if endpoint == "register":
+            index = next(self.registrations)
+            return "POST", "/api/auth/register/", {
+                "email": f"bench-register-{index}-{time.time_ns()}@example.com",
+                "username": f"bench-register-{index}-{time.time_ns()}",
+                "first_name": "Bench",
+                "last_name": "Register",
+                "password": BENCH_PASSWORD,
+                "password_confirm": BENCH_PASSWORD,
+            }, None
+        if endpoint == "login":
+            return "POST", "/api/auth/login/", {
+                "identifier": self.member.email,
+                "password": BENCH_PASSWORD,
+            }, None
+        if endpoint == "refresh":
+            # Rotation blacklists the presented token, so mint one per request.
+            return "POST", "/api/auth/refresh/", {
+                "refresh": str(RefreshToken.for_user(self.member)),
+            }, None
+        if endpoint == "profile":
+            return "GET", "/api/auth/profile/", None, self.member
+        if endpoint == "activity-logs":
+            return "GET", "/api/auth/activity-logs/", None, self.member
+        if endpoint == "users":
+            return "GET", "/api/auth/users/", None, self.admin
+        return "GET", "/api/auth/stats/", None, self.admin
+
+    def run_endpoint(self, client_name, endpoint, options):
+        repeat = (options["hashing_requests"] if endpoint in HASHING_ENDPOINTS
+                  else options["requests"])
+        send = self.test_client_sender() if client_name == "test" \
+            else self.wsgi_sender()
+
+        samples, queries, statuses = [], [], {}
+        started = time.perf_counter()
+        for _ in range(repeat):
+            method, path, data, user = self.build_request(endpoint)
+            headers = {}
+            if user is not None:
+                headers["HTTP_AUTHORIZATION"] = f"Bearer {AccessToken.for_user(user)}"
+            with CaptureQueriesContext(connection) as captured:
+                request_started = time.perf_counter()
+                status_code = send(method, path, data, headers)
+                samples.append(time.perf_counter() - request_started)
+            queries.append(len(captured))
+            statuses[status_code] = statuses.get(status_code, 0) + 1
+        elapsed = time.perf_counter() - started
+
+        return {
+            "latency": summarize(samples),
+            "throughput_rps": round(repeat / elapsed, 2),
+            "queries_mean": round(sum(queries) / len(queries), 2),
+            "queries_max": max(queries),
+            "status_codes": {str(code): n for code, n in statuses.items()},
+        }
+
+    def test_client_sender(self):
+        client = Client(HTTP_HOST=benchmark_host())
+
+        def send(method, path, data, headers):
+            if method == "GET":
+                response = client.get(path, secure=True, **headers)
+            else:
+                response = client.post(
+                    path, json.dumps(data), content_type="application/json",
+                    secure=True, **headers)
+            return response.status_code
+
+        return send
+
+    def wsgi_sender(self):
+        app = WSGIHandler()
+
+        def send(method, path, data, headers):
+            status_code, _ = wsgi_request(app, method, path, data, **headers)
+            return status_code
+
+        return send
+
+    def report(self, results):
+        for client, endpoints in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{client} client"))
+            for endpoint, result in endpoints.items():
+                self.stdout.write(
+                    f"  {endpoint:<14} {format_summary(result['latency'])} "
+                    f"rps={result['throughput_rps']} "
+                    f"queries={result['queries_mean']} "
+                    f"status={result['status_codes']}")
+            if "login" in endpoints and "refresh" in endpoints:
+                login_ms = endpoints["login"]["latency"]["p50_ms"]
+                refresh_ms = endpoints["refresh"]["latency"]["p50_ms"]
+                if login_ms:
+                    self.stdout.write(
+                        f"  refresh p50 is {refresh_ms / login_ms:.1%} of login")
+
+    def compare(self, baseline_path, results):
+        with open(baseline_path, encoding="utf-8") as handle:
+            baseline = json.load(handle)["results"]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Compared with {baseline_path}"))
+        for client, endpoints in results.items():
+            for endpoint, result in endpoints.items():
+                before = baseline.get(client, {}).get(endpoint)
+                if not before:
+                    continue
+                changes = []
+                for key in ("p50_ms", "p95_ms", "p99_ms"):
+                    old, new = before["latency"][key], result["latency"][key]
+                    change = (new - old) / old * 100 if old else 0.0
+                    changes.append(f"{key} {old}->{new} ({change:+.1f}%)")
+                changes.append(
+                    f"queries {before['queries_mean']}->{result['queries_mean']}")
+                self.stdout.write(f"  {client}/{endpoint}: " + ", ".join(changes))
+
+    @staticmethod
+    def git_commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
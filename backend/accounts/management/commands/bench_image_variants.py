@@ -0,0 +1,81 @@
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageDraw
+
+from accounts.benchmarking import format_summary, measure, summarize, write_json
+from accounts.images import VARIANTS, output_format, render_variants
+
+
+def synthetic_photo(width, height):
+    """A JPEG with enough detail that encoding is not trivially cheap."""
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    for i in range(0, width, max(1, width // 40)):
+        draw.line((i, 0, width - i, height), fill=(i % 256, 80, 160), width=3)
+    exif = Image.Exif()
+    exif[0x0112] = 1  # Orientation
+    exif[0x010F] = "Benchmark Camera"  # Make
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=92, exif=exif)
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        "Time rendering of profile picture variants from a synthetic photo, "
+        "with and without JPEG draft decoding, and report images per second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--width", type=int, default=4000)
+        parser.add_argument("--height", type=int, default=3000)
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument(
+            "--workers", type=int, default=2,
+            help="Threads used for the concurrent throughput run.")
+        parser.add_argument("--json", dest="json_path")
+
+    def handle(self, *args, **options):
+        source = synthetic_photo(options["width"], options["height"])
+        fmt, _ = output_format()
+        self.stdout.write(
+            f"Source: {options['width']}x{options['height']} JPEG, "
+            f"{len(source) // 1024} KB -> {fmt} variants "
+            f"{', '.join(f'{name}={edge}' for name, edge in VARIANTS.items())}")
+
+        results = {}
+        for label, draft in (("full_decode", False), ("draft_decode", True)):
+            summary = summarize(measure(
+                lambda: render_variants(io.BytesIO(source), draft=draft),
+                options["repeat"],
+            ))
+            per_second = round(1000 / summary["mean_ms"], 2)
+            results[label] = {"render": summary, "images_per_second": per_second}
+            self.stdout.write(
+                f"{label}: {format_summary(summary)} -> {per_second} images/sec")
+
+        workers = options["workers"]
+        count = options["repeat"] * workers
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(
+                lambda _: render_variants(io.BytesIO(source)), range(count)))
+        per_second = round(count / (time.perf_counter() - started), 2)
+        results["concurrent"] = {"workers": workers, "images_per_second": per_second}
+        self.stdout.write(
+            f"concurrent ({workers} workers): {per_second} images/sec")
+
+        sizes = {
+            name: len(data)
+            for name, data in render_variants(io.BytesIO(source)).items()
+        }
+        results["variant_bytes"] = sizes
+        self.stdout.write(
+            "Variant sizes: "
+            + ", ".join(f"{name}={size / 1024:.1f} KB" for name, size in sizes.items()))
+
+        if options["json_path"]:
+            write_json(options["json_path"], {"results": results})
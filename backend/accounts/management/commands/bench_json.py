@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from accounts import compression
+from accounts.benchmarking import (
+    benchmark_database, format_summary, measure, seed_activity_logs,
+    seed_users, summarize, write_json,
+)
+from accounts.models import User, UserActivityLog
+from accounts.renderers import FastJSONRenderer, orjson
+from accounts.serializers import UserActivityLogSerializer, UserProfileSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Serialize activity logs and user profiles, then compare DRF's JSON "
+        "renderer with the orjson one and gzip with brotli on the result."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, nargs="+", default=[1000, 10000],
+            help="Payload sizes, in rows, to benchmark.")
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--keepdb", action="store_true",
+                            help="Reuse a previously seeded benchmark database.")
+        parser.add_argument("--json", dest="json_path",
+                            help="Write results to this JSON file.")
+
+    def handle(self, *args, **options):
+        largest = max(options["rows"])
+        with benchmark_database(keepdb=options["keepdb"]):
+            if User.objects.count() < largest:
+                self.stdout.write(
+                    f"Seeding {largest} users and activity logs...")
+                user_ids = seed_users(largest - User.objects.count())
+                seed_activity_logs(largest, user_ids)
+            payloads = {
+                "activity_logs": (
+                    UserActivityLogSerializer,
+                    UserActivityLog.objects.select_related("user")
+                    .order_by("-timestamp"),
+                ),
+                "user_profiles": (UserProfileSerializer, User.objects.order_by("id")),
+            }
+            results = {
+                f"{name}_{rows}": self.run_benchmarks(
+                    serializer_class, list(queryset[:rows]), options["repeat"])
+                for rows in options["rows"]
+                for name, (serializer_class, queryset) in payloads.items()
+            }
+
+        self.stdout.write(
+            f"orjson: {'yes' if orjson else 'no'}, "
+            f"brotli: {'yes' if compression.brotli else 'no'}")
+        for name, result in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for step, summary in result["timings"].items():
+                self.stdout.write(f"  {step}: {format_summary(summary)}")
+            self.stdout.write(
+                "  bytes: "
+                + ", ".join(f"{key}={value}" for key, value in result["bytes"].items()))
+
+        if options["json_path"]:
+            write_json(options["json_path"], {
+                "orjson": bool(orjson),
+                "brotli": bool(compression.brotli),
+                "results": results,
+            })
+
+    def run_benchmarks(self, serializer_class, instances, repeat):
+        data = serializer_class(instances, many=True).data
+        body = FastJSONRenderer().render(data)
+        if body != JSONRenderer().render(data):
+            raise AssertionError("FastJSONRenderer output differs from DRF's")
+
+        steps = {
+            "serialize": lambda: serializer_class(instances, many=True).data,
+            "render_drf": lambda: JSONRenderer().render(data),
+            "render_fast": lambda: FastJSONRenderer().render(data),
+            "gzip": lambda: compression.compress("gzip", body),
+        }
+        sizes = {"raw": len(body), "gzip": len(compression.compress("gzip", body))}
+        if compression.brotli:
+            steps["brotli"] = lambda: compression.compress("br", body)
+            sizes["brotli"] = len(compression.compress("br", body))
+        return {
+            "rows": len(instances),
+            "timings": {
+                step: summarize(measure(func, repeat)) for step, func in steps.items()
+            },
+            "bytes": sizes,
+        }
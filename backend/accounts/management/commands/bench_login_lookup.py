@@ -0,0 +1,79 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from accounts.benchmarking import (
+    benchmark_database, format_summary, measure, seed_users, summarize,
+    write_json,
+)
+from accounts.models import User
+from accounts.serializers import find_user_by_identifier
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure login identifier lookup latency as the user table grows, "
+        "comparing the indexed lookup with the previous iexact OR query."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", default="1000,10000,100000,1000000",
+            help="Comma-separated user counts to measure at.")
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--legacy-repeat", type=int, default=10,
+                            help="Samples for the unindexed OR query.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--keepdb", action="store_true")
+        parser.add_argument("--json", dest="json_path")
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options["sizes"].split(","))
+        rng = random.Random(0)
+        results = []
+
+        with benchmark_database(keepdb=options["keepdb"]):
+            for size in sizes:
+                existing = User.objects.count()
+                if existing < size:
+                    self.stdout.write(f"Seeding users up to {size}...")
+                    seed_users(size - existing, options["batch_size"])
+                if connection.vendor == "postgresql":
+                    with connection.cursor() as cursor:
+                        cursor.execute(f"ANALYZE {User._meta.db_table}")
+
+                def sample_identifier(field):
+                    index = rng.randrange(size)
+                    if field == "email":
+                        return f"BENCH{index}@EXAMPLE.COM"
+                    return f"Bench{index}"
+
+                result = {"users": size}
+                for field in ("email", "username"):
+                    result[f"indexed_{field}"] = summarize(measure(
+                        lambda: find_user_by_identifier(
+                            sample_identifier(field)),
+                        options["repeat"],
+                    ))
+                result["legacy_or_query"] = summarize(measure(
+                    lambda: self.legacy_lookup(sample_identifier("email")),
+                    options["legacy_repeat"],
+                ))
+                results.append(result)
+
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{size} users"))
+                for key, summary in result.items():
+                    if key != "users":
+                        self.stdout.write(f"  {key}: {format_summary(summary)}")
+
+        if options["json_path"]:
+            write_json(options["json_path"], {
+                "vendor": connection.vendor, "results": results})
+
+    @staticmethod
+    def legacy_lookup(identifier):
+        return User.objects.filter(
+            Q(email__iexact=identifier) | Q(username__iexact=identifier)
+        ).first()
@@ -0,0 +1,162 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from itertools import count
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+from accounts.benchmarking import (
+    BENCH_PASSWORD, benchmark_database, format_summary, seed_users, summarize,
+    throttle_rates, wsgi_request, write_json,
+)
+
+LOGIN_PATH = "/api/auth/login/"
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test login during a credential stuffing burst: measure the "
+        "latency of legitimate logins with no attack, under attack without "
+        "throttling and under attack with the configured throttles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument(
+            "--attackers", type=int, default=4,
+            help="Threads sending wrong passwords.")
+        parser.add_argument(
+            "--attack-rate", type=float, default=100.0,
+            help="Attempts per second the attackers try to send in total; "
+                 "unthrottled, password hashing caps them well below this.")
+        parser.add_argument(
+            "--attack-ips", type=int, default=2,
+            help="Distinct client addresses the attack is spread over.")
+        parser.add_argument("--duration", type=float, default=20.0,
+                            help="Seconds per phase.")
+        parser.add_argument(
+            "--interval", type=float, default=0.25,
+            help="Seconds between legitimate logins (each as another user).")
+        parser.add_argument(
+            "--rate", action="append", default=[], metavar="SCOPE=RATE",
+            help="Override a throttle rate for the throttled phase, e.g. "
+                 "login_ip=5/min. May be repeated.")
+        parser.add_argument("--json", dest="json_path")
+
+    def handle(self, *args, **options):
+        self.app = WSGIHandler()
+        configured = {
+            **settings.REST_FRAMEWORK.get("DEFAULT_THROTTLE_RATES", {}),
+            **dict(rate.split("=", 1) for rate in options["rate"]),
+        }
+        # Every failed or throttled attempt would otherwise log a warning.
+        logging.getLogger("django.request").setLevel(logging.ERROR)
+        with tempfile.TemporaryDirectory() as directory:
+            test_name = (os.path.join(directory, "bench.sqlite3")
+                         if connection.vendor == "sqlite" else None)
+            with benchmark_database(test_name=test_name):
+                results = self.run_phases(options, configured)
+
+        baseline = results["baseline"]["legitimate"]
+        if baseline.get("count"):
+            for phase in ("attack_unthrottled", "attack_throttled"):
+                latency = results[phase]["legitimate"]
+                ratios = ", ".join(
+                    f"{key} {latency.get(key, 0) / baseline[key]:.1f}x"
+                    for key in ("p50_ms", "p95_ms"))
+                self.stdout.write(
+                    f"{phase}: legitimate latency vs baseline: {ratios}")
+        if options["json_path"]:
+            write_json(options["json_path"], {
+                "meta": {"throttle_rates": configured}, "results": results})
+
+    def run_phases(self, options, configured):
+        seed_users(options["users"])
+        results = {}
+        for phase, attackers, rates in (
+            ("baseline", 0, {}),
+            ("attack_unthrottled", options["attackers"], {}),
+            ("attack_throttled", options["attackers"], configured),
+        ):
+            with throttle_rates(**rates):
+                cache.clear()
+                results[phase] = self.run_phase(attackers, options)
+            self.report(phase, results[phase])
+        return results
+
+    def run_phase(self, attackers, options):
+        stop = threading.Event()
+        attack_statuses = {}
+        lock = threading.Lock()
+
+        pause = attackers / options["attack_rate"] if attackers else 0
+
+        def attack(worker):
+            sent = count()
+            try:
+                while not stop.is_set():
+                    n = next(sent)
+                    started = time.perf_counter()
+                    status_code = self.login(
+                        f"bench{(worker * 7919 + n) % options['users']}@example.com",
+                        "wrong-password",
+                        f"203.0.113.{(worker + n) % options['attack_ips'] + 1}")
+                    with lock:
+                        attack_statuses[status_code] = (
+                            attack_statuses.get(status_code, 0) + 1)
+                    stop.wait(max(0.0, pause - (time.perf_counter() - started)))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=attack, args=(worker,))
+                   for worker in range(attackers)]
+        for thread in threads:
+            thread.start()
+
+        samples, statuses = [], {}
+        deadline = time.perf_counter() + options["duration"]
+        for n in count():
+            started = time.perf_counter()
+            if started >= deadline:
+                break
+            status_code = self.login(
+                f"bench{n % options['users']}@example.com", BENCH_PASSWORD,
+                f"10.0.{n // 250 % 250}.{n % 250 + 1}")
+            samples.append(time.perf_counter() - started)
+            statuses[status_code] = statuses.get(status_code, 0) + 1
+            time.sleep(max(0.0, options["interval"] - samples[-1]))
+
+        stop.set()
+        for thread in threads:
+            thread.join()
+        attack_total = sum(attack_statuses.values())
+        return {
+            "legitimate": summarize(samples),
+            "legitimate_status_codes": {str(k): v for k, v in statuses.items()},
+            "attack_requests_per_second": round(
+                attack_total / options["duration"], 2),
+            "attack_status_codes": {
+                str(k): v for k, v in attack_statuses.items()},
+        }
+
+    def login(self, identifier, password, ip):
+        status_code, _ = wsgi_request(
+            self.app, "POST", LOGIN_PATH,
+            {"identifier": identifier, "password": password},
+            REMOTE_ADDR=ip)
+        return status_code
+
+    def report(self, phase, result):
+        self.stdout.write(self.style.MIGRATE_HEADING(phase))
+        self.stdout.write(
+            f"  legitimate  {format_summary(result['legitimate'])} "
+            f"status={result['legitimate_status_codes']}")
+        self.stdout.write(
+            f"  attack      {result['attack_requests_per_second']} req/s "
+            f"status={result['attack_status_codes']}")
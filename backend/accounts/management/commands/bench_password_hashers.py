@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from accounts.benchmarking import (
+    BENCH_PASSWORD, format_summary, measure, summarize, write_json,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time password verification for each configured hasher at its "
+        "current cost settings and report logins per second per core."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hashers", default=",".join(settings.PASSWORD_HASHER_CHOICES),
+            help="Comma-separated PASSWORD_HASHER names to compare.")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--json", dest="json_path")
+
+    def handle(self, *args, **options):
+        results = {}
+        for name in options["hashers"].split(","):
+            hasher = import_string(settings.PASSWORD_HASHER_CHOICES[name])()
+            try:
+                encoded = hasher.encode(BENCH_PASSWORD, hasher.salt())
+            except ValueError as exc:
+                # Argon2 without argon2-cffi installed, for example.
+                self.stdout.write(self.style.WARNING(f"{name}: skipped ({exc})"))
+                continue
+
+            summary = summarize(measure(
+                lambda: hasher.verify(BENCH_PASSWORD, encoded),
+                options["repeat"],
+            ))
+            logins_per_second = round(1000 / summary["mean_ms"], 2)
+            results[name] = {
+                "verify": summary,
+                "logins_per_second_per_core": logins_per_second,
+                "parameters": {
+                    str(key): value
+                    for key, value in hasher.safe_summary(encoded).items()
+                },
+            }
+            self.stdout.write(
+                f"{name}: {format_summary(summary)} "
+                f"-> {logins_per_second} logins/sec/core")
+
+        if options["json_path"]:
+            write_json(options["json_path"], {"results": results})
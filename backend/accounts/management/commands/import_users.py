@@ -0,0 +1,111 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.provisioning import (
+    FORMATS, UserImporter, create_hashing_pool, detect_format,
+    load_checkpoint, read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create users from a CSV or NDJSON file with batched validation, "
+        "parallel password hashing and resumable checkpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file to import.")
+        parser.add_argument("--format", choices=FORMATS,
+                            help="Input format (guessed from the extension).")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Rows validated and inserted per transaction.")
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help="Password hashing processes; 0 hashes in this process.")
+        parser.add_argument(
+            "--checkpoint",
+            help="Checkpoint file (defaults to <path>.checkpoint.json).")
+        parser.add_argument(
+            "--resume", action="store_true",
+            help="Skip rows already consumed according to the checkpoint.")
+        parser.add_argument(
+            "--rejects",
+            help="Append rejected rows (without passwords) to this NDJSON "
+                 "file.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"No such file: {path}")
+        fmt = options["format"] or detect_format(path)
+        checkpoint_path = options["checkpoint"] or f"{path}.checkpoint.json"
+
+        state = None
+        if options["resume"]:
+            state = load_checkpoint(checkpoint_path)
+            if state is None:
+                raise CommandError(f"No checkpoint at {checkpoint_path}")
+            self.stdout.write(
+                f"Resuming after {state['consumed']} rows "
+                f"({state['created']} created, {state['rejected']} rejected).")
+        elif os.path.exists(checkpoint_path):
+            raise CommandError(
+                f"{checkpoint_path} exists; pass --resume to continue that "
+                "import or delete it to start over.")
+
+        rejects = None
+        if options["rejects"]:
+            rejects = open(options["rejects"], "a", encoding="utf-8")
+        executor = create_hashing_pool(options["workers"])
+        started = time.perf_counter()
+        try:
+            importer = UserImporter(
+                batch_size=options["batch_size"],
+                executor=executor,
+                checkpoint_path=checkpoint_path,
+                state=state,
+                on_reject=self.reject_writer(rejects),
+                on_batch=(self.report_batch(started)
+                          if options["verbosity"] > 1 else None),
+            )
+            with open(path, encoding="utf-8", newline="") as handle:
+                state = importer.run(read_rows(handle, fmt))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if rejects is not None:
+                rejects.close()
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {state['created']} users, rejected {state['rejected']} "
+            f"rows in {elapsed:.2f}s."))
+        for reason, count in sorted(
+                state["reasons"].items(), key=lambda item: -item[1]):
+            self.stdout.write(f"  {count:>8}  {reason}")
+
+    @staticmethod
+    def reject_writer(handle):
+        if handle is None:
+            return None
+
+        def write(line_number, row, errors):
+            handle.write(json.dumps(
+                {"line": line_number, "row": row, "errors": errors}) + "\n")
+
+        return write
+
+    def report_batch(self, started):
+        def report(state):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"  {state['consumed']} rows read, {state['created']} created, "
+                f"{state['rejected']} rejected "
+                f"({state['consumed'] / elapsed:.0f} rows/sec)")
+
+        return report
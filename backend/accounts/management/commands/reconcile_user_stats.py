@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from accounts.stats import reconcile_user_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed user counters from the user table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Report drift without writing corrected counters.")
+
+    def handle(self, *args, **options):
+        drift = reconcile_user_counters(dry_run=options["dry_run"])
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("User counters are in sync."))
+            return
+
+        for key, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"{key}: stored={stored} actual={actual}")
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(
+                f"{len(drift)} counters drifted (dry run, nothing written)."))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Reconciled {len(drift)} counters."))
@@ -0,0 +1,112 @@
+"""
+In-process request metrics.
+
+``RequestMetricsMiddleware`` records sampled requests into the histograms
+below, labelled by URL name. ``render_prometheus`` exposes them in the
+Prometheus text format at ``/metrics/``, followed by the activity log
+writer's counters from ``render_activity_log``. Each worker process keeps its
+own histograms and writer; scrape every worker, or aggregate on the
+Prometheus side.
+"""
+
+import threading
+from bisect import bisect_left
+
+DURATION_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+    10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+METRICS = {
+    "request_duration_seconds": (
+        "Total time spent handling the request.", DURATION_BUCKETS),
+    "db_queries": ("SQL queries executed per request.", QUERY_BUCKETS),
+    "db_duration_seconds": (
+        "Time spent executing SQL per request.", DURATION_BUCKETS),
+    "serialization_seconds": (
+        "Time spent rendering the response body.", DURATION_BUCKETS),
+}
+PREFIX = "ums_"
+# ActivityLogWriter.stats() keys: (type, help).
+ACTIVITY_LOG_METRICS = {
+    "enqueued": ("counter", "Activity log events accepted."),
+    "written": ("counter", "Activity log events written."),
+    "dropped": ("counter", "Activity log events dropped."),
+    "delayed": ("counter", "Events written later than the flush interval."),
+    "flushes": ("counter", "Buffered activity log flushes."),
+    "pending": ("gauge", "Activity log events waiting to be written."),
+    "max_delay_seconds": (
+        "gauge", "Longest time an event waited in the buffer."),
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, bucket_count in zip((*self.buckets, "+Inf"), self.counts):
+            total += bucket_count
+            yield bound, total
+
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+def observe(view, values):
+    """Record one request: ``values`` maps metric names to observations."""
+    with _lock:
+        for metric, value in values.items():
+            key = (metric, view)
+            histogram = _histograms.get(key)
+            if histogram is None:
+                histogram = _histograms[key] = Histogram(METRICS[metric][1])
+            histogram.observe(value)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def render_prometheus():
+    lines = []
+    with _lock:
+        for metric, (help_text, _) in METRICS.items():
+            name = PREFIX + metric
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (key_metric, view), histogram in sorted(_histograms.items()):
+                if key_metric != metric:
+                    continue
+                label = f'view="{view}"'
+                for bound, total in histogram.cumulative():
+                    lines.append(f'{name}_bucket{{{label},le="{bound}"}} {total}')
+                lines.append(f"{name}_sum{{{label}}} {histogram.sum}")
+                lines.append(f"{name}_count{{{label}}} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+def render_activity_log(stats):
+    """``ActivityLogWriter.stats()`` in the Prometheus text format."""
+    lines = []
+    label = f'mode="{stats["mode"]}"'
+    for key, (kind, help_text) in ACTIVITY_LOG_METRICS.items():
+        name = f"{PREFIX}activity_log_{key}"
+        if kind == "counter":
+            name += "_total"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name}{{{label}}} {stats[key]}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,106 @@
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+
+class QueryTracker:
+    """``execute_wrapper`` that counts queries and their total duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class RequestMetricsMiddleware:
+    """
+    Record per-view query count, DB time, render time and total time for a
+    ``REQUEST_METRICS_SAMPLE_RATE`` fraction of requests.
+
+    Runs in sync or async mode to match the handler, so under ASGI it does
+    not force the whole middleware chain onto a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        tracker = QueryTracker()
+        request._metrics_render_time = 0.0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            self.track_queries(stack, tracker)
+            response = self.get_response(request)
+        self.record(request, tracker, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        tracker = QueryTracker()
+        request._metrics_render_time = 0.0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            # Connections are context-local, so these are the ones the async
+            # ORM's worker thread uses for this request.
+            self.track_queries(stack, tracker)
+            response = await self.get_response(request)
+        self.record(request, tracker, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def sampled():
+        rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    @staticmethod
+    def track_queries(stack, tracker):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(tracker))
+
+    @staticmethod
+    def record(request, tracker, total):
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name if match else None) or "unresolved"
+        metrics.observe(view, {
+            "request_duration_seconds": total,
+            "db_queries": tracker.count,
+            "db_duration_seconds": tracker.duration,
+            "serialization_seconds": request._metrics_render_time,
+        })
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time the render
+        # through a post-render callback.
+        if hasattr(request, "_metrics_render_time"):
+            started = time.perf_counter()
+
+            def record_render(rendered):
+                request._metrics_render_time = time.perf_counter() - started
+
+            response.add_post_render_callback(record_render)
+        return response
@@ -0,0 +1,64 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+INDEXES = [
+    models.Index(fields=["user", "-timestamp"], name="activity_user_ts_idx"),
+    models.Index(
+        fields=["activity_type", "-timestamp"], name="activity_type_ts_idx"
+    ),
+]
+
+
+def add_indexes(apps, schema_editor):
+    # CONCURRENTLY keeps the activity log writable while the indexes build on
+    # PostgreSQL; it cannot run in a transaction, hence atomic = False.
+    model = apps.get_model("accounts", "UserActivityLog")
+    options = (
+        {"concurrently": True}
+        if schema_editor.connection.vendor == "postgresql" else {}
+    )
+    for index in INDEXES:
+        schema_editor.add_index(model, index, **options)
+
+
+def remove_indexes(apps, schema_editor):
+    model = apps.get_model("accounts", "UserActivityLog")
+    options = (
+        {"concurrently": True}
+        if schema_editor.connection.vendor == "postgresql" else {}
+    )
+    for index in INDEXES:
+        schema_editor.remove_index(model, index, **options)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0003_alter_useractivitylog_timestamp"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_indexes, remove_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(model_name="useractivitylog", index=index)
+                for index in INDEXES
+            ],
+        ),
+        # The FK index is a prefix of activity_user_ts_idx; drop it only once
+        # that index exists.
+        migrations.AlterField(
+            model_name="useractivitylog",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="activity_logs",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
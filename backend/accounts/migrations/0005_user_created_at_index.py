@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+INDEXES = [
+    models.Index(fields=["-created_at", "-id"], name="user_created_id_idx"),
+]
+
+
+def add_indexes(apps, schema_editor):
+    # Built CONCURRENTLY on PostgreSQL, like 0004_useractivitylog_indexes.
+    model = apps.get_model("accounts", "User")
+    options = (
+        {"concurrently": True}
+        if schema_editor.connection.vendor == "postgresql" else {}
+    )
+    for index in INDEXES:
+        schema_editor.add_index(model, index, **options)
+
+
+def remove_indexes(apps, schema_editor):
+    model = apps.get_model("accounts", "User")
+    options = (
+        {"concurrently": True}
+        if schema_editor.connection.vendor == "postgresql" else {}
+    )
+    for index in INDEXES:
+        schema_editor.remove_index(model, index, **options)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0004_useractivitylog_indexes"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_indexes, remove_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(model_name="user", index=index)
+                for index in INDEXES
+            ],
+        ),
+    ]
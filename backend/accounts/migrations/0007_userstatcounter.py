@@ -0,0 +1,49 @@
+from django.db import migrations, models
+
+
+def populate_counters(apps, schema_editor):
+    # Self-contained on purpose: accounts.stats keeps evolving, this
+    # migration must keep computing the counters as they were defined here.
+    from django.db.models import Count, Q
+    from django.db.models.functions import TruncDate
+
+    User = apps.get_model("accounts", "User")
+    UserStatCounter = apps.get_model("accounts", "UserStatCounter")
+    db = schema_editor.connection.alias
+    users = User.objects.using(db)
+
+    totals = users.aggregate(
+        total=Count("pk"), active=Count("pk", filter=Q(is_active=True)))
+    counters = {"total": totals["total"], "active": totals["active"]}
+    for row in users.values("role").annotate(count=Count("pk")):
+        counters[f"role:{row['role']}"] = row["count"]
+    signups = (
+        users.annotate(day=TruncDate("created_at"))
+        .values("day")
+        .annotate(count=Count("pk"))
+    )
+    for row in signups:
+        counters[f"signups:{row['day'].isoformat()}"] = row["count"]
+
+    UserStatCounter.objects.using(db).bulk_create(
+        UserStatCounter(key=key, value=value) for key, value in counters.items())
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0006_user_upper_lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserStatCounter",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
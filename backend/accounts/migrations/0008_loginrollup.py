@@ -0,0 +1,42 @@
+from datetime import timezone
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+from django.db.models.functions import TruncHour
+
+
+def backfill_rollups(apps, schema_editor):
+    UserActivityLog = apps.get_model("accounts", "UserActivityLog")
+    LoginRollup = apps.get_model("accounts", "LoginRollup")
+    buckets = (
+        UserActivityLog.objects.filter(activity_type="login")
+        .annotate(hour=TruncHour("timestamp", tzinfo=timezone.utc))
+        .values("hour")
+        .annotate(count=Count("id"), last_login_at=Max("timestamp"))
+        .order_by()
+    )
+    LoginRollup.objects.bulk_create(
+        [LoginRollup(**bucket) for bucket in buckets.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0007_userstatcounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LoginRollup",
+            fields=[
+                ("hour", models.DateTimeField(primary_key=True, serialize=False)),
+                ("count", models.BigIntegerField(default=0)),
+                ("last_login_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["-hour"],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
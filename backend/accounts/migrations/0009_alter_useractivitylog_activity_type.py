@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0008_loginrollup"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="useractivitylog",
+            name="activity_type",
+            field=models.CharField(
+                choices=[
+                    ("register", "Register"),
+                    ("login", "Login"),
+                    ("logout", "Logout"),
+                    ("profile_update", "Profile Update"),
+                    ("password_change", "Password Change"),
+                    ("email_change", "Email Change"),
+                    ("role_change", "Role Change"),
+                    ("deactivation", "Deactivation"),
+                    ("reactivation", "Reactivation"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
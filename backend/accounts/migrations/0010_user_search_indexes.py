@@ -0,0 +1,111 @@
+from django.db import OperationalError, migrations, models
+
+# Self-contained on purpose: accounts.search keeps evolving, this migration
+# must keep creating the objects as they were defined here. The PostgreSQL
+# trigram indexes are built concurrently by 0012_user_search_trigram_indexes.
+INDEXES = [
+    models.Index(
+        fields=["role", "-created_at", "-id"], name="user_role_created_idx"
+    ),
+    models.Index(
+        fields=["is_active", "-created_at", "-id"],
+        name="user_active_created_idx",
+    ),
+]
+SEARCH_FIELDS = ("email", "username", "first_name", "last_name")
+FTS_TABLE = "accounts_user_fts"
+FTS_TRIGGERS = {
+    f"{FTS_TABLE}_ai": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+        AFTER INSERT ON accounts_user BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {", ".join(SEARCH_FIELDS)})
+            VALUES (new.id, {", ".join(f"new.{f}" for f in SEARCH_FIELDS)});
+        END
+    """,
+    f"{FTS_TABLE}_ad": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+        AFTER DELETE ON accounts_user BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(SEARCH_FIELDS)})
+            VALUES ('delete', old.id, {", ".join(f"old.{f}" for f in SEARCH_FIELDS)});
+        END
+    """,
+    f"{FTS_TABLE}_au": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+        AFTER UPDATE OF {", ".join(SEARCH_FIELDS)} ON accounts_user BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(SEARCH_FIELDS)})
+            VALUES ('delete', old.id, {", ".join(f"old.{f}" for f in SEARCH_FIELDS)});
+            INSERT INTO {FTS_TABLE}(rowid, {", ".join(SEARCH_FIELDS)})
+            VALUES (new.id, {", ".join(f"new.{f}" for f in SEARCH_FIELDS)});
+        END
+    """,
+}
+
+
+def add_indexes(apps, schema_editor):
+    # Built CONCURRENTLY on PostgreSQL, like 0004_useractivitylog_indexes.
+    model = apps.get_model("accounts", "User")
+    options = (
+        {"concurrently": True}
+        if schema_editor.connection.vendor == "postgresql" else {}
+    )
+    for index in INDEXES:
+        schema_editor.add_index(model, index, **options)
+
+
+def remove_indexes(apps, schema_editor):
+    model = apps.get_model("accounts", "User")
+    options = (
+        {"concurrently": True}
+        if schema_editor.connection.vendor == "postgresql" else {}
+    )
+    for index in INDEXES:
+        schema_editor.remove_index(model, index, **options)
+
+
+def install_sqlite_search(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{', '.join(SEARCH_FIELDS)}, content='accounts_user', "
+                "content_rowid='id', tokenize='trigram')")
+        except OperationalError:
+            # No FTS5 or trigram tokenizer in this SQLite build; search falls
+            # back to icontains.
+            return
+        for sql in FTS_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_sqlite_search(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for name in FTS_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0009_alter_useractivitylog_activity_type"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_indexes, remove_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(model_name="user", index=index)
+                for index in INDEXES
+            ],
+        ),
+        migrations.RunPython(
+            install_sqlite_search, drop_sqlite_search, atomic=True),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Self-contained on purpose, like 0010_user_search_indexes.
+TRIGRAM_INDEXES = {
+    f"user_{field}_trgm_idx": field
+    for field in ("email", "username", "first_name", "last_name")
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # CONCURRENTLY keeps accounts_user writable while the indexes build; it
+    # cannot run in a transaction, hence atomic = False. Indexes created by
+    # an earlier version of 0010 are left as they are.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, field in TRIGRAM_INDEXES.items():
+            cursor.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON accounts_user "
+                f"USING gin ((UPPER({field}::text)) gin_trgm_ops)")
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for name in TRIGRAM_INDEXES:
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0011_user_profile_picture_variants"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
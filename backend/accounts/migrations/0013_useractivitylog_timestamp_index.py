@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+# Self-contained on purpose, like 0012_user_search_trigram_indexes. Kept out
+# of the model state because the index type depends on the database.
+INDEX_NAME = "activity_timestamp_idx"
+
+
+def timestamp_index():
+    return models.Index(fields=["timestamp"], name=INDEX_NAME)
+
+
+def create_timestamp_index(apps, schema_editor):
+    # Retention scans timestamp < cutoff. On PostgreSQL a BRIN index suits
+    # this append-only table: timestamps follow insertion order and the
+    # index stays a few pages however many rows there are. CONCURRENTLY
+    # keeps the table writable while it builds, hence atomic = False.
+    model = apps.get_model("accounts", "UserActivityLog")
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.add_index(model, timestamp_index())
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} "
+            f"ON {model._meta.db_table} USING brin (timestamp)")
+
+
+def drop_timestamp_index(apps, schema_editor):
+    model = apps.get_model("accounts", "UserActivityLog")
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.remove_index(model, timestamp_index())
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0012_user_search_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_timestamp_index, drop_timestamp_index),
+    ]
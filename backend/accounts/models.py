@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 
 
@@ -16,6 +17,9 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=USER_ROLES, default='user')
     profile_picture = models.ImageField(
         upload_to='profile_pics/', blank=True, null=True)
+    # {"source": <picture name>, <variant>: <path>}; see accounts/images.py.
+    profile_picture_variants = models.JSONField(
+        default=dict, blank=True, editable=False)
     phone_number = models.CharField(max_length=15, blank=True)
     date_of_birth = models.DateField(null=True, blank=True)
     bio = models.TextField(max_length=500, blank=True)
@@ -27,6 +31,23 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset pagination of the admin user list.
+            models.Index(fields=['-created_at', '-id'],
+                         name='user_created_id_idx'),
+            # The same walk filtered by role or active status.
+            models.Index(fields=['role', '-created_at', '-id'],
+                         name='user_role_created_idx'),
+            models.Index(fields=['is_active', '-created_at', '-id'],
+                         name='user_active_created_idx'),
+            # Case-insensitive login lookups (see find_user_by_identifier).
+            models.Index(Upper('email'), name='user_email_upper_idx'),
+            models.Index(Upper('username'), name='user_username_upper_idx'),
+            # Substring search uses trigram indexes created outside the model
+            # state; see accounts/search.py and migration 0010.
+        ]
+
     def __str__(self):
         return f"{self.email} - {self.get_full_name()}"
 
@@ -42,18 +63,64 @@ class UserActivityLog(models.Model):
         ('profile_update', 'Profile Update'),
         ('password_change', 'Password Change'),
         ('email_change', 'Email Change'),
+        ('role_change', 'Role Change'),
+        ('deactivation', 'Deactivation'),
+        ('reactivation', 'Reactivation'),
     ]
 
+    # Lookups by user are served by activity_user_ts_idx below, so the
+    # default single-column FK index would only add write cost.
     user = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name='activity_logs')
+        User, on_delete=models.CASCADE, related_name='activity_logs',
+        db_index=False)
     activity_type = models.CharField(max_length=20, choices=ACTIVITY_TYPES)
     description = models.TextField()
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Per-user timeline (UserActivityLogView).
+            models.Index(fields=['user', '-timestamp'],
+                         name='activity_user_ts_idx'),
+            # Recent events of one type (auth health, login counts).
+            models.Index(fields=['activity_type', '-timestamp'],
+                         name='activity_type_ts_idx'),
+            # Retention (timestamp < cutoff) uses activity_timestamp_idx,
+            # BRIN on PostgreSQL, created outside the model state; see
+            # migration 0013.
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.activity_type} - {self.timestamp}"
+
+
+class UserStatCounter(models.Model):
+    """
+    Precomputed user counters, maintained by ``accounts.signals``.
+
+    Keys are ``total``, ``active``, ``role:<role>`` and
+    ``signups:<YYYY-MM-DD>``; see ``accounts.stats``.
+    """
+
+    key = models.CharField(max_length=64, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+
+class LoginRollup(models.Model):
+    """Successful logins per UTC hour, maintained by ``accounts.rollups``."""
+
+    hour = models.DateTimeField(primary_key=True)
+    count = models.BigIntegerField(default=0)
+    last_login_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-hour']
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} - {self.count} logins"
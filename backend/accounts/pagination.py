@@ -0,0 +1,131 @@
+import base64
+import binascii
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def query_params(request):
+    # DRF requests and the plain HttpRequests of the async views.
+    return getattr(request, 'query_params', request.GET)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first keyset pagination over ``(ordering_field, id)``.
+
+    The cursor carries the last row's position, so every page is a bounded
+    index range scan: no OFFSET and no COUNT(*).
+    """
+
+    ordering_field = None
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, on a plain ``HttpRequest``."""
+        return self.finish_page(
+            [row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        """The query for one page, plus one row to tell if more follow."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        field = self.ordering_field
+
+        queryset = queryset.order_by(f'-{field}', '-id')
+        position = self.decode_cursor(request)
+        if position is not None:
+            value, pk = position
+            # The redundant ``lte`` bound lets the planner use a range scan
+            # instead of evaluating the OR over the whole index.
+            queryset = queryset.filter(**{f'{field}__lte': value}).filter(
+                Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk})
+            )
+        return queryset[:self.page_size + 1]
+
+    def finish_page(self, rows):
+        self.has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = (
+            self.encode_cursor(getattr(rows[-1], self.ordering_field), rows[-1].pk)
+            if self.has_more else None
+        )
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'has_more': self.has_more,
+            'page_size': self.page_size,
+            'results': data,
+        }
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'next_cursor': {'type': 'string', 'nullable': True},
+                'has_more': {'type': 'boolean'},
+                'page_size': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        page_size = settings.API_PAGE_SIZE
+        raw = query_params(request).get(self.page_size_query_param)
+        if raw:
+            try:
+                page_size = int(raw)
+            except ValueError:
+                pass
+        return max(1, min(page_size, settings.API_MAX_PAGE_SIZE))
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def encode_cursor(self, value, pk):
+        raw = f'{value.isoformat()}|{pk}'.encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = query_params(request).get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            value, pk = raw.rsplit('|', 1)
+            value = parse_datetime(value)
+            pk = int(pk)
+        except (TypeError, ValueError, binascii.Error, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+
+class ActivityLogPagination(KeysetPagination):
+    ordering_field = 'timestamp'
+
+
+class UserPagination(KeysetPagination):
+    ordering_field = 'created_at'
@@ -0,0 +1,225 @@
+"""
+Bulk user import for ``manage.py import_users``.
+
+Input rows are streamed from CSV or NDJSON and handled in batches: each
+batch is validated with ``UserImportSerializer``, checked for existing
+emails/usernames with one query, has its plaintext passwords hashed in a
+process pool, and is inserted with ``bulk_create`` in its own transaction.
+``bulk_create`` skips the ``post_save`` signal, so the user stat counters are
+updated from the same transaction.
+
+After every committed batch a checkpoint file records how many input rows
+have been consumed, so an interrupted import can be resumed.
+"""
+
+import csv
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Upper
+
+from .models import User
+from .serializers import UserImportSerializer
+from .stats import apply_deltas, counter_deltas, user_snapshot
+
+FORMATS = ("csv", "ndjson")
+
+
+def detect_format(path):
+    return "csv" if str(path).lower().endswith(".csv") else "ndjson"
+
+
+def read_rows(handle, fmt):
+    """Yield ``(line_number, row)`` pairs; unparsable lines yield ``None``."""
+    if fmt == "csv":
+        reader = csv.DictReader(handle)
+        for row in reader:
+            # Empty cells mean "use the default", not "blank value".
+            yield reader.line_num, {
+                key: value for key, value in row.items()
+                if key is not None and value not in ("", None)
+            }
+        return
+
+    for line_number, line in enumerate(handle, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def _init_worker():
+    django.setup()
+
+
+def hash_passwords(passwords, executor=None):
+    if executor is None:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (os.cpu_count() or 1) // 4)
+    return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+def create_hashing_pool(workers):
+    if workers <= 0:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def load_checkpoint(path):
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path, state):
+    partial = f"{path}.partial"
+    with open(partial, "w", encoding="utf-8") as handle:
+        json.dump(state, handle)
+    os.replace(partial, path)
+
+
+class UserImporter:
+    """
+    Streams rows into ``User`` in batches.
+
+    ``state`` holds the running totals (``consumed``, ``created``,
+    ``rejected`` and ``reasons``) and is what the checkpoint file stores.
+    Rejected rows are passed to ``on_reject(line_number, row, errors)``.
+    """
+
+    def __init__(self, batch_size=1000, executor=None, checkpoint_path=None,
+                 state=None, on_reject=None, on_batch=None):
+        self.batch_size = batch_size
+        self.executor = executor
+        self.checkpoint_path = checkpoint_path
+        self.state = state or {
+            "consumed": 0, "created": 0, "rejected": 0, "reasons": {},
+        }
+        self.on_reject = on_reject
+        self.on_batch = on_batch
+        self.seen_emails = set()
+        self.seen_usernames = set()
+
+    def run(self, rows):
+        rows = islice(rows, self.state["consumed"], None)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return self.state
+            self.import_batch(batch)
+            self.state["consumed"] += len(batch)
+            if self.checkpoint_path:
+                save_checkpoint(self.checkpoint_path, self.state)
+            if self.on_batch is not None:
+                self.on_batch(self.state)
+
+    def reject(self, line_number, row, errors):
+        self.state["rejected"] += 1
+        reasons = Counter(self.state["reasons"])
+        reasons.update(
+            f"{field}: {message}"
+            for field, messages in errors.items() for message in messages)
+        self.state["reasons"] = dict(reasons)
+        if self.on_reject is not None:
+            safe_row = {
+                key: value for key, value in (row or {}).items()
+                if key not in ("password", "password_hash")
+            }
+            self.on_reject(line_number, safe_row, errors)
+
+    def validate(self, batch):
+        valid = []
+        for line_number, row in batch:
+            if row is None:
+                self.reject(line_number, row, {"row": ["Unparsable row"]})
+                continue
+            serializer = UserImportSerializer(data=row)
+            if serializer.is_valid():
+                valid.append((line_number, row, serializer.validated_data))
+            else:
+                self.reject(line_number, row, {
+                    field: [str(error) for error in errors]
+                    for field, errors in serializer.errors.items()
+                })
+        return valid
+
+    def drop_duplicates(self, valid):
+        """Reject rows whose email/username exists (case-insensitively)."""
+        emails = {data["email"].upper() for _, _, data in valid}
+        usernames = {data["username"].upper() for _, _, data in valid}
+        taken_emails = set(
+            User.objects.alias(key=Upper("email")).filter(key__in=emails)
+            .values_list(Upper("email"), flat=True))
+        taken_usernames = set(
+            User.objects.alias(key=Upper("username"))
+            .filter(key__in=usernames)
+            .values_list(Upper("username"), flat=True))
+
+        unique = []
+        for line_number, row, data in valid:
+            email, username = data["email"].upper(), data["username"].upper()
+            errors = {}
+            if email in taken_emails or email in self.seen_emails:
+                errors["email"] = ["Email already exists"]
+            if username in taken_usernames or username in self.seen_usernames:
+                errors["username"] = ["Username already exists"]
+            if errors:
+                self.reject(line_number, row, errors)
+                continue
+            self.seen_emails.add(email)
+            self.seen_usernames.add(username)
+            unique.append((line_number, row, data))
+        return unique
+
+    def build_users(self, valid):
+        plaintext = [data["raw_password"] for _, _, data in valid
+                     if data["raw_password"] is not None]
+        hashed = iter(hash_passwords(plaintext, self.executor))
+        users = []
+        for _, _, data in valid:
+            fields = {key: value for key, value in data.items()
+                      if key != "raw_password"}
+            if data["raw_password"] is not None:
+                fields["password"] = next(hashed)
+            users.append(User(**fields))
+        return users
+
+    def insert(self, users):
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            totals = Counter()
+            for user in users:
+                totals.update(counter_deltas(
+                    None, user_snapshot(user), user.created_at))
+            apply_deltas(totals)
+
+    def import_batch(self, batch):
+        valid = self.drop_duplicates(self.validate(batch))
+        if not valid:
+            return
+        users = self.build_users(valid)
+        try:
+            self.insert(users)
+        except IntegrityError:
+            # A concurrent writer took an email or username after the
+            # duplicate check; fall back to one row at a time.
+            for (line_number, row, _), user in zip(valid, users):
+                try:
+                    self.insert([user])
+                except IntegrityError as exc:
+                    self.reject(line_number, row, {"row": [str(exc)]})
+                else:
+                    self.state["created"] += 1
+            return
+        self.state["created"] += len(users)
@@ -0,0 +1,112 @@
+"""
+Retention for ``UserActivityLog``.
+
+Rows older than ``ACTIVITY_LOG_RETENTION_DAYS`` are copied into gzipped
+NDJSON files under ``ACTIVITY_LOG_ARCHIVE_DIR`` and then deleted, one bounded
+batch per transaction so row locks and WAL bursts stay small. Login counts
+live on in ``LoginRollup``, so the auth health endpoint is unaffected.
+``timestamp < cutoff`` is served by ``activity_timestamp_idx`` (BRIN on
+PostgreSQL, see migration 0013), and the batch walk stops at the highest
+expired id instead of scanning the live rows after it.
+
+Archive files are named after the id range they hold and written through a
+temporary file, so re-running after a failed batch overwrites the partial
+archive instead of duplicating it.
+"""
+
+import gzip
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .exports import ACTIVITY_LOG_COLUMNS, encode_ndjson
+from .models import UserActivityLog
+
+
+def retention_cutoff(days=None):
+    days = settings.ACTIVITY_LOG_RETENTION_DAYS if days is None else days
+    return timezone.now() - timedelta(days=days)
+
+
+def expired_logs(cutoff):
+    return UserActivityLog.objects.filter(timestamp__lt=cutoff)
+
+
+def write_archive(directory, rows):
+    """Write ``rows`` to a gzipped NDJSON file; return ``(path, bytes)``."""
+    header = list(ACTIVITY_LOG_COLUMNS)
+    pk_index = header.index("id")
+    path = Path(directory) / (
+        f"activity-logs-{rows[0][pk_index]:012d}-{rows[-1][pk_index]:012d}"
+        ".ndjson.gz")
+    partial = path.with_name(path.name + ".partial")
+    with gzip.open(partial, "wt", encoding="utf-8") as handle:
+        for line in encode_ndjson(header, rows):
+            handle.write(line)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(partial, path)
+    return path, path.stat().st_size
+
+
+def archive_activity_logs(cutoff, directory=None, batch_size=None,
+                          dry_run=False, max_batches=None, progress=None):
+    """
+    Archive and delete activity logs with ``timestamp < cutoff``.
+
+    Returns a summary dict with rows, batches, bytes, files and elapsed
+    seconds. ``progress`` is called with the running summary after each
+    batch. In ``dry_run`` mode nothing is written; the summary holds the
+    number of rows that would be archived.
+    """
+    directory = Path(directory or settings.ACTIVITY_LOG_ARCHIVE_DIR)
+    batch_size = batch_size or settings.ACTIVITY_LOG_ARCHIVE_BATCH_SIZE
+    summary = {"rows": 0, "batches": 0, "bytes": 0, "files": [],
+               "elapsed": 0.0}
+    started = time.perf_counter()
+
+    if dry_run:
+        summary["rows"] = expired_logs(cutoff).count()
+        summary["batches"] = -(-summary["rows"] // batch_size)
+        summary["elapsed"] = time.perf_counter() - started
+        return summary
+
+    directory.mkdir(parents=True, exist_ok=True)
+    lookups = list(ACTIVITY_LOG_COLUMNS.values())
+    pk_index = lookups.index("id")
+    last_pk = 0
+    max_pk = expired_logs(cutoff).aggregate(max_pk=Max("pk"))["max_pk"] or 0
+    while last_pk < max_pk and (
+            max_batches is None or summary["batches"] < max_batches):
+        with transaction.atomic():
+            # Walk forward by primary key so each batch skips rows (and, on
+            # PostgreSQL, dead tuples) left behind by earlier batches.
+            rows = list(
+                expired_logs(cutoff)
+                .filter(pk__gt=last_pk, pk__lte=max_pk)
+                .order_by("pk")
+                .values_list(*lookups)[:batch_size]
+            )
+            if not rows:
+                break
+            path, size = write_archive(directory, rows)
+            UserActivityLog.objects.filter(
+                pk__in=[row[pk_index] for row in rows]).delete()
+
+        last_pk = rows[-1][pk_index]
+        summary["rows"] += len(rows)
+        summary["batches"] += 1
+        summary["bytes"] += size
+        summary["files"].append(str(path))
+        summary["elapsed"] = time.perf_counter() - started
+        if progress is not None:
+            progress(summary)
+
+    summary["elapsed"] = time.perf_counter() - started
+    return summary
@@ -0,0 +1,115 @@
+"""
+Hourly login rollups backing ``/health/auth/``.
+
+Every logged login increments the bucket for its UTC hour, so the health
+endpoint sums at most ``window / 1h`` rows instead of counting raw activity
+log rows. Those windows are aligned to whole hours. ``1h`` would then cover
+up to two hours, so it is counted from the activity log itself, a short
+range scan of ``activity_type_ts_idx``.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Q, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import LoginRollup, UserActivityLog
+
+WINDOWS = {
+    "1h": timedelta(hours=1),
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+}
+DEFAULT_WINDOW = "24h"
+# Counted from raw activity log rows instead of hourly buckets.
+EXACT_WINDOWS = ("1h",)
+
+_summary_cache = {}
+_summary_cache_lock = threading.Lock()
+
+
+def hour_bucket(value):
+    return value.astimezone(dt_timezone.utc).replace(
+        minute=0, second=0, microsecond=0)
+
+
+def record_logins(timestamps):
+    buckets = defaultdict(lambda: [0, None])
+    for value in timestamps:
+        bucket = buckets[hour_bucket(value)]
+        bucket[0] += 1
+        bucket[1] = value if bucket[1] is None else max(bucket[1], value)
+
+    for hour, (count, latest) in sorted(buckets.items()):
+        updated = LoginRollup.objects.filter(hour=hour).update(
+            count=F("count") + count,
+            last_login_at=Greatest("last_login_at", Value(latest)),
+        )
+        if updated:
+            continue
+        try:
+            with transaction.atomic():
+                LoginRollup.objects.create(
+                    hour=hour, count=count, last_login_at=latest)
+        except IntegrityError:
+            # Another transaction created the bucket first.
+            LoginRollup.objects.filter(hour=hour).update(
+                count=F("count") + count,
+                last_login_at=Greatest("last_login_at", Value(latest)),
+            )
+
+
+def login_summary(window=DEFAULT_WINDOW):
+    """
+    Login counts for ``window`` and for the default 24h window, and the
+    latest login, cached in-process for ``AUTH_HEALTH_CACHE_SECONDS``.
+    """
+    ttl = settings.AUTH_HEALTH_CACHE_SECONDS
+    now = time.monotonic()
+    cached = _summary_cache.get(window)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    current = timezone.now()
+    since = hour_bucket(current - WINDOWS[window])
+    since_default = hour_bucket(current - WINDOWS[DEFAULT_WINDOW])
+    totals = LoginRollup.objects.filter(
+        hour__gte=min(since, since_default)).aggregate(
+        total=Sum("count", filter=Q(hour__gte=since)),
+        total_default=Sum("count", filter=Q(hour__gte=since_default)),
+        latest=Max("last_login_at"),
+    )
+    count = totals["total"] or 0
+    if window in EXACT_WINDOWS:
+        count = UserActivityLog.objects.filter(
+            activity_type="login",
+            timestamp__gte=current - WINDOWS[window],
+        ).count()
+    latest = totals["latest"]
+    if latest is None:
+        latest = (
+            LoginRollup.objects.order_by("-hour")
+            .values_list("last_login_at", flat=True)
+            .first()
+        )
+    summary = {
+        "count": count,
+        "count_default": totals["total_default"] or 0,
+        "latest": latest,
+    }
+
+    if ttl > 0:
+        with _summary_cache_lock:
+            _summary_cache[window] = (now + ttl, summary)
+    return summary
+
+
+def clear_summary_cache():
+    with _summary_cache_lock:
+        _summary_cache.clear()
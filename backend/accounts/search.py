@@ -0,0 +1,134 @@
+"""
+Indexed user search for the admin user list and the Django admin.
+
+Every whitespace-separated term must appear, case-insensitively, somewhere in
+the user's email, username, first or last name. Terms of three or more
+characters are served by trigram indexes:
+
+* PostgreSQL: ``pg_trgm`` GIN indexes on ``UPPER(column)``, which match the
+  ``UPPER(...) LIKE UPPER('%term%')`` SQL that ``icontains`` generates.
+* SQLite: an FTS5 table with the ``trigram`` tokenizer, kept in sync with
+  ``accounts_user`` by triggers.
+
+Shorter terms, and databases without either index, fall back to prefix and
+``icontains`` lookups. The indexes are created by migrations 0010 (SQLite)
+and 0012 (PostgreSQL, concurrently).
+"""
+
+from functools import reduce
+from operator import or_
+
+from django.db import OperationalError, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_FIELDS = ("email", "username", "first_name", "last_name")
+MIN_TRIGRAM_LENGTH = 3
+MAX_TERMS = 8
+
+FTS_TABLE = "accounts_user_fts"
+FTS_TRIGGERS = {
+    f"{FTS_TABLE}_ai": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+        AFTER INSERT ON accounts_user BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {", ".join(SEARCH_FIELDS)})
+            VALUES (new.id, {", ".join(f"new.{f}" for f in SEARCH_FIELDS)});
+        END
+    """,
+    f"{FTS_TABLE}_ad": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+        AFTER DELETE ON accounts_user BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(SEARCH_FIELDS)})
+            VALUES ('delete', old.id, {", ".join(f"old.{f}" for f in SEARCH_FIELDS)});
+        END
+    """,
+    f"{FTS_TABLE}_au": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+        AFTER UPDATE OF {", ".join(SEARCH_FIELDS)} ON accounts_user BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(SEARCH_FIELDS)})
+            VALUES ('delete', old.id, {", ".join(f"old.{f}" for f in SEARCH_FIELDS)});
+            INSERT INTO {FTS_TABLE}(rowid, {", ".join(SEARCH_FIELDS)})
+            VALUES (new.id, {", ".join(f"new.{f}" for f in SEARCH_FIELDS)});
+        END
+    """,
+}
+
+
+def _sqlite_objects(cursor):
+    cursor.execute(
+        "SELECT name FROM sqlite_master WHERE name LIKE %s",
+        [f"{FTS_TABLE}%"])
+    return {row[0] for row in cursor.fetchall()}
+
+
+def install_sqlite_search(connection):
+    """
+    Create the FTS5 table and its triggers if missing.
+
+    Idempotent, and run after every ``migrate``: SQLite drops the triggers
+    whenever a migration rebuilds ``accounts_user``, so they are recreated
+    and the index rebuilt from the user table when that happens. Returns
+    False when this SQLite build lacks FTS5 or the trigram tokenizer.
+    """
+    with connection.cursor() as cursor:
+        existing = _sqlite_objects(cursor)
+        if FTS_TABLE not in existing:
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                    f"{', '.join(SEARCH_FIELDS)}, content='accounts_user', "
+                    "content_rowid='id', tokenize='trigram')")
+            except OperationalError:
+                return False
+        if existing.issuperset(FTS_TRIGGERS):
+            return True
+        for sql in FTS_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    _fts_available.pop(connection.alias, None)
+    return True
+
+
+# Whether the FTS table exists, per database alias.
+_fts_available = {}
+
+
+def sqlite_search_available(connection):
+    if connection.alias not in _fts_available:
+        with connection.cursor() as cursor:
+            _fts_available[connection.alias] = (
+                FTS_TABLE in _sqlite_objects(cursor))
+    return _fts_available[connection.alias]
+
+
+def _any_field(lookup, term):
+    return reduce(or_, (Q(**{f"{field}__{lookup}": term})
+                        for field in SEARCH_FIELDS))
+
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def search_users(queryset, text):
+    """Filter ``queryset`` to users matching every term in ``text``."""
+    terms = text.split()[:MAX_TERMS]
+    long_terms = [term for term in terms if len(term) >= MIN_TRIGRAM_LENGTH]
+    short_terms = [term for term in terms if len(term) < MIN_TRIGRAM_LENGTH]
+    connection = connections[queryset.db]
+
+    if (long_terms and connection.vendor == "sqlite"
+            and sqlite_search_available(connection)):
+        match = " ".join(_fts_phrase(term) for term in long_terms)
+        queryset = queryset.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            [match]))
+    else:
+        for term in long_terms:
+            queryset = queryset.filter(_any_field("icontains", term))
+
+    # Too short for a trigram; treat as a prefix.
+    for term in short_terms:
+        queryset = queryset.filter(_any_field("istartswith", term))
+    return queryset
@@ -1,7 +1,48 @@
 from rest_framework import serializers
+from django.contrib.auth.hashers import identify_hasher
 from django.contrib.auth.password_validation import validate_password
-from django.db.models import Q
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Value
+from django.db.models.functions import Upper
+from .bulk import ACTIONS as BULK_ACTIONS, SET_ROLE
+from .exports import FORMATS as EXPORT_FORMATS
+from .images import ImageRejected, check_upload, variant_paths
 from .models import User, UserActivityLog
+from .tokens import rotate_refresh_token, verify_token
+
+
+def identifier_lookups(identifier):
+    """
+    Queries resolving a login identifier, each on an ``UPPER()`` index.
+
+    Identifiers containing ``@`` are tried as an email first; usernames may
+    also contain ``@``, so those fall back to a username lookup.
+    """
+    fields = ('email', 'username') if '@' in identifier else ('username',)
+    # Accounts created before lookups were case-insensitive may differ only
+    # in case; the oldest one wins, as with the original ``.first()``.
+    return [
+        User.objects.alias(lookup_key=Upper(field))
+        .filter(lookup_key=Upper(Value(identifier)))
+        .order_by('pk')[:1]
+        for field in fields
+    ]
+
+
+def find_user_by_identifier(identifier):
+    for query in identifier_lookups(identifier):
+        matches = list(query)
+        if matches:
+            return matches[0]
+    return None
+
+
+async def afind_user_by_identifier(identifier):
+    for query in identifier_lookups(identifier):
+        async for user in query:
+            return user
+    return None
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -25,7 +66,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserLoginSerializer(serializers.Serializer):
+class LoginCredentialsSerializer(serializers.Serializer):
     email = serializers.CharField(required=False, allow_blank=True)
     identifier = serializers.CharField(required=False, allow_blank=True)
     password = serializers.CharField(write_only=True)
@@ -38,11 +79,18 @@ class UserLoginSerializer(serializers.Serializer):
             raise serializers.ValidationError(
                 'Must include email/username and password')
 
-        user = User.objects.filter(
-            Q(email__iexact=identifier) | Q(username__iexact=identifier)
-        ).first()
+        attrs['identifier'] = identifier
+        return attrs
+
+
+class UserLoginSerializer(LoginCredentialsSerializer):
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        user = find_user_by_identifier(attrs['identifier'])
 
-        if not user or not user.check_password(password):
+        # check_password re-hashes (and saves) the password when it was stored
+        # with a hasher or cost other than the preferred PASSWORD_HASHERS one.
+        if not user or not user.check_password(attrs['password']):
             raise serializers.ValidationError('Invalid credentials')
 
         if not user.is_active:
@@ -53,19 +101,53 @@ class UserLoginSerializer(serializers.Serializer):
         return attrs
 
 
+class TokenRefreshSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+    access = serializers.CharField(read_only=True)
+
+    def validate(self, attrs):
+        return rotate_refresh_token(attrs['refresh'])
+
+
+class TokenVerifySerializer(serializers.Serializer):
+    token = serializers.CharField(write_only=True)
+
+    def validate(self, attrs):
+        verify_token(attrs['token'])
+        return {}
+
+
 class UserProfileSerializer(serializers.ModelSerializer):
     full_name = serializers.CharField(source='get_full_name', read_only=True)
+    profile_picture_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = [
             'id', 'email', 'username', 'first_name', 'last_name', 'full_name',
-            'role', 'profile_picture', 'phone_number', 'date_of_birth', 'bio',
+            'role', 'profile_picture', 'profile_picture_variants',
+            'phone_number', 'date_of_birth', 'bio',
             'is_email_verified', 'last_login', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'email', 'role', 'is_email_verified',
                             'last_login', 'created_at', 'updated_at']
 
+    def get_profile_picture_variants(self, obj):
+        request = self.context.get('request')
+        urls = {}
+        for name, path in variant_paths(obj).items():
+            url = obj.profile_picture.storage.url(path)
+            urls[name] = request.build_absolute_uri(url) if request else url
+        return urls
+
+    def validate_profile_picture(self, value):
+        if value:
+            try:
+                check_upload(value)
+            except ImageRejected as exc:
+                raise serializers.ValidationError(str(exc))
+        return value
+
 
 class PasswordChangeSerializer(serializers.Serializer):
     old_password = serializers.CharField(write_only=True)
@@ -93,3 +175,106 @@ class UserActivityLogSerializer(serializers.ModelSerializer):
         fields = ['id', 'user_email', 'activity_type',
                   'description', 'ip_address', 'timestamp']
         read_only_fields = ['id', 'timestamp']
+
+
+class UserImportSerializer(serializers.ModelSerializer):
+    """
+    One ``import_users`` row. Uniqueness is checked per batch by the importer
+    with a single query, so the per-row unique validators are dropped.
+    """
+    password = serializers.CharField(
+        required=False, allow_blank=True, trim_whitespace=False)
+    password_hash = serializers.CharField(required=False, allow_blank=True)
+
+    class Meta:
+        model = User
+        fields = ['email', 'username', 'first_name', 'last_name', 'role',
+                  'is_active', 'password', 'password_hash']
+        extra_kwargs = {
+            'email': {'validators': []},
+            'username': {'validators': [UnicodeUsernameValidator()]},
+        }
+
+    def validate(self, attrs):
+        password = attrs.pop('password', '')
+        password_hash = attrs.pop('password_hash', '')
+        if password_hash:
+            try:
+                identify_hasher(password_hash)
+            except ValueError:
+                raise serializers.ValidationError(
+                    {'password_hash': 'Unrecognized password hash format'})
+        elif password:
+            try:
+                validate_password(password, User(**attrs))
+            except DjangoValidationError as exc:
+                raise serializers.ValidationError({'password': exc.messages})
+        else:
+            raise serializers.ValidationError(
+                {'password': 'Provide password or password_hash'})
+        attrs['password'] = password_hash or None
+        attrs['raw_password'] = None if password_hash else password
+        return attrs
+
+
+class UserListFilterSerializer(serializers.Serializer):
+    search = serializers.CharField(required=False, max_length=200)
+    role = serializers.ChoiceField(choices=User.USER_ROLES, required=False)
+    is_active = serializers.BooleanField(required=False)
+    is_email_verified = serializers.BooleanField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+
+class ExportFilterSerializer(serializers.Serializer):
+    format = serializers.ChoiceField(choices=list(EXPORT_FORMATS), default='csv')
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        since, until = attrs.get('since'), attrs.get('until')
+        if since and until and since >= until:
+            raise serializers.ValidationError('since must be before until')
+        return attrs
+
+
+class ActivityLogExportFilterSerializer(ExportFilterSerializer):
+    activity_type = serializers.ChoiceField(
+        choices=UserActivityLog.ACTIVITY_TYPES, required=False)
+
+
+class UserExportFilterSerializer(ExportFilterSerializer):
+    role = serializers.ChoiceField(choices=User.USER_ROLES, required=False)
+    is_active = serializers.BooleanField(required=False)
+
+
+class BulkUserFilterSerializer(serializers.Serializer):
+    role = serializers.ChoiceField(choices=User.USER_ROLES, required=False)
+    is_active = serializers.BooleanField(required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        # An empty filter would match every user; make that explicit.
+        if not attrs:
+            raise serializers.ValidationError(
+                'Provide at least one filter criterion')
+        return attrs
+
+
+class BulkUserActionSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=BULK_ACTIONS)
+    role = serializers.ChoiceField(choices=User.USER_ROLES, required=False)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False,
+        allow_empty=False)
+    filter = BulkUserFilterSerializer(required=False)
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError(
+                'Provide either ids or filter')
+        if attrs['action'] == SET_ROLE and 'role' not in attrs:
+            raise serializers.ValidationError(
+                {'role': 'This field is required for set_role'})
+        return attrs
@@ -0,0 +1,95 @@
+from django.db import connections, transaction
+from django.db.models.signals import (
+    post_delete, post_init, post_migrate, post_save, pre_delete, pre_save,
+)
+from django.dispatch import receiver
+
+from .caching import bump_user_version
+from .models import User, UserActivityLog
+from .rollups import record_logins
+from .search import FTS_TABLE, install_sqlite_search
+from .stats import apply_deltas, counter_deltas, user_snapshot
+
+STATS_FIELDS = {"role", "is_active"}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # After commit: bumped earlier, a concurrent request could still read the
+    # old row and cache it under the new version.
+    transaction.on_commit(lambda user_id=instance.pk: bump_user_version(user_id))
+
+
+@receiver(post_init, sender=User)
+def remember_stats_snapshot(sender, instance, **kwargs):
+    # Remember the counted (role, is_active) of rows loaded from the database
+    # so updates can be turned into counter deltas without another query.
+    if instance.pk is not None and all(
+            field in instance.__dict__ for field in STATS_FIELDS):
+        instance._stats_snapshot = user_snapshot(instance)
+
+
+@receiver(pre_save, sender=User)
+def load_stats_snapshot(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or hasattr(instance, "_stats_snapshot"):
+        return
+    if update_fields is not None and not STATS_FIELDS & set(update_fields):
+        return
+    # Instances loaded with role/is_active deferred: fetch what was counted.
+    instance._stats_snapshot = (
+        User.objects.filter(pk=instance.pk)
+        .values_list("role", "is_active")
+        .first()
+    )
+
+
+@receiver(post_save, sender=User)
+def update_user_counters(sender, instance, created, update_fields=None,
+                         raw=False, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not STATS_FIELDS & set(update_fields):
+        return
+    old = None if created else getattr(instance, "_stats_snapshot", None)
+    new = user_snapshot(instance)
+    if created or old is not None:
+        apply_deltas(counter_deltas(old, new, created_at=instance.created_at))
+    instance._stats_snapshot = new
+
+
+@receiver(pre_delete, sender=User)
+def load_deleted_stats_snapshot(sender, instance, **kwargs):
+    # Deletes are rare and often issued on stale instances (admin actions),
+    # so read what is actually stored rather than trusting the snapshot.
+    instance._stats_snapshot = (
+        User.objects.filter(pk=instance.pk)
+        .values_list("role", "is_active")
+        .first()
+    )
+
+
+@receiver(post_delete, sender=User)
+def remove_from_user_counters(sender, instance, **kwargs):
+    old = getattr(instance, "_stats_snapshot", None)
+    if old is not None:
+        apply_deltas(counter_deltas(old, None, created_at=instance.created_at))
+
+
+@receiver(post_save, sender=UserActivityLog)
+def roll_up_login(sender, instance, created, raw=False, **kwargs):
+    # Rows written in bulk by the buffered activity log writer do not send
+    # post_save; the writer records their rollups itself.
+    if created and not raw and instance.activity_type == "login":
+        record_logins([instance.timestamp])
+
+
+@receiver(post_migrate)
+def restore_sqlite_search(sender, using, plan=None, **kwargs):
+    # SQLite rebuilds a table (dropping its triggers) for most ALTERs, so put
+    # the user search triggers back once the search table exists.
+    connection = connections[using]
+    if sender.name != "accounts" or connection.vendor != "sqlite" or not plan:
+        return
+    if FTS_TABLE in connection.introspection.table_names():
+        install_sqlite_search(connection)
@@ -0,0 +1,178 @@
+"""
+Incrementally maintained user counters backing ``user_stats``.
+
+Signal handlers translate every user create, delete and ``role``/``is_active``
+change into counter deltas, so reading the stats is one primary-key lookup
+instead of several ``COUNT(*)`` scans. ``manage.py reconcile_user_stats``
+recomputes the counters from the user table if they ever drift (for example
+after raw SQL or ``QuerySet.update()`` calls that bypass signals).
+
+Every change also advances the ``version`` row in the same transaction.
+The stats endpoint derives its ETag and Last-Modified from it, so an
+unchanged poll gets a 304 without the payload being rendered.
+"""
+
+from collections import Counter
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .conditional import make_etag
+from .models import User, UserStatCounter
+
+TOTAL = "total"
+ACTIVE = "active"
+# Microseconds since the epoch of the last change, kept strictly increasing.
+VERSION = "version"
+ROLES = [role for role, _ in User.USER_ROLES]
+
+
+def role_key(role):
+    return f"role:{role}"
+
+
+def signup_key(day):
+    return f"signups:{day.isoformat()}"
+
+
+def user_snapshot(user):
+    return (user.role, user.is_active)
+
+
+def counter_deltas(old=None, new=None, created_at=None):
+    """
+    Counter changes for a user moving from snapshot ``old`` to ``new``.
+
+    Snapshots are ``(role, is_active)`` tuples; ``None`` means the user did
+    not exist on that side (creation or deletion).
+    """
+    deltas = Counter()
+    for snapshot, sign in ((old, -1), (new, 1)):
+        if snapshot is None:
+            continue
+        role, is_active = snapshot
+        deltas[TOTAL] += sign
+        deltas[role_key(role)] += sign
+        if is_active:
+            deltas[ACTIVE] += sign
+    if created_at is not None and (old is None) != (new is None):
+        deltas[signup_key(timezone.localdate(created_at))] += 1 if old is None else -1
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def apply_deltas(deltas):
+    for key, delta in deltas.items():
+        _update_or_create(UserStatCounter, key, F("value") + delta, delta)
+    if deltas:
+        bump_stats_version()
+
+
+def bump_stats_version(counter_model=UserStatCounter):
+    now = int(timezone.now().timestamp() * 1_000_000)
+    _update_or_create(
+        counter_model, VERSION,
+        Greatest(F("value") + 1, now, output_field=models.BigIntegerField()),
+        now)
+
+
+def _update_or_create(counter_model, key, value, initial):
+    if counter_model.objects.filter(key=key).update(value=value):
+        return
+    try:
+        with transaction.atomic():
+            counter_model.objects.create(key=key, value=initial)
+    except IntegrityError:
+        # Another transaction created the row first.
+        counter_model.objects.filter(key=key).update(value=value)
+
+
+def read_user_stats(signup_days=7):
+    """
+    Current stats plus per-day signups, read with a single query.
+
+    Returns ``(stats, etag, last_modified)``; the validators come from the
+    version row, read in the same query.
+    """
+    today = timezone.localdate()
+    signup_keys = [signup_key(today - timedelta(days=offset))
+                   for offset in range(signup_days - 1, -1, -1)]
+    role_keys = [role_key(role) for role in ROLES]
+    values = dict(
+        UserStatCounter.objects.filter(
+            key__in=[TOTAL, ACTIVE, VERSION, *role_keys, *signup_keys]
+        ).values_list("key", "value")
+    )
+    total = values.get(TOTAL, 0)
+    active = values.get(ACTIVE, 0)
+    stats = {
+        "total_users": total,
+        "active_users": active,
+        "admin_users": values.get(role_key("admin"), 0),
+        "inactive_users": total - active,
+        "users_by_role": {
+            role: values.get(role_key(role), 0) for role in ROLES
+        },
+        "signups_by_day": {
+            key.split(":", 1)[1]: values.get(key, 0) for key in signup_keys
+        },
+    }
+    return (stats, *stats_validators(values.get(VERSION, 0), today, signup_days))
+
+
+def stats_validators(version, today, signup_days):
+    # The day is part of both: signups_by_day moves at midnight without any
+    # counter changing.
+    last_modified = max(
+        datetime.fromtimestamp(version / 1_000_000, tz=dt_timezone.utc),
+        timezone.make_aware(datetime.combine(today, time.min)),
+    )
+    return make_etag("stats", version, today, signup_days), last_modified
+
+
+def compute_user_counters(user_model=User):
+    """Recompute every counter from the user table."""
+    totals = user_model.objects.aggregate(
+        total=Count("pk"), active=Count("pk", filter=Q(is_active=True)))
+    counters = {TOTAL: totals["total"], ACTIVE: totals["active"]}
+    for row in user_model.objects.values("role").annotate(count=Count("pk")):
+        counters[role_key(row["role"])] = row["count"]
+    signups = (
+        user_model.objects.annotate(day=TruncDate("created_at"))
+        .values("day")
+        .annotate(count=Count("pk"))
+    )
+    for row in signups:
+        counters[signup_key(row["day"])] = row["count"]
+    return counters
+
+
+def reconcile_user_counters(dry_run=False, counter_model=UserStatCounter,
+                            user_model=User):
+    """
+    Overwrite stored counters with freshly computed values.
+
+    Returns ``{key: (stored, actual)}`` for every counter that had drifted.
+    """
+    actual = compute_user_counters(user_model)
+    stored = dict(
+        counter_model.objects.exclude(key=VERSION).values_list("key", "value"))
+    drift = {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in set(stored) | set(actual)
+        if stored.get(key, 0) != actual.get(key, 0)
+    }
+    if dry_run or not drift:
+        return drift
+
+    with transaction.atomic():
+        stale = [key for key in drift if key not in actual]
+        counter_model.objects.filter(key__in=stale).delete()
+        for key, (_, value) in drift.items():
+            if key in actual:
+                counter_model.objects.update_or_create(
+                    key=key, defaults={"value": value})
+        bump_stats_version(counter_model)
+    return drift
@@ -1,12 +1,56 @@
+import csv
+import gzip
+import io
+import json
+import pickle
+import tempfile
+import uuid
+from pathlib import Path
+from datetime import timedelta
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from PIL import Image
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken, OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import AccessToken
 
-from .models import User, UserActivityLog
+from . import compression, metrics
+from .activity import BUFFERED, ActivityLogWriter
+from .blacklist import BlacklistIndex, BloomFilter, get_blacklist_index
+from .bulk import apply_bulk_action
+from .caching import get_cached_user, get_user_version
+from .images import VARIANTS, variant_paths
+from .models import LoginRollup, User, UserActivityLog, UserStatCounter
+from .renderers import FastJSONRenderer
+from .rollups import clear_summary_cache
+from .stats import (
+    VERSION as STATS_VERSION, compute_user_counters, reconcile_user_counters,
+)
+from .throttling import hit
+from .tokens import RefreshToken
 
 
 class AuthLoginTests(APITestCase):
     def setUp(self):
+        cache.clear()
         self.password = "@Tampa5000"
         self.user = User.objects.create_user(
             email="gustavo_valenca@hotmail.com",
@@ -44,6 +88,115 @@ class AuthLoginTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["user"]["email"], self.user.email)
 
+    def test_login_identifier_is_case_insensitive(self):
+        for identifier in (self.user.email.upper(), self.user.username.lower()):
+            response = self.client.post(
+                self.login_url,
+                {"identifier": identifier, "password": self.password},
+                format="json",
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["user"]["id"], self.user.id)
+
+    def test_login_resolves_case_variants_to_the_oldest_account(self):
+        User.objects.create_user(
+            email=self.user.email.upper(),
+            username="shouting",
+            first_name="Loud",
+            last_name="User",
+            password=self.password,
+        )
+
+        for identifier in (self.user.email, self.user.email.upper()):
+            response = self.client.post(
+                self.login_url,
+                {"identifier": identifier, "password": self.password},
+                format="json",
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["user"]["id"], self.user.id)
+
+    def test_login_with_username_containing_at_sign(self):
+        user = User.objects.create_user(
+            email="at-sign@example.com",
+            username="at@sign",
+            first_name="At",
+            last_name="Sign",
+            password=self.password,
+        )
+
+        response = self.client.post(
+            self.login_url,
+            {"identifier": "AT@SIGN", "password": self.password},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["user"]["id"], user.id)
+
+    def test_login_rehashes_legacy_password_hash(self):
+        self.user.password = make_password(self.password, hasher="pbkdf2_sha1")
+        self.user.save(update_fields=["password"])
+
+        response = self.client.post(
+            self.login_url,
+            {"identifier": self.user.email, "password": self.password},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(identify_hasher(self.user.password).algorithm, "pbkdf2_sha256")
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_login_rehashes_when_hasher_cost_changes(self):
+        response = self.client.post(
+            self.login_url,
+            {"identifier": self.user.email, "password": self.password},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password.split("$")[1], "1000")
+
+    def test_login_rehashes_after_scrypt_cost_downgrade(self):
+        scrypt_first = [
+            settings.PASSWORD_HASHER_CHOICES["scrypt"], *settings.PASSWORD_HASHERS]
+        with override_settings(
+                PASSWORD_HASHERS=scrypt_first, PASSWORD_SCRYPT_WORK_FACTOR=2**16):
+            self.user.password = make_password(self.password)
+            self.user.save(update_fields=["password"])
+
+        with override_settings(
+                PASSWORD_HASHERS=scrypt_first, PASSWORD_SCRYPT_WORK_FACTOR=2**12):
+            response = self.client.post(
+                self.login_url,
+                {"identifier": self.user.email, "password": self.password},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password.split("$")[:2], ["scrypt", "4096"])
+
+    def test_login_without_sessions_updates_last_login(self):
+        from user_management import settings_api
+
+        with override_settings(MIDDLEWARE=settings_api.MIDDLEWARE):
+            response = self.client.post(
+                self.login_url,
+                {"identifier": self.user.email, "password": self.password},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
     def test_login_invalid_credentials_returns_400(self):
         response = self.client.post(
             self.login_url,
@@ -56,6 +209,7 @@ class AuthLoginTests(APITestCase):
 
 class AuthHealthEndpointTests(APITestCase):
     def setUp(self):
+        clear_summary_cache()
         self.user = User.objects.create_user(
             email="healthcheck@example.com",
             username="healthcheck",
@@ -80,3 +234,1678 @@ class AuthHealthEndpointTests(APITestCase):
         self.assertIn("auth", payload)
         self.assertGreaterEqual(payload["auth"]["successful_logins_last_24h"], 1)
         self.assertIsNotNone(payload["auth"]["last_successful_login_utc"])
+
+    def test_auth_health_supports_windows_from_rollups(self):
+        three_days_ago = timezone.now() - timedelta(days=3)
+        LoginRollup.objects.create(
+            hour=three_days_ago.replace(minute=0, second=0, microsecond=0),
+            count=2,
+            last_login_at=three_days_ago,
+        )
+
+        with self.assertNumQueries(1):
+            week = self.client.get("/health/auth/", {"window": "7d"}).json()
+        day = self.client.get("/health/auth/", {"window": "24h"}).json()
+
+        self.assertEqual(week["auth"]["window"], "7d")
+        self.assertEqual(week["auth"]["successful_logins"], 3)
+        self.assertEqual(week["auth"]["successful_logins_last_24h"], 1)
+        self.assertEqual(day["auth"]["window"], "24h")
+        self.assertEqual(day["auth"]["successful_logins"], 1)
+
+    def test_one_hour_window_is_rolling(self):
+        UserActivityLog.objects.filter(user=self.user).update(
+            timestamp=timezone.now() - timedelta(minutes=61))
+
+        payload = self.client.get("/health/auth/", {"window": "1h"}).json()
+
+        self.assertEqual(payload["auth"]["successful_logins"], 0)
+        self.assertEqual(payload["auth"]["successful_logins_last_24h"], 1)
+
+    def test_auth_health_does_not_expose_writer_stats(self):
+        payload = self.client.get("/health/auth/").json()
+
+        self.assertNotIn("activity_log", payload)
+
+    def test_auth_health_is_cached_between_probes(self):
+        self.client.get("/health/auth/")
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/health/auth/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_auth_health_rejects_unknown_window(self):
+        response = self.client.get("/health/auth/", {"window": "30d"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ActivityLogWriterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="writer@example.com",
+            username="writer",
+            first_name="Log",
+            last_name="Writer",
+            password="ComplexPass123!",
+        )
+
+    def make_writer(self, **kwargs):
+        writer = ActivityLogWriter(mode=BUFFERED, flush_interval=60, **kwargs)
+        self.addCleanup(writer.shutdown)
+        return writer
+
+    def test_sync_mode_writes_immediately(self):
+        writer = ActivityLogWriter()
+        writer.log(self.user, "login", "User logged in successfully", "127.0.0.1")
+
+        self.assertEqual(UserActivityLog.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(writer.stats()["written"], 1)
+
+    def test_buffered_mode_queues_until_flush(self):
+        writer = self.make_writer()
+        with self.captureOnCommitCallbacks(execute=True):
+            writer.log(self.user, "login", "User logged in successfully")
+            writer.log(self.user, "logout", "User logged out successfully")
+
+        self.assertFalse(UserActivityLog.objects.filter(user=self.user).exists())
+        self.assertEqual(writer.stats()["pending"], 2)
+
+        writer.flush()
+
+        self.assertEqual(UserActivityLog.objects.filter(user=self.user).count(), 2)
+        stats = writer.stats()
+        self.assertEqual(stats["written"], 2)
+        self.assertEqual(stats["pending"], 0)
+        self.assertEqual(stats["flushes"], 1)
+
+    def test_buffered_mode_drops_events_when_queue_is_full(self):
+        writer = self.make_writer(max_queue_size=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            writer.log(self.user, "login", "User logged in successfully")
+            writer.log(self.user, "login", "User logged in successfully")
+
+        self.assertEqual(writer.stats()["dropped"], 1)
+        writer.flush()
+        self.assertEqual(UserActivityLog.objects.filter(user=self.user).count(), 1)
+
+    def test_buffered_flush_records_login_rollups(self):
+        writer = self.make_writer()
+        with self.captureOnCommitCallbacks(execute=True):
+            writer.log(self.user, "login", "User logged in successfully")
+            writer.log(self.user, "login", "User logged in successfully")
+            writer.log(self.user, "logout", "User logged out successfully")
+
+        writer.flush()
+
+        self.assertEqual(sum(LoginRollup.objects.values_list("count", flat=True)), 2)
+
+    def test_buffered_mode_skips_rolled_back_events(self):
+        writer = self.make_writer()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            writer.log(self.user, "login", "User logged in successfully")
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(writer.stats()["pending"], 0)
+
+    def test_buffered_mode_writes_events_logged_after_shutdown(self):
+        writer = self.make_writer()
+        writer.shutdown()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            writer.log(self.user, "logout", "User logged out successfully")
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(UserActivityLog.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(writer.stats()["pending"], 0)
+
+    def test_events_committed_during_shutdown_are_flushed(self):
+        writer = self.make_writer()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            writer.log(self.user, "login", "User logged in successfully")
+        writer.shutdown()
+
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(UserActivityLog.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(writer.stats()["pending"], 0)
+
+
+@override_settings(API_PAGE_SIZE=2, API_MAX_PAGE_SIZE=3)
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email="admin@example.com",
+            username="admin",
+            first_name="Admin",
+            last_name="User",
+            password="ComplexPass123!",
+            role="admin",
+        )
+        self.client.force_authenticate(self.admin)
+        for index in range(5):
+            UserActivityLog.objects.create(
+                user=self.admin,
+                activity_type="login",
+                description=f"Login {index}",
+            )
+
+    def collect_pages(self, url, key="description"):
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            seen.extend(row[key] for row in response.data["results"])
+            url = response.data["next"]
+        return seen
+
+    def test_activity_logs_walk_all_pages_newest_first(self):
+        descriptions = self.collect_pages(reverse("activity_logs"))
+
+        self.assertEqual(descriptions, [f"Login {i}" for i in range(4, -1, -1)])
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(reverse("activity_logs"), {"page_size": 50})
+
+        self.assertEqual(response.data["page_size"], 3)
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertTrue(response.data["has_more"])
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse("activity_logs"), {"cursor": "bogus"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_user_list_is_paginated_by_created_at(self):
+        for index in range(3):
+            User.objects.create_user(
+                email=f"member{index}@example.com",
+                username=f"member{index}",
+                first_name="Member",
+                last_name=str(index),
+                password="ComplexPass123!",
+            )
+
+        response = self.client.get(reverse("user_list"))
+
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data["results"][0]["username"], "member2")
+        self.assertEqual(
+            self.collect_pages(reverse("user_list"), key="username"),
+            ["member2", "member1", "member0", "admin"],
+        )
+
+
+@override_settings(AUTH_USER_CACHE_TTL=60)
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="cached@example.com",
+            username="cached",
+            first_name="Cached",
+            last_name="User",
+            password="ComplexPass123!",
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def test_profile_is_served_without_queries_on_cache_hit(self):
+        self.client.get(reverse("profile"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("profile"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], self.user.id)
+
+    def test_role_change_invalidates_cached_user(self):
+        self.assertEqual(
+            self.client.get(reverse("user_stats")).status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+
+        self.user.role = "admin"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        self.assertEqual(
+            self.client.get(reverse("user_stats")).status_code,
+            status.HTTP_200_OK,
+        )
+
+    def test_deactivation_rejects_cached_user(self):
+        self.client.get(reverse("profile"))
+
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_hash_is_not_cached(self):
+        self.client.get(reverse("profile"))
+
+        cached = get_cached_user(self.user.pk, get_user_version(self.user.pk))
+        self.assertIn("password", cached.get_deferred_fields())
+        self.assertNotIn(self.user.password, str(pickle.dumps(cached)))
+
+    def test_password_change_works_for_a_cached_user(self):
+        self.client.get(reverse("profile"))
+
+        response = self.client.post(reverse("change_password"), {
+            "old_password": "ComplexPass123!",
+            "new_password": "AnotherPass456!",
+            "new_password_confirm": "AnotherPass456!",
+        }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("AnotherPass456!"))
+
+    def test_version_is_bumped_only_after_commit(self):
+        version = get_user_version(self.user.pk)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.role = "admin"
+            self.user.save()
+            # A request reading the uncommitted row would cache the old
+            # role under the current version.
+            self.assertEqual(get_user_version(self.user.pk), version)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_user_version(self.user.pk), version)
+
+
+class UserStatCounterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            email="stats-admin@example.com",
+            username="statsadmin",
+            first_name="Stats",
+            last_name="Admin",
+            password="ComplexPass123!",
+            role="admin",
+        )
+        self.member = User.objects.create_user(
+            email="member@example.com",
+            username="member",
+            first_name="Member",
+            last_name="User",
+            password="ComplexPass123!",
+        )
+        self.client.force_authenticate(self.admin)
+
+    def assert_counters_match_table(self):
+        stored = dict(
+            UserStatCounter.objects.exclude(key=STATS_VERSION)
+            .values_list("key", "value"))
+        actual = compute_user_counters()
+        self.assertEqual(
+            {key: value for key, value in stored.items() if value},
+            actual,
+        )
+
+    def test_counters_follow_creates_updates_and_deletes(self):
+        self.assert_counters_match_table()
+
+        self.member.role = "moderator"
+        self.member.is_active = False
+        self.member.save()
+        self.assert_counters_match_table()
+
+        deferred = User.objects.only("id", "email").get(pk=self.member.pk)
+        deferred.is_active = True
+        deferred.save()
+        self.assert_counters_match_table()
+
+        self.member.delete()
+        self.assert_counters_match_table()
+
+    def test_stats_endpoint_reads_counters_in_one_query(self):
+        self.member.is_active = False
+        self.member.save()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("user_stats"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_users"], 2)
+        self.assertEqual(response.data["active_users"], 1)
+        self.assertEqual(response.data["inactive_users"], 1)
+        self.assertEqual(response.data["admin_users"], 1)
+        self.assertEqual(response.data["users_by_role"]["user"], 1)
+        self.assertEqual(sum(response.data["signups_by_day"].values()), 2)
+
+    def test_reconcile_repairs_drift(self):
+        User.objects.filter(pk=self.member.pk).update(role="admin")
+
+        drift = reconcile_user_counters()
+
+        self.assertEqual(drift["role:admin"], (1, 2))
+        self.assertEqual(reconcile_user_counters(), {})
+        self.assert_counters_match_table()
+
+
+@override_settings(METRICS_PUBLIC=True)
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.user = User.objects.create_user(
+            email="metrics@example.com",
+            username="metrics",
+            first_name="Metrics",
+            last_name="User",
+            password="ComplexPass123!",
+        )
+        self.client.force_authenticate(self.user)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1.0)
+    def test_sampled_requests_are_exposed_per_view(self):
+        self.client.get(reverse("activity_logs"))
+
+        body = self.client.get("/metrics/").content.decode()
+
+        self.assertIn('ums_db_queries_count{view="activity_logs"} 1', body)
+        self.assertIn('ums_serialization_seconds_count{view="activity_logs"} 1', body)
+        self.assertIn('ums_request_duration_seconds_bucket{view="activity_logs",le="+Inf"} 1', body)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_requests_are_not_recorded_when_sampling_is_off(self):
+        self.client.get(reverse("activity_logs"))
+
+        body = self.client.get("/metrics/").content.decode()
+
+        self.assertNotIn('view="activity_logs"', body)
+
+    def test_metrics_include_activity_log_writer_stats(self):
+        body = self.client.get("/metrics/").content.decode()
+
+        self.assertIn('ums_activity_log_written_total{mode="sync"}', body)
+        self.assertIn('ums_activity_log_pending{mode="sync"} 0', body)
+
+    @override_settings(METRICS_PUBLIC=False)
+    def test_metrics_are_closed_without_a_token(self):
+        self.assertEqual(self.client.get("/metrics/").status_code, 403)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get("/metrics/").status_code, 401)
+        response = self.client.get("/metrics/", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+
+
+class ActivityLogQueryCountTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser(
+            email="auditor@example.com",
+            username="auditor",
+            first_name="Audit",
+            last_name="Or",
+            password="ComplexPass123!",
+            role="admin",
+        )
+
+    def add_logs(self, count):
+        UserActivityLog.objects.bulk_create(
+            UserActivityLog(
+                user=self.user,
+                activity_type="login",
+                description="User logged in successfully",
+            )
+            for _ in range(count)
+        )
+
+    def count_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(captured)
+
+    @override_settings(API_MAX_PAGE_SIZE=100)
+    def test_activity_log_api_query_count_is_constant(self):
+        self.client.force_authenticate(self.user)
+        self.add_logs(3)
+        small_page = self.count_queries(reverse("activity_logs"), page_size=3)
+        self.add_logs(50)
+        large_page = self.count_queries(reverse("activity_logs"), page_size=50)
+
+        self.assertEqual(small_page, 1)
+        self.assertEqual(large_page, small_page)
+
+    @override_settings(
+        STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+    )
+    def test_activity_log_admin_changelist_query_count_is_constant(self):
+        self.client.force_login(self.user)
+        url = reverse("admin:accounts_useractivitylog_changelist")
+        self.add_logs(3)
+        few_rows = self.count_queries(url)
+        self.add_logs(50)
+        many_rows = self.count_queries(url)
+
+        self.assertEqual(many_rows, few_rows)
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            email="admin@example.com",
+            username="admin",
+            first_name="Admin",
+            last_name="User",
+            password="ComplexPass123!",
+            role="admin",
+        )
+        self.member = User.objects.create_user(
+            email="member@example.com",
+            username="member",
+            first_name="Member",
+            last_name="User",
+            password="ComplexPass123!",
+            is_active=False,
+        )
+        for activity_type in ("login", "logout", "login"):
+            UserActivityLog.objects.create(
+                user=self.member,
+                activity_type=activity_type,
+                description=f"Member {activity_type}",
+            )
+
+    def export(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        return b"".join(response.streaming_content).decode()
+
+    def test_activity_log_csv_filters_by_type(self):
+        self.client.force_authenticate(self.admin)
+
+        body = self.export("export_activity_logs", activity_type="login")
+
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({row["activity_type"] for row in rows}, {"login"})
+        self.assertEqual(rows[0]["user_email"], "member@example.com")
+
+    def test_user_ndjson_filters_by_role_and_active(self):
+        self.client.force_authenticate(self.admin)
+
+        body = self.export(
+            "export_users", format="ndjson", role="user", is_active="false")
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row["username"] for row in rows], ["member"])
+        self.assertIs(rows[0]["is_active"], False)
+
+    def test_time_range_excludes_rows_outside_window(self):
+        self.client.force_authenticate(self.admin)
+        since = (timezone.now() + timedelta(hours=1)).isoformat()
+
+        body = self.export("export_activity_logs", format="ndjson", since=since)
+
+        self.assertEqual(body, "")
+
+    @override_settings(EXPORT_CHUNK_SIZE=1)
+    def test_small_chunks_export_every_row(self):
+        self.client.force_authenticate(self.admin)
+
+        body = self.export("export_activity_logs")
+
+        self.assertEqual(len(body.splitlines()), 4)
+
+    def test_invalid_filters_return_400(self):
+        self.client.force_authenticate(self.admin)
+
+        response = self.client.get(
+            reverse("export_users"), {"format": "xml", "role": "owner"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("format", response.data)
+        self.assertIn("role", response.data)
+
+    def test_csv_escapes_formula_cells(self):
+        self.client.force_authenticate(self.admin)
+        UserActivityLog.objects.create(
+            user=self.member, activity_type="logout",
+            description="=HYPERLINK(\"http://evil.example\")",
+            user_agent="@SUM(1+1)")
+
+        body = self.export("export_activity_logs", activity_type="logout")
+
+        row = list(csv.DictReader(io.StringIO(body)))[-1]
+        self.assertEqual(row["description"], "'=HYPERLINK(\"http://evil.example\")")
+        self.assertEqual(row["user_agent"], "'@SUM(1+1)")
+
+    def test_non_admin_is_forbidden(self):
+        self.member.is_active = True
+        self.member.save()
+        self.client.force_authenticate(self.member)
+
+        response = self.client.get(reverse("export_activity_logs"))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_data_command_writes_ndjson(self):
+        out = io.StringIO()
+
+        call_command(
+            "export_data", "activity-logs", "--format", "ndjson",
+            "--activity-type", "logout", stdout=out)
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row["description"] for row in rows], ["Member logout"])
+
+    def test_export_data_command_writes_to_output_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "users.csv"
+
+            call_command("export_data", "users", "-o", str(path), stderr=io.StringIO())
+
+            with path.open(encoding="utf-8") as handle:
+                rows = list(csv.DictReader(handle))
+        self.assertEqual({row["username"] for row in rows}, {"admin", "member"})
+
+
+class ActivityLogRetentionTests(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.archive_dir.cleanup)
+        self.user = User.objects.create_user(
+            email="retention@example.com",
+            username="retention",
+            first_name="Retention",
+            last_name="User",
+            password="ComplexPass123!",
+        )
+        now = timezone.now()
+        UserActivityLog.objects.bulk_create(
+            UserActivityLog(
+                user=self.user,
+                activity_type="login",
+                description=f"Old {index}",
+                timestamp=now - timedelta(days=100 + index),
+            )
+            for index in range(5)
+        )
+        UserActivityLog.objects.create(
+            user=self.user, activity_type="login", description="Recent")
+
+    def archive(self, *args):
+        out = io.StringIO()
+        call_command(
+            "archive_activity_logs", "--days", "90", "--batch-size", "2",
+            "--archive-dir", self.archive_dir.name, *args, stdout=out)
+        return out.getvalue()
+
+    def archived_rows(self):
+        rows = []
+        for path in sorted(Path(self.archive_dir.name).glob("*.ndjson.gz")):
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                rows.extend(json.loads(line) for line in handle)
+        return rows
+
+    def test_archives_and_deletes_expired_rows_in_batches(self):
+        output = self.archive()
+
+        self.assertIn("Archived 5 activity logs", output)
+        self.assertIn("into 3 files", output)
+        self.assertEqual(
+            list(UserActivityLog.objects.values_list("description", flat=True)),
+            ["Recent"],
+        )
+        rows = self.archived_rows()
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(
+            {row["description"] for row in rows},
+            {f"Old {index}" for index in range(5)},
+        )
+        self.assertEqual(rows[0]["user_email"], "retention@example.com")
+
+    def test_max_batches_bounds_a_run(self):
+        self.archive("--max-batches", "1")
+
+        self.assertEqual(UserActivityLog.objects.count(), 4)
+        self.assertEqual(len(self.archived_rows()), 2)
+
+    def test_batches_stop_at_the_highest_expired_id(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.archive()
+
+        selects = [
+            query["sql"] for query in queries.captured_queries
+            if "LIMIT" in query["sql"]
+        ]
+        # Three full or partial batches, no trailing empty one.
+        self.assertEqual(len(selects), 3)
+
+    def test_cutoff_lookup_is_indexed(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, UserActivityLog._meta.db_table)
+
+        self.assertEqual(
+            constraints["activity_timestamp_idx"]["columns"], ["timestamp"])
+
+    def test_dry_run_writes_nothing(self):
+        output = self.archive("--dry-run")
+
+        self.assertIn("5 activity logs", output)
+        self.assertEqual(UserActivityLog.objects.count(), 6)
+        self.assertEqual(list(Path(self.archive_dir.name).iterdir()), [])
+
+
+class ImportUsersTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.hash = make_password("ComplexPass123!")
+        User.objects.create_user(
+            email="taken@example.com",
+            username="taken",
+            first_name="Taken",
+            last_name="User",
+            password="ComplexPass123!",
+        )
+
+    def write(self, name, content):
+        path = Path(self.tmp.name) / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def run_import(self, path, *args):
+        out = io.StringIO()
+        call_command("import_users", path, "--workers", "0",
+                     "--batch-size", "2", *args, stdout=out)
+        return out.getvalue()
+
+    def test_imports_csv_and_updates_stats(self):
+        path = self.write("users.csv", (
+            "email,username,first_name,last_name,role,password,password_hash\n"
+            f"a@example.com,alpha,Al,Pha,,,{self.hash}\n"
+            f"b@example.com,beta,Be,Ta,moderator,,{self.hash}\n"
+            "c@example.com,gamma,Gam,Ma,,AnotherPass456!,\n"
+        ))
+
+        output = self.run_import(path)
+
+        self.assertIn("Created 3 users, rejected 0 rows", output)
+        self.assertEqual(
+            User.objects.get(username="beta").role, "moderator")
+        self.assertTrue(
+            User.objects.get(username="gamma").check_password("AnotherPass456!"))
+        self.assertEqual(reconcile_user_counters(dry_run=True), {})
+        self.assertFalse(Path(f"{path}.checkpoint.json").exists())
+
+    def test_rejected_rows_are_summarized_without_passwords(self):
+        rejects = str(Path(self.tmp.name) / "rejects.ndjson")
+        rows = [
+            {"email": "TAKEN@example.com", "username": "new1",
+             "first_name": "A", "last_name": "B", "password_hash": self.hash},
+            {"email": "dup@example.com", "username": "dup",
+             "first_name": "A", "last_name": "B", "password_hash": self.hash},
+            {"email": "dup@example.com", "username": "dup2",
+             "first_name": "A", "last_name": "B", "password_hash": self.hash},
+            {"email": "weak@example.com", "username": "weak",
+             "first_name": "A", "last_name": "B", "password": "123"},
+        ]
+        path = self.write("users.ndjson", "\n".join(
+            [json.dumps(row) for row in rows] + ["not json"]))
+
+        output = self.run_import(path, "--rejects", rejects)
+
+        self.assertIn("Created 1 users, rejected 4 rows", output)
+        self.assertIn("email: Email already exists", output)
+        with open(rejects, encoding="utf-8") as handle:
+            rejected = {row["line"]: row for row in map(json.loads, handle)}
+        self.assertEqual(sorted(rejected), [1, 3, 4, 5])
+        self.assertNotIn("password", rejected[4]["row"])
+        self.assertIn("password", rejected[4]["errors"])
+
+    def test_resume_skips_consumed_rows(self):
+        rows = [
+            {"email": f"user{index}@example.com", "username": f"user{index}",
+             "first_name": "A", "last_name": "B", "password_hash": self.hash}
+            for index in range(4)
+        ]
+        path = self.write("users.ndjson", "\n".join(map(json.dumps, rows)))
+        Path(f"{path}.checkpoint.json").write_text(json.dumps(
+            {"consumed": 2, "created": 2, "rejected": 0, "reasons": {}}))
+
+        output = self.run_import(path, "--resume")
+
+        self.assertIn("Created 4 users", output)
+        self.assertEqual(
+            set(User.objects.filter(username__startswith="user")
+                .values_list("username", flat=True)),
+            {"user2", "user3"},
+        )
+
+    def test_existing_checkpoint_requires_resume(self):
+        path = self.write("users.ndjson", "")
+        Path(f"{path}.checkpoint.json").write_text("{}")
+
+        with self.assertRaises(CommandError):
+            self.run_import(path)
+
+    def test_passwords_are_hashed_in_worker_processes(self):
+        path = self.write("users.ndjson", json.dumps({
+            "email": "pool@example.com", "username": "pool",
+            "first_name": "Po", "last_name": "Ol",
+            "password": "AnotherPass456!",
+        }))
+
+        call_command("import_users", path, "--workers", "1",
+                     stdout=io.StringIO())
+
+        self.assertTrue(
+            User.objects.get(username="pool").check_password("AnotherPass456!"))
+
+
+class BulkUserActionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            email="admin@example.com",
+            username="admin",
+            first_name="Admin",
+            last_name="User",
+            password="ComplexPass123!",
+            role="admin",
+        )
+        self.members = [
+            User.objects.create_user(
+                email=f"member{index}@example.com",
+                username=f"member{index}",
+                first_name="Member",
+                last_name=str(index),
+                password="ComplexPass123!",
+            )
+            for index in range(3)
+        ]
+        self.client.force_authenticate(self.admin)
+
+    def bulk(self, payload):
+        return self.client.post(reverse("user_bulk_action"), payload, format="json")
+
+    @override_settings(BULK_USER_BATCH_SIZE=2)
+    def test_deactivate_revokes_tokens_and_cached_sessions(self):
+        member = self.members[0]
+        refresh = RefreshToken.for_user(member)
+        access = str(refresh.access_token)
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(
+            self.client.get(reverse("profile")).status_code, status.HTTP_200_OK)
+        self.client.credentials()
+        self.client.force_authenticate(self.admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.bulk({
+                "action": "deactivate",
+                "ids": [user.pk for user in self.members] + [self.admin.pk],
+            })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], 3)
+        self.assertEqual(response.data["tokens_revoked"], 1)
+        self.assertFalse(
+            User.objects.filter(pk__in=[u.pk for u in self.members],
+                                is_active=True).exists())
+        self.assertTrue(User.objects.get(pk=self.admin.pk).is_active)
+        self.assertTrue(
+            BlacklistedToken.objects.filter(token__jti=refresh["jti"]).exists())
+        self.assertEqual(
+            UserActivityLog.objects.filter(activity_type="deactivation").count(), 3)
+        self.assertEqual(reconcile_user_counters(dry_run=True), {})
+
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(
+            self.client.get(reverse("profile")).status_code,
+            status.HTTP_401_UNAUTHORIZED)
+
+    def test_set_role_by_filter_skips_users_already_in_role(self):
+        self.members[0].role = "moderator"
+        self.members[0].save()
+
+        response = self.bulk({
+            "action": "set_role",
+            "role": "moderator",
+            "filter": {"role": "user"},
+        })
+
+        self.assertEqual(response.data["updated"], 2)
+        self.assertEqual(User.objects.filter(role="moderator").count(), 3)
+        self.assertEqual(
+            UserActivityLog.objects.filter(activity_type="role_change").count(), 2)
+        self.assertEqual(reconcile_user_counters(dry_run=True), {})
+
+    def test_reactivate_is_one_update_per_batch(self):
+        User.objects.filter(username__startswith="member").update(is_active=False)
+        reconcile_user_counters()
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.bulk({"action": "reactivate", "filter": {"is_active": False}})
+
+        self.assertEqual(response.data["updated"], 3)
+        updates = [q for q in captured if q["sql"].startswith('UPDATE "accounts_user"')]
+        self.assertEqual(len(updates), 1)
+
+    def test_invalid_payloads_return_400(self):
+        for payload in (
+            {"action": "deactivate"},
+            {"action": "deactivate", "ids": [1], "filter": {"role": "user"}},
+            {"action": "deactivate", "filter": {}},
+            {"action": "set_role", "ids": [1]},
+            {"action": "delete", "ids": [1]},
+        ):
+            with self.subTest(payload=payload):
+                self.assertEqual(
+                    self.bulk(payload).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_admin_is_forbidden(self):
+        self.client.force_authenticate(self.members[0])
+
+        response = self.bulk({"action": "deactivate", "ids": [self.admin.pk]})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AdminUserSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            email="admin@example.com",
+            username="admin",
+            first_name="Admin",
+            last_name="User",
+            password="ComplexPass123!",
+            role="admin",
+        )
+        people = [
+            ("john.smith@example.com", "jsmith", "John", "Smith", "user"),
+            ("jane.doe@example.com", "janed", "Jane", "Doe", "moderator"),
+            ("bob@corp.io", "bobby", "Bob", "Johnson", "user"),
+        ]
+        for email, username, first_name, last_name, role in people:
+            User.objects.create_user(
+                email=email, username=username, first_name=first_name,
+                last_name=last_name, password="ComplexPass123!", role=role)
+        self.client.force_authenticate(self.admin)
+
+    def usernames(self, **params):
+        response = self.client.get(reverse("user_list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(row["username"] for row in response.data["results"])
+
+    def test_search_matches_substrings_across_fields(self):
+        self.assertEqual(self.usernames(search="JOHN"), ["bobby", "jsmith"])
+        self.assertEqual(self.usernames(search="john smith"), ["jsmith"])
+        self.assertEqual(self.usernames(search="corp.io"), ["bobby"])
+
+    def test_sqlite_search_uses_fts_table(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.usernames(search="doe")
+
+        if connection.vendor == "sqlite":
+            self.assertTrue(
+                any("accounts_user_fts" in q["sql"] for q in captured))
+
+    def test_search_index_follows_updates_and_deletes(self):
+        user = User.objects.get(username="janed")
+        user.email = "jane.roe@example.com"
+        user.last_name = "Roe"
+        user.save()
+        User.objects.filter(username="bobby").delete()
+
+        self.assertEqual(self.usernames(search="doe"), [])
+        self.assertEqual(self.usernames(search="roe"), ["janed"])
+        self.assertEqual(self.usernames(search="johnson"), [])
+
+    def test_short_terms_match_prefixes(self):
+        self.assertEqual(self.usernames(search="ja"), ["janed"])
+
+    def test_filters_combine_with_search(self):
+        User.objects.filter(username="bobby").update(is_email_verified=True)
+
+        self.assertEqual(self.usernames(role="moderator"), ["janed"])
+        self.assertEqual(
+            self.usernames(search="john", is_email_verified="true"), ["bobby"])
+        self.assertEqual(
+            self.usernames(role="user", is_active="false"), [])
+        future = (timezone.now() + timedelta(days=1)).isoformat()
+        self.assertEqual(self.usernames(created_after=future), [])
+
+    def test_invalid_filters_return_400(self):
+        response = self.client.get(reverse("user_list"), {"role": "owner"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(
+        STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+    )
+    def test_django_admin_search_uses_indexed_search(self):
+        self.client.force_login(self.admin)
+
+        response = self.client.get(
+            reverse("admin:accounts_user_changelist"), {"q": "smith"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, "john.smith@example.com")
+        self.assertNotContains(response, "jane.doe@example.com")
+
+
+@override_settings(TOKEN_BLACKLIST_SYNC_INTERVAL=60)
+class TokenBlacklistIndexTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="tokens@example.com",
+            username="tokens",
+            first_name="Token",
+            last_name="User",
+            password="ComplexPass123!",
+        )
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        values = [f"jti-{index}" for index in range(1000)]
+        for value in values:
+            bloom.add(value)
+
+        self.assertTrue(all(value in bloom for value in values))
+        false_positives = sum(f"other-{index}" in bloom for index in range(1000))
+        self.assertLess(false_positives, 50)
+
+    def test_valid_token_is_checked_without_queries(self):
+        get_blacklist_index().load()
+        token = str(RefreshToken.for_user(self.user))
+
+        with self.assertNumQueries(0):
+            RefreshToken(token)
+
+    def test_blacklisted_token_is_rejected_from_memory(self):
+        refresh = RefreshToken.for_user(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh.blacklist()
+
+        with self.assertNumQueries(0), self.assertRaises(TokenError):
+            RefreshToken(str(refresh))
+
+    def test_tokens_blacklisted_elsewhere_are_picked_up_on_sync(self):
+        index = BlacklistIndex(sync_interval=60)
+        index.load()
+        refresh = RefreshToken.for_user(self.user)
+        # Another worker blacklists the token directly in the database.
+        BlacklistedToken.objects.create(
+            token=OutstandingToken.objects.get(jti=refresh["jti"]))
+
+        self.assertFalse(index.is_blacklisted(refresh["jti"]))
+        index.sync(force=True)
+        self.assertTrue(index.is_blacklisted(refresh["jti"]))
+
+    def test_rows_committed_out_of_id_order_are_picked_up(self):
+        index = BlacklistIndex(sync_interval=60)
+        index.load()
+        first, second = (RefreshToken.for_user(self.user) for _ in range(2))
+        last_id = BlacklistedToken.objects.order_by("-id").values_list(
+            "id", flat=True).first() or 0
+        # The revocation with the higher id commits first.
+        BlacklistedToken.objects.create(
+            id=last_id + 2,
+            token=OutstandingToken.objects.get(jti=second["jti"]))
+        index.sync(force=True)
+        BlacklistedToken.objects.create(
+            id=last_id + 1,
+            token=OutstandingToken.objects.get(jti=first["jti"]))
+
+        index.sync(force=True)
+
+        self.assertTrue(index.is_blacklisted(first["jti"]))
+        self.assertTrue(index.is_blacklisted(second["jti"]))
+
+    def test_bulk_deactivation_feeds_the_index(self):
+        admin = User.objects.create_user(
+            email="boss@example.com",
+            username="boss",
+            first_name="Boss",
+            last_name="User",
+            password="ComplexPass123!",
+            role="admin",
+        )
+        token = str(RefreshToken.for_user(self.user))
+
+        apply_bulk_action(User.objects.filter(pk=self.user.pk), "deactivate", admin)
+
+        with self.assertRaises(TokenError):
+            RefreshToken(token)
+
+    def test_flush_expired_tokens_deletes_in_chunks(self):
+        past = timezone.now() - timedelta(days=1)
+        for index in range(3):
+            outstanding = OutstandingToken.objects.create(
+                user=self.user, jti=f"expired-{index}", token="x",
+                expires_at=past)
+            if index:
+                BlacklistedToken.objects.create(token=outstanding)
+        RefreshToken.for_user(self.user)
+        out = io.StringIO()
+
+        call_command("flush_expired_tokens", "--chunk-size", "2", stdout=out)
+
+        self.assertIn("Deleted 3 expired outstanding tokens and 2 blacklisted", out.getvalue())
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        self.assertEqual(BlacklistedToken.objects.count(), 0)
+
+
+@override_settings(TOKEN_BLACKLIST_SYNC_INTERVAL=60)
+class TokenRefreshTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="refresh@example.com",
+            username="refresh",
+            first_name="Re",
+            last_name="Fresh",
+            password="ComplexPass123!",
+        )
+        self.refresh = str(RefreshToken.for_user(self.user))
+
+    def post_refresh(self, token):
+        return self.client.post(
+            reverse("token_refresh"), {"refresh": token}, format="json")
+
+    @override_settings(AUTH_USER_CACHE_TTL=60)
+    def test_refresh_rotates_and_blacklists_in_few_queries(self):
+        self.post_refresh(str(RefreshToken.for_user(self.user)))  # warm caches
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.post_refresh(self.refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("access", response.data)
+        self.assertNotEqual(response.data["refresh"], self.refresh)
+        writes = [q["sql"] for q in captured
+                  if q["sql"].startswith(("SELECT", "INSERT", "UPDATE", "DELETE"))]
+        self.assertLessEqual(len(writes), 3)
+        new_jti = RefreshToken(response.data["refresh"])["jti"]
+        self.assertTrue(OutstandingToken.objects.filter(
+            jti=new_jti, user=self.user).exists())
+
+    def test_reusing_a_rotated_token_is_rejected(self):
+        self.assertEqual(self.post_refresh(self.refresh).status_code, status.HTTP_200_OK)
+
+        response = self.post_refresh(self.refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data["code"], "token_not_valid")
+
+    def test_inactive_user_cannot_refresh(self):
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.post_refresh(self.refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_new_access_token_authenticates(self):
+        access = self.post_refresh(self.refresh).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        response = self.client.get(reverse("profile"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_verify_accepts_valid_and_rejects_revoked_tokens(self):
+        access = str(AccessToken.for_user(self.user))
+        verify = reverse("token_verify")
+
+        self.assertEqual(
+            self.client.post(verify, {"token": access}, format="json").status_code,
+            status.HTTP_200_OK)
+        self.post_refresh(self.refresh)
+        self.assertEqual(
+            self.client.post(verify, {"token": self.refresh}, format="json").status_code,
+            status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(
+            self.client.post(verify, {"token": "garbage"}, format="json").status_code,
+            status.HTTP_401_UNAUTHORIZED)
+
+
+class ProfilePictureVariantTests(APITestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        overrides = override_settings(
+            MEDIA_ROOT=media.name, PROFILE_PICTURE_PROCESSING="sync",
+            PROFILE_PICTURE_FORMAT="webp")
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="picture@example.com",
+            username="picture",
+            first_name="Pic",
+            last_name="Ture",
+            password="ComplexPass123!",
+        )
+        self.client.force_authenticate(self.user)
+
+    def photo(self, width=2000, height=1000, name="photo.jpg"):
+        exif = Image.Exif()
+        exif[0x010F] = "Test Camera"  # Make
+        exif[0x8825] = {2: (48.0, 51.0, 24.0)}  # GPSInfo: GPSLatitude
+        buffer = io.BytesIO()
+        Image.new("RGB", (width, height), (200, 40, 40)).save(
+            buffer, "JPEG", exif=exif)
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+    def upload(self, picture):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.patch(
+                reverse("profile"), {"profile_picture": picture}, format="multipart")
+
+    def test_upload_renders_stripped_variants(self):
+        response = self.upload(self.photo())
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        paths = variant_paths(self.user)
+        self.assertEqual(set(paths), set(VARIANTS))
+        for name, path in paths.items():
+            with default_storage.open(path) as handle, Image.open(handle) as image:
+                self.assertEqual(image.format, "WEBP")
+                self.assertEqual(max(image.size), VARIANTS[name])
+                self.assertEqual(image.size[0], image.size[1] * 2)
+                self.assertNotIn("exif", image.info)
+
+        profile = self.client.get(reverse("profile")).data
+        self.assertEqual(set(profile["profile_picture_variants"]), set(VARIANTS))
+        self.assertTrue(
+            profile["profile_picture_variants"]["small"].startswith("http://testserver/"))
+
+    def test_stored_original_has_no_metadata(self):
+        self.upload(self.photo())
+
+        self.user.refresh_from_db()
+        self.assertEqual(
+            self.user.profile_picture.name,
+            self.user.profile_picture_variants["source"])
+        # The upload with its metadata is not kept next to the clean copy.
+        _, files = default_storage.listdir("profile_pics")
+        self.assertEqual(
+            files, [self.user.profile_picture.name.split("/")[-1]])
+        with self.user.profile_picture.open("rb") as handle, Image.open(handle) as image:
+            self.assertEqual(image.format, "JPEG")
+            self.assertEqual(image.size, (2000, 1000))
+            self.assertNotIn("exif", image.info)
+            self.assertFalse(image.getexif())
+
+    def test_replacing_the_picture_removes_old_variants(self):
+        self.upload(self.photo(name="first.jpg"))
+        self.user.refresh_from_db()
+        old_paths = variant_paths(self.user).values()
+
+        self.upload(self.photo(name="second.jpg"))
+
+        self.user.refresh_from_db()
+        self.assertIn("second", self.user.profile_picture_variants["source"])
+        for path in old_paths:
+            self.assertFalse(default_storage.exists(path))
+
+    def test_processing_failure_is_logged_not_raised(self):
+        picture = self.photo()
+        truncated = SimpleUploadedFile(
+            "broken.jpg", picture.read()[:2000], content_type="image/jpeg")
+
+        with self.assertLogs("accounts.images", "ERROR"):
+            response = self.upload(truncated)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(variant_paths(self.user), {})
+
+    @override_settings(PROFILE_PICTURE_MAX_PIXELS=1000)
+    def test_oversized_upload_is_rejected(self):
+        response = self.upload(self.photo(width=100, height=100))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("profile_picture", response.data)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.profile_picture)
+
+
+def throttle_rates(**rates):
+    return override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates})
+
+
+class LoginThrottleTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="throttle@example.com",
+            username="throttle",
+            first_name="Throt",
+            last_name="Tle",
+            password="ComplexPass123!",
+        )
+
+    def login(self, password, ip="198.51.100.1", **extra):
+        return self.client.post(
+            reverse("login"),
+            {"identifier": self.user.email, "password": password},
+            format="json",
+            REMOTE_ADDR=ip,
+            **extra,
+        )
+
+    def test_sliding_window_weights_the_previous_window(self):
+        for offset in range(3):
+            self.assertEqual(hit("test", 3, 60, now=600 + offset), 0)
+        self.assertGreater(hit("test", 3, 60, now=610), 0)
+
+        # Half way through the next window, about half the old count remains.
+        self.assertEqual(hit("test", 3, 60, now=690), 0)
+        self.assertEqual(hit("test", 3, 60, now=691), 0)
+        self.assertGreater(hit("test", 3, 60, now=692), 0)
+
+    @throttle_rates(login_ip="2/min")
+    def test_throttled_login_is_rejected_before_any_query(self):
+        self.login("wrong-password")
+        self.login("wrong-password")
+
+        with self.assertNumQueries(0):
+            response = self.login("ComplexPass123!")
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+        self.assertEqual(
+            self.login("ComplexPass123!", ip="198.51.100.2").status_code,
+            status.HTTP_200_OK)
+
+    @throttle_rates(login_ip="2/min")
+    def test_rotating_forwarded_for_is_still_throttled(self):
+        for i in range(2):
+            self.login("wrong-password", HTTP_X_FORWARDED_FOR=f"203.0.113.{i}")
+
+        response = self.login(
+            "ComplexPass123!", HTTP_X_FORWARDED_FOR="203.0.113.99")
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(NUM_PROXIES=1)
+    @throttle_rates(login_ip="2/min")
+    def test_client_ip_is_read_at_the_trusted_proxy_depth(self):
+        # The proxy appends the real client; the spoofed entries before it
+        # are ignored.
+        for i in range(2):
+            self.login(
+                "wrong-password", ip="10.0.0.1",
+                HTTP_X_FORWARDED_FOR=f"203.0.113.{i}, 198.51.100.9")
+
+        response = self.login(
+            "ComplexPass123!", ip="10.0.0.1",
+            HTTP_X_FORWARDED_FOR="203.0.113.99, 198.51.100.9")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        response = self.login(
+            "ComplexPass123!", ip="10.0.0.1",
+            HTTP_X_FORWARDED_FOR="198.51.100.10")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login_ip, "198.51.100.10")
+
+    @throttle_rates(login_identifier="2/min")
+    def test_identifier_limit_applies_across_addresses(self):
+        self.login("wrong-password", ip="198.51.100.1")
+        self.login("wrong-password", ip="198.51.100.2")
+
+        response = self.login("ComplexPass123!", ip="198.51.100.3")
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @throttle_rates(login_ip="1/min", login_identifier="2/min")
+    def test_attempts_rejected_by_ip_do_not_count_against_the_account(self):
+        self.login("wrong-password", ip="198.51.100.1")
+        for _ in range(3):
+            self.assertEqual(
+                self.login("wrong-password", ip="198.51.100.1").status_code,
+                status.HTTP_429_TOO_MANY_REQUESTS)
+
+        response = self.login("ComplexPass123!", ip="198.51.100.2")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class AsyncAuthViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.password = "ComplexPass123!"
+        self.user = User.objects.create_user(
+            email="async@example.com",
+            username="async",
+            first_name="As",
+            last_name="Ync",
+            password=self.password,
+        )
+
+    async def post(self, name, data, headers=None):
+        return await self.async_client.post(
+            reverse(name), data, content_type="application/json",
+            headers=headers)
+
+    async def get(self, name, user, **params):
+        token = AccessToken.for_user(user)
+        return await self.async_client.get(
+            reverse(name), params, headers={"Authorization": f"Bearer {token}"})
+
+    @override_settings(NUM_PROXIES=1)
+    async def test_login_returns_tokens_and_records_the_login(self):
+        response = await self.post(
+            "async_login", {"identifier": "ASYNC", "password": self.password},
+            headers={"X-Forwarded-For": "198.51.100.7"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual(body["user"]["id"], self.user.id)
+        refresh = RefreshToken(body["tokens"]["refresh"], verify=False)
+        self.assertTrue(await OutstandingToken.objects.filter(
+            jti=refresh["jti"], user_id=self.user.id).aexists())
+        user = await User.objects.aget(pk=self.user.pk)
+        self.assertEqual(user.last_login_ip, "198.51.100.7")
+        self.assertIsNotNone(user.last_login)
+        self.assertTrue(await UserActivityLog.objects.filter(
+            user_id=self.user.id, activity_type="login").aexists())
+
+    async def test_login_rejects_wrong_password(self):
+        response = await self.post(
+            "async_login", {"identifier": "async", "password": "wrong-password"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"non_field_errors": ["Invalid credentials"]})
+
+    async def test_login_rehashes_legacy_password_hash(self):
+        await User.objects.filter(pk=self.user.pk).aupdate(
+            password=make_password(self.password, hasher="pbkdf2_sha1"))
+
+        response = await self.post(
+            "async_login", {"identifier": "async", "password": self.password})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user = await User.objects.aget(pk=self.user.pk)
+        self.assertEqual(identify_hasher(user.password).algorithm, "pbkdf2_sha256")
+
+    @throttle_rates(login_ip="1/min")
+    async def test_login_is_throttled(self):
+        await self.post("async_login", {"identifier": "async", "password": "x"})
+
+        response = await self.post(
+            "async_login", {"identifier": "async", "password": self.password})
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+
+    async def test_register_creates_user_with_tokens(self):
+        response = await self.post("async_register", {
+            "email": "New.Async@Example.com",
+            "username": "new-async",
+            "first_name": "New",
+            "last_name": "Async",
+            "password": self.password,
+            "password_confirm": self.password,
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn("access", response.json()["tokens"])
+        user = await User.objects.aget(username="new-async")
+        self.assertEqual(user.email, "New.Async@example.com")
+        self.assertTrue(user.check_password(self.password))
+        self.assertTrue(await UserActivityLog.objects.filter(
+            user_id=user.id, activity_type="register").aexists())
+
+    async def test_register_reports_validation_errors(self):
+        response = await self.post("async_register", {
+            "email": self.user.email,
+            "username": "other",
+            "first_name": "Other",
+            "last_name": "User",
+            "password": self.password,
+            "password_confirm": self.password,
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("email", response.json())
+
+    async def test_profile_requires_a_token(self):
+        response = await self.async_client.get(reverse("async_profile"))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", response)
+
+    async def test_profile_matches_sync_endpoint(self):
+        response = await self.get("async_profile", self.user)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["email"], self.user.email)
+        self.assertEqual(response.json()["profile_picture_variants"], {})
+
+    async def test_activity_logs_are_paginated(self):
+        await UserActivityLog.objects.abulk_create(
+            UserActivityLog(user_id=self.user.id, activity_type="login",
+                            description=f"Login {index}")
+            for index in range(3)
+        )
+
+        first = (await self.get("async_activity_logs", self.user, page_size=2)).json()
+        second = (await self.get(
+            "async_activity_logs", self.user, page_size=2,
+            cursor=first["next_cursor"])).json()
+
+        self.assertTrue(first["has_more"])
+        self.assertEqual(len(first["results"]), 2)
+        self.assertFalse(second["has_more"])
+        self.assertEqual(len(second["results"]), 1)
+        self.assertEqual(first["results"][0]["user_email"], self.user.email)
+
+
+@override_settings(AUTH_USER_CACHE_TTL=60)
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="poller@example.com",
+            username="poller",
+            first_name="Poll",
+            last_name="Er",
+            password="ComplexPass123!",
+            role="admin",
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def test_unchanged_profile_returns_304_without_queries(self):
+        first = self.client.get(reverse("profile"))
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn("private", first["Cache-Control"])
+        self.assertIn("Last-Modified", first)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse("profile"), HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], first["ETag"])
+        self.assertEqual(response.content, b"")
+
+        response = self.client.get(
+            reverse("profile"), HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_profile_etag_changes_on_update_and_login(self):
+        etag = self.client.get(reverse("profile"))["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse("profile"), {"bio": "Hello"}, format="json")
+        response = self.client.get(reverse("profile"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["bio"], "Hello")
+
+        etag = response["ETag"]
+        self.user.refresh_from_db()
+        self.user.last_login = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=["last_login"])
+        response = self.client.get(reverse("profile"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_unchanged_stats_return_304(self):
+        first = self.client.get(reverse("user_stats"))
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse("user_stats"), HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        User.objects.create_user(
+            email="newcomer@example.com",
+            username="newcomer",
+            first_name="New",
+            last_name="Comer",
+            password="ComplexPass123!",
+        )
+        response = self.client.get(
+            reverse("user_stats"), HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_users"], 2)
+
+    def test_reconcile_keeps_and_advances_the_stats_version(self):
+        version = UserStatCounter.objects.get(key=STATS_VERSION).value
+        User.objects.filter(pk=self.user.pk).update(role="user")
+
+        reconcile_user_counters()
+
+        self.assertGreater(
+            UserStatCounter.objects.get(key=STATS_VERSION).value, version)
+
+
+class FastJSONTests(APITestCase):
+    def test_renderer_matches_drf_output(self):
+        data = {
+            "when": timezone.now(),
+            "amount": Decimal("1.50"),
+            "id": uuid.UUID(int=7),
+            "label": gettext_lazy("Name"),
+            "separators": "a\u2028b\u2029c",
+            "nested": [{"keys": (1, 2)}, None, True, "café"],
+            3: "int key",
+        }
+
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_malformed_json_returns_400(self):
+        response = self.client.post(
+            reverse("login"), b'{"identifier": ', content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("JSON parse error", response.data["detail"])
+
+
+class CompressionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="reader@example.com",
+            username="reader",
+            first_name="Rea",
+            last_name="Der",
+            password="ComplexPass123!",
+            role="admin",
+        )
+        self.client.force_authenticate(self.user)
+
+    def get_profile(self, bio, **headers):
+        User.objects.filter(pk=self.user.pk).update(bio=bio)
+        self.user.refresh_from_db()
+        return self.client.get(reverse("profile"), **headers)
+
+    def test_large_get_is_gzipped_when_accepted(self):
+        response = self.get_profile("word " * 400, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        body = json.loads(gzip.decompress(response.content))
+        self.assertEqual(body["bio"], "word " * 400)
+
+    def test_small_or_unaccepted_responses_are_not_compressed(self):
+        response = self.get_profile("", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+        response = self.get_profile("word " * 400)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        response = self.get_profile(
+            "word " * 400, HTTP_ACCEPT_ENCODING="gzip;q=0, identity")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_post_responses_are_not_compressed(self):
+        self.client.force_authenticate(None)
+        response = self.client.post(
+            reverse("login"),
+            {"identifier": "reader", "password": "ComplexPass123!"},
+            format="json",
+            HTTP_ACCEPT_ENCODING="gzip",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    @skipUnless(compression.brotli, "brotli is not installed")
+    def test_brotli_is_preferred_when_available(self):
+        response = self.get_profile(
+            "word " * 400, HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        body = json.loads(compression.brotli.decompress(response.content))
+        self.assertEqual(body["bio"], "word " * 400)
+
+    def test_streaming_export_is_compressed(self):
+        UserActivityLog.objects.bulk_create(
+            UserActivityLog(user=self.user, activity_type="login")
+            for _ in range(50)
+        )
+
+        response = self.client.get(
+            reverse("export_activity_logs"), {"format": "ndjson"},
+            HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        body = gzip.decompress(b"".join(response.streaming_content)).decode()
+        self.assertEqual(len(body.splitlines()), 50)
+
+    async def test_async_responses_are_compressed(self):
+        await User.objects.filter(pk=self.user.pk).aupdate(bio="word " * 400)
+        token = AccessToken.for_user(self.user)
+
+        response = await self.async_client.get(
+            reverse("async_profile"),
+            headers={"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"})
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(
+            json.loads(gzip.decompress(response.content))["bio"], "word " * 400)
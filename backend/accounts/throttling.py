@@ -0,0 +1,159 @@
+"""
+Sliding-window throttles for the unauthenticated auth endpoints.
+
+Login and registration hash a password on every request, so a credential
+stuffing burst would otherwise keep every worker busy in PBKDF2. These
+throttles run in DRF's ``initial()``, before the view body, so a rejected
+request costs a couple of cache round trips and no user lookup or hashing.
+
+Each key keeps one integer counter per fixed window. The rate over the last
+``window`` seconds is estimated as ``previous * (1 - elapsed / window) +
+current``, which smooths the burst allowed at window boundaries by plain
+fixed windows while using O(1) cache space, unlike DRF's timestamp lists.
+Counters live in the default cache: per process with LocMemCache, shared
+across workers with Redis or Memcached. The read and the increment are not
+one atomic step, so concurrent requests may overshoot a limit slightly.
+
+DRF consults every throttle even after one rejects a request. A request
+rejected by one of these throttles is not counted by the ones after it, so
+attempts refused by the per-IP limit do not use up the per-account limit and
+lock out the account's owner.
+
+Rates come from ``REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]``; a missing or
+empty rate disables that throttle.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache as default_cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from .utils import get_client_ip
+
+REJECTED_ATTR = "_sliding_window_rejected"
+
+
+def _window_keys(key, window, now):
+    slot = int(now // window)
+    return f"{key}:{slot}", f"{key}:{slot - 1}", now - slot * window
+
+
+def _retry_after(previous, current, elapsed, limit, window):
+    """0 if one more request fits, else the seconds until it would."""
+    if previous * (1 - elapsed / window) + current < limit:
+        return 0
+    if current >= limit:
+        # Wait for the next window, then for this one's weight to decay.
+        return (window - elapsed) + window * max(0.0, 1 - limit / current)
+    # Wait for the previous window's weight to decay below the headroom.
+    return max(1.0, window * (1 - (limit - current) / previous) - elapsed)
+
+
+def hit(key, limit, window, now=None, cache=default_cache):
+    """
+    Count one request against ``key``.
+
+    Returns 0 when the request is allowed, otherwise the seconds until it
+    would be. Rejected requests are not counted.
+    """
+    now = time.time() if now is None else now
+    current_key, previous_key, elapsed = _window_keys(key, window, now)
+    counts = cache.get_many([previous_key, current_key])
+    retry_after = _retry_after(
+        counts.get(previous_key, 0), counts.get(current_key, 0), elapsed,
+        limit, window)
+    if not retry_after:
+        # Two windows' lifetime: the counter is read again as "previous".
+        if not cache.add(current_key, 1, timeout=2 * window):
+            try:
+                cache.incr(current_key)
+            except ValueError:
+                cache.set(current_key, 1, timeout=2 * window)
+    return retry_after
+
+
+async def ahit(key, limit, window, now=None, cache=default_cache):
+    """``hit`` through the cache's async API."""
+    now = time.time() if now is None else now
+    current_key, previous_key, elapsed = _window_keys(key, window, now)
+    counts = await cache.aget_many([previous_key, current_key])
+    retry_after = _retry_after(
+        counts.get(previous_key, 0), counts.get(current_key, 0), elapsed,
+        limit, window)
+    if not retry_after:
+        if not await cache.aadd(current_key, 1, timeout=2 * window):
+            try:
+                await cache.aincr(current_key)
+            except ValueError:
+                await cache.aset(current_key, 1, timeout=2 * window)
+    return retry_after
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    def get_rate(self):
+        # Read at request time, so a changed REST_FRAMEWORK setting applies.
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope) or None
+
+    def allow_request(self, request, view):
+        if self.rate is None or getattr(request, REJECTED_ATTR, False):
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.retry_after = hit(
+            self.key, self.num_requests, self.duration, cache=self.cache)
+        if self.retry_after:
+            setattr(request, REJECTED_ATTR, True)
+        return not self.retry_after
+
+    async def aallow_request(self, request, view):
+        """``allow_request`` for async views."""
+        if self.rate is None or getattr(request, REJECTED_ATTR, False):
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.retry_after = await ahit(
+            self.key, self.num_requests, self.duration, cache=self.cache)
+        if self.retry_after:
+            setattr(request, REJECTED_ATTR, True)
+        return not self.retry_after
+
+    def wait(self):
+        return self.retry_after
+
+
+class ClientIPThrottle(SlidingWindowThrottle):
+    def get_cache_key(self, request, view):
+        ip = get_client_ip(request)
+        if not ip:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": ip}
+
+
+class LoginIPThrottle(ClientIPThrottle):
+    scope = "login_ip"
+
+
+class LoginIdentifierThrottle(SlidingWindowThrottle):
+    """Limits attempts against one account, whichever IPs they come from."""
+
+    scope = "login_identifier"
+
+    def get_cache_key(self, request, view):
+        data = getattr(request, "data", None)
+        if not hasattr(data, "get"):
+            return None
+        identifier = str(data.get("identifier") or data.get("email") or "")
+        identifier = identifier.strip().lower()
+        if not identifier:
+            return None
+        # Hashed to keep arbitrary user input out of cache keys.
+        ident = hashlib.sha256(identifier.encode()).hexdigest()[:32]
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class RegisterIPThrottle(ClientIPThrottle):
+    scope = "register_ip"
@@ -0,0 +1,123 @@
+"""
+Refresh token handling.
+
+``RefreshToken`` routes blacklist checks through ``BlacklistIndex``.
+``rotate_refresh_token`` implements the refresh endpoint: the presented
+token is verified in memory, its user is read from the auth cache, and the
+blacklist insert plus the new token's ``OutstandingToken`` row are written in
+one short transaction (three queries). The unique constraint on
+``BlacklistedToken.token`` makes concurrent reuse of one refresh token fail
+for all but the first request.
+"""
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken, OutstandingToken,
+)
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .blacklist import get_blacklist_index
+from .caching import get_cached_user, get_user_version, set_cached_user
+from .models import User
+
+
+class RefreshToken(tokens.RefreshToken):
+    """``RefreshToken`` whose blacklist checks go through ``BlacklistIndex``."""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if get_blacklist_index().is_blacklisted(jti):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        get_blacklist_index().add(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+
+async def acreate_refresh_token(user):
+    """``RefreshToken.for_user`` for async views, via the async ORM."""
+    # Token.for_user, skipping BlacklistMixin's synchronous insert.
+    refresh = super(tokens.BlacklistMixin, RefreshToken).for_user(user)
+    await OutstandingToken.objects.acreate(
+        user=user,
+        jti=refresh[api_settings.JTI_CLAIM],
+        token=str(refresh),
+        created_at=refresh.current_time,
+        expires_at=datetime_from_epoch(refresh["exp"]),
+    )
+    return refresh
+
+
+def load_active_user(token):
+    """Return the token's user through the auth cache, or raise TokenError."""
+    user_id = token.payload.get(api_settings.USER_ID_CLAIM)
+    cached = settings.AUTH_USER_CACHE_TTL > 0
+    version = get_user_version(user_id) if cached else None
+    user = get_cached_user(user_id, version) if cached else None
+    if user is None:
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is not None and cached:
+            set_cached_user(user, version)
+    if user is None or not user.is_active:
+        raise TokenError(_("User is inactive or no longer exists"))
+    return user
+
+
+def rotate_refresh_token(raw_token):
+    """Return ``{"access": ..., "refresh": ...}`` for a valid refresh token."""
+    refresh = RefreshToken(raw_token)
+    user = load_active_user(refresh)
+    data = {"access": str(refresh.access_token)}
+    if not api_settings.ROTATE_REFRESH_TOKENS:
+        return data
+
+    old_jti = refresh[api_settings.JTI_CLAIM]
+    old_expires_at = datetime_from_epoch(refresh["exp"])
+    refresh.set_jti()
+    refresh.set_exp()
+    refresh.set_iat()
+    data["refresh"] = str(refresh)
+
+    try:
+        with transaction.atomic():
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                outstanding_id = (
+                    OutstandingToken.objects.filter(jti=old_jti)
+                    .values_list("id", flat=True).first()
+                )
+                if outstanding_id is None:
+                    outstanding_id = OutstandingToken.objects.create(
+                        user=user, jti=old_jti, token=raw_token,
+                        expires_at=old_expires_at).id
+                BlacklistedToken.objects.create(token_id=outstanding_id)
+                get_blacklist_index().add(old_jti)
+            # Track the new token so logout and bulk deactivation can
+            # revoke it.
+            OutstandingToken.objects.create(
+                user=user,
+                jti=refresh[api_settings.JTI_CLAIM],
+                token=data["refresh"],
+                created_at=refresh.current_time,
+                expires_at=datetime_from_epoch(refresh["exp"]),
+            )
+    except IntegrityError:
+        # Another request rotated this token first.
+        raise TokenError(_("Token is blacklisted"))
+    return data
+
+
+def verify_token(raw_token):
+    """Validate any token type; refresh tokens are also checked for revocation."""
+    token = tokens.UntypedToken(raw_token)
+    if token.get(api_settings.TOKEN_TYPE_CLAIM) == RefreshToken.token_type:
+        jti = token[api_settings.JTI_CLAIM]
+        if get_blacklist_index().is_blacklisted(jti):
+            raise TokenError(_("Token is blacklisted"))
+    return token
@@ -5,9 +5,15 @@ urlpatterns = [
     path('register/', views.register_user, name='register'),
     path('login/', views.login_user, name='login'),
     path('logout/', views.logout_user, name='logout'),
+    path('refresh/', views.TokenRefreshView.as_view(), name='token_refresh'),
+    path('verify/', views.TokenVerifyView.as_view(), name='token_verify'),
     path('profile/', views.UserProfileView.as_view(), name='profile'),
     path('change-password/', views.change_password, name='change_password'),
     path('activity-logs/', views.UserActivityLogView.as_view(), name='activity_logs'),
     path('users/', views.AdminUserListView.as_view(), name='user_list'),
+    path('users/bulk/', views.bulk_user_action, name='user_bulk_action'),
     path('stats/', views.user_stats, name='user_stats'),
+    path('export/activity-logs/', views.ActivityLogExportView.as_view(),
+         name='export_activity_logs'),
+    path('export/users/', views.UserExportView.as_view(), name='export_users'),
 ]
@@ -0,0 +1,22 @@
+from django.conf import settings
+
+
+def get_client_ip(request):
+    """
+    The client address as seen by the outermost trusted proxy.
+
+    ``X-Forwarded-For`` is client-controlled except for the entries appended
+    by our own proxies, so with ``NUM_PROXIES`` proxies in front of the app
+    the client is the ``NUM_PROXIES``-th entry from the right. With none
+    (the default) the header is ignored and ``REMOTE_ADDR`` is used.
+    """
+    num_proxies = settings.NUM_PROXIES
+    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if num_proxies > 0 and x_forwarded_for:
+        addresses = [
+            address.strip() for address in x_forwarded_for.split(",")
+            if address.strip()
+        ]
+        if addresses:
+            return addresses[-min(num_proxies, len(addresses))]
+    return request.META.get("REMOTE_ADDR")
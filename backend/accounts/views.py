@@ -1,32 +1,48 @@
 from rest_framework import status, generics, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (
+    api_view, permission_classes, throttle_classes,
+)
+from rest_framework.negotiation import DefaultContentNegotiation
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.views import APIView
 from rest_framework_simplejwt.exceptions import TokenError
-from django.contrib.auth import login
+from rest_framework_simplejwt.views import TokenViewBase
+from django.contrib.auth import login, user_logged_in
 from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from .activity import get_activity_log_writer
+from .bulk import apply_bulk_action
+from .conditional import not_modified, profile_validators, set_validators
+from .exports import (
+    ACTIVITY_LOG_COLUMNS, FORMATS as EXPORT_FORMATS, USER_COLUMNS,
+    activity_log_queryset, stream_export, user_queryset,
+)
+from .images import schedule_variants
 from .models import User, UserActivityLog
+from .pagination import ActivityLogPagination, UserPagination
+from .search import search_users
+from .stats import read_user_stats
+from .throttling import (
+    LoginIdentifierThrottle, LoginIPThrottle, RegisterIPThrottle,
+)
+from .tokens import RefreshToken
+from .utils import get_client_ip
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer,
-    UserProfileSerializer, PasswordChangeSerializer, UserActivityLogSerializer
+    UserProfileSerializer, PasswordChangeSerializer, UserActivityLogSerializer,
+    ActivityLogExportFilterSerializer, UserExportFilterSerializer,
+    BulkUserActionSerializer, UserListFilterSerializer,
+    TokenRefreshSerializer, TokenVerifySerializer
 )
 
 
-def get_client_ip(request):
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    return ip
-
-
 def log_user_activity(user, activity_type, description, request):
-    UserActivityLog.objects.create(
-        user=user,
-        activity_type=activity_type,
-        description=description,
+    get_activity_log_writer().log(
+        user,
+        activity_type,
+        description,
         ip_address=get_client_ip(request),
         user_agent=request.META.get('HTTP_USER_AGENT', '')
     )
@@ -34,6 +50,7 @@ def log_user_activity(user, activity_type, description, request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterIPThrottle])
 def register_user(request):
     serializer = UserRegistrationSerializer(data=request.data)
     if serializer.is_valid():
@@ -57,11 +74,16 @@ def register_user(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginIdentifierThrottle])
 def login_user(request):
     serializer = UserLoginSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data['user']
-        login(request, user)
+        if hasattr(request, 'session'):
+            login(request, user)
+        else:
+            # API-only profile: no sessions, but last_login is still updated.
+            user_logged_in.send(sender=user.__class__, request=request, user=user)
 
         # Update last login IP
         user.last_login_ip = get_client_ip(request)
@@ -101,6 +123,14 @@ def logout_user(request):
         return Response({'error': 'Invalid token'}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class TokenRefreshView(TokenViewBase):
+    serializer_class = TokenRefreshSerializer
+
+
+class TokenVerifyView(TokenViewBase):
+    serializer_class = TokenVerifySerializer
+
+
 class UserProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated]
@@ -108,6 +138,19 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         return self.request.user
 
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = profile_validators(self.get_object())
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = set_validators(
+                super().retrieve(request, *args, **kwargs), etag, last_modified)
+        return response
+
+    def perform_update(self, serializer):
+        user = serializer.save()
+        if serializer.validated_data.get('profile_picture'):
+            schedule_variants(user.pk)
+
     def update(self, request, *args, **kwargs):
         response = super().update(request, *args, **kwargs)
         if response.status_code == 200:
@@ -137,24 +180,72 @@ def change_password(request):
 class UserActivityLogView(generics.ListAPIView):
     serializer_class = UserActivityLogSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ActivityLogPagination
 
     def get_queryset(self):
-        return UserActivityLog.objects.filter(user=self.request.user)
+        return (
+            UserActivityLog.objects.filter(user=self.request.user)
+            .select_related('user')
+        )
 
 
 class AdminUserListView(generics.ListAPIView):
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = UserPagination
 
     def get_queryset(self):
-        return User.objects.all()
+        queryset = User.objects.all()
+        filters = self.filters
+        if 'search' in filters:
+            queryset = search_users(queryset, filters['search'])
+        for field in ('role', 'is_active', 'is_email_verified'):
+            if field in filters:
+                queryset = queryset.filter(**{field: filters[field]})
+        if 'created_after' in filters:
+            queryset = queryset.filter(created_at__gte=filters['created_after'])
+        if 'created_before' in filters:
+            queryset = queryset.filter(created_at__lt=filters['created_before'])
+        return queryset
 
     def list(self, request, *args, **kwargs):
         if request.user.role != 'admin':
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = UserListFilterSerializer(data=request.query_params.dict())
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        self.filters = serializer.validated_data
         return super().list(request, *args, **kwargs)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_user_action(request):
+    if request.user.role != 'admin':
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    serializer = BulkUserActionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    if 'ids' in data:
+        queryset = User.objects.filter(pk__in=data['ids'])
+    else:
+        queryset = user_queryset(**data['filter'])
+
+    summary = apply_bulk_action(
+        queryset,
+        data['action'],
+        request.user,
+        role=data.get('role'),
+        ip_address=get_client_ip(request),
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+    )
+    return Response({'action': data['action'], **summary})
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_stats(request):
@@ -162,13 +253,60 @@ def user_stats(request):
     if user.role != 'admin':
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
-    total_users = User.objects.count()
-    active_users = User.objects.filter(is_active=True).count()
-    admin_users = User.objects.filter(role='admin').count()
+    stats, etag, last_modified = read_user_stats()
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        response = set_validators(Response(stats), etag, last_modified)
+    return response
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    def select_renderer(self, request, renderers, format_suffix=None):
+        # ?format= picks the export format here, not a DRF renderer; errors
+        # are rendered with the first (JSON) renderer.
+        return renderers[0], renderers[0].media_type
+
+
+class ExportView(APIView):
+    """Stream a dataset as CSV or NDJSON (``?format=``) to admins."""
+
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = ExportContentNegotiation
+    filter_serializer_class = None
+    # Called with the validated filters, minus format.
+    queryset_factory = None
+    name = None
+    columns = None
+
+    def get(self, request):
+        if request.user.role != 'admin':
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        filters = self.filter_serializer_class(data=request.query_params.dict())
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        params = dict(filters.validated_data)
+        export_format = params.pop('format')
+        response = StreamingHttpResponse(
+            stream_export(self.queryset_factory(**params), self.columns, export_format),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        stamp = timezone.now().strftime('%Y%m%dT%H%M%SZ')
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.name}-{stamp}.{export_format}"')
+        return response
+
+
+class ActivityLogExportView(ExportView):
+    filter_serializer_class = ActivityLogExportFilterSerializer
+    queryset_factory = staticmethod(activity_log_queryset)
+    name = 'activity-logs'
+    columns = ACTIVITY_LOG_COLUMNS
+
 
-    return Response({
-        'total_users': total_users,
-        'active_users': active_users,
-        'admin_users': admin_users,
-        'inactive_users': total_users - active_users
-    })
+class UserExportView(ExportView):
+    filter_serializer_class = UserExportFilterSerializer
+    queryset_factory = staticmethod(user_queryset)
+    name = 'users'
+    columns = USER_COLUMNS
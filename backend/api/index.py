@@ -1,5 +1,16 @@
 import os
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "user_management.settings")
+# API-only profile: no admin, sessions or static files, for faster cold
+# starts. Set DJANGO_SETTINGS_MODULE=user_management.settings to serve the
+# admin from the function as well.
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "user_management.settings_api")
+# Serverless instances are short-lived and numerous; connect through the
+# provider's transaction pooler and reuse the connection while warm.
+os.environ.setdefault("DB_CONNECTION_MODE", "pooled")
+# An instance may be frozen as soon as the response is sent, before a
+# background job runs; render profile picture variants within the request.
+os.environ.setdefault("PROFILE_PICTURE_PROCESSING", "sync")
+# Vercel's edge replaces X-Forwarded-For with the client address.
+os.environ.setdefault("NUM_PROXIES", "1")
 
 from user_management.wsgi import application as app  # noqa: E402
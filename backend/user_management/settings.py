@@ -39,9 +39,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "accounts.middleware.RequestMetricsMiddleware",
+    "accounts.compression.CompressionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "accounts.staticfiles.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -116,6 +118,33 @@ def database_config_from_url(database_url: str):
     raise ValueError(f"Unsupported DATABASE_URL scheme: {scheme}")
 
 
+def database_connection_options(mode: str, conn_max_age: int):
+    """
+    Connection reuse settings for one DATABASES entry.
+
+    - ``persistent``: keep connections open between requests for
+      ``conn_max_age`` seconds and ping them before reuse (long-running
+      gunicorn/uvicorn workers).
+    - ``pooled``: connect through an external transaction-mode pooler such as
+      PgBouncer or the Neon ``-pooler`` endpoint (serverless). Client-side
+      connections are still reused while the function instance is warm, and
+      server-side cursors are disabled because they do not survive
+      transaction pooling.
+    - ``per_request``: open and close a connection for every request.
+    """
+    if mode == "persistent":
+        return {"CONN_MAX_AGE": conn_max_age, "CONN_HEALTH_CHECKS": True}
+    if mode == "pooled":
+        return {
+            "CONN_MAX_AGE": conn_max_age,
+            "CONN_HEALTH_CHECKS": True,
+            "DISABLE_SERVER_SIDE_CURSORS": True,
+        }
+    if mode == "per_request":
+        return {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False}
+    raise ValueError(f"Unsupported DB_CONNECTION_MODE: {mode}")
+
+
 DATABASE_URL = config("DATABASE_URL", default="")
 DB_ENGINE = config("DB_ENGINE", default="sqlite").lower()
 
@@ -159,6 +188,16 @@ else:
         }
     }
 
+DB_CONNECTION_MODE = config("DB_CONNECTION_MODE", default="persistent").lower()
+DB_CONN_MAX_AGE = config("DB_CONN_MAX_AGE", default=60, cast=int)
+DATABASES["default"].update(
+    database_connection_options(DB_CONNECTION_MODE, DB_CONN_MAX_AGE)
+)
+if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"].setdefault("OPTIONS", {}).setdefault(
+        "connect_timeout", config("DB_CONNECT_TIMEOUT", default=5, cast=int)
+    )
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -174,6 +213,50 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Preferred password hasher: "pbkdf2", "scrypt" (memory-hard, no extra
+# dependency) or "argon2" (memory-hard, needs argon2-cffi). The other hashers
+# stay available to verify existing hashes, which are upgraded to the
+# preferred hasher and cost on the next successful login.
+PASSWORD_HASHER_CHOICES = {
+    "argon2": "accounts.hashers.TunableArgon2PasswordHasher",
+    "scrypt": "accounts.hashers.TunableScryptPasswordHasher",
+    "pbkdf2": "accounts.hashers.TunablePBKDF2PasswordHasher",
+}
+PASSWORD_HASHER = config("PASSWORD_HASHER", default="pbkdf2").lower()
+if PASSWORD_HASHER not in PASSWORD_HASHER_CHOICES:
+    raise ValueError(f"Unsupported PASSWORD_HASHER: {PASSWORD_HASHER}")
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CHOICES[PASSWORD_HASHER],
+    *(
+        path
+        for name, path in PASSWORD_HASHER_CHOICES.items()
+        if name != PASSWORD_HASHER
+    ),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+]
+PASSWORD_PBKDF2_ITERATIONS = config(
+    "PASSWORD_PBKDF2_ITERATIONS", default=600000, cast=int
+)
+PASSWORD_SCRYPT_WORK_FACTOR = config(
+    "PASSWORD_SCRYPT_WORK_FACTOR", default=2**14, cast=int
+)
+PASSWORD_SCRYPT_BLOCK_SIZE = config("PASSWORD_SCRYPT_BLOCK_SIZE", default=8, cast=int)
+PASSWORD_SCRYPT_PARALLELISM = config(
+    "PASSWORD_SCRYPT_PARALLELISM", default=1, cast=int
+)
+PASSWORD_ARGON2_TIME_COST = config("PASSWORD_ARGON2_TIME_COST", default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config(
+    "PASSWORD_ARGON2_MEMORY_COST", default=102400, cast=int
+)
+PASSWORD_ARGON2_PARALLELISM = config(
+    "PASSWORD_ARGON2_PARALLELISM", default=8, cast=int
+)
+# Threads that hash passwords for the async views (/api/async/auth/). Hashing
+# beyond this many concurrent logins queues instead of starving the loop.
+PASSWORD_HASHING_WORKERS = config(
+    "PASSWORD_HASHING_WORKERS", default=os.cpu_count() or 1, cast=int)
+
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
 USE_I18N = True
@@ -186,18 +269,106 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Profile picture variants: rendered in a thread pool ("background") or
+# inline after the upload commits ("sync"). Uploads above either limit are
+# rejected before decoding. PROFILE_PICTURE_FORMAT is webp or jpeg.
+PROFILE_PICTURE_PROCESSING = config("PROFILE_PICTURE_PROCESSING", default="background")
+PROFILE_PICTURE_WORKERS = config("PROFILE_PICTURE_WORKERS", default=2, cast=int)
+PROFILE_PICTURE_MAX_BYTES = config(
+    "PROFILE_PICTURE_MAX_BYTES", default=5 * 1024 * 1024, cast=int)
+PROFILE_PICTURE_MAX_PIXELS = config(
+    "PROFILE_PICTURE_MAX_PIXELS", default=25_000_000, cast=int)
+PROFILE_PICTURE_FORMAT = config("PROFILE_PICTURE_FORMAT", default="webp")
+PROFILE_PICTURE_QUALITY = config("PROFILE_PICTURE_QUALITY", default=80, cast=int)
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 AUTH_USER_MODEL = "accounts.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # orjson-backed JSON (accounts.renderers); falls back to DRF's encoder
+    # when orjson is not installed.
+    "DEFAULT_RENDERER_CLASSES": [
+        "accounts.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "accounts.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # Sliding-window limits for login and registration (accounts.throttling),
+    # as "<requests>/<sec|min|hour|day>". An empty value disables one. The
+    # counters live in the default cache, so with the per-process LocMemCache
+    # each worker enforces its own limit; set a shared CACHE_BACKEND to make
+    # them global.
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": config("THROTTLE_RATE_LOGIN_IP", default="30/min"),
+        "login_identifier": config("THROTTLE_RATE_LOGIN_IDENTIFIER", default="10/min"),
+        "register_ip": config("THROTTLE_RATE_REGISTER_IP", default="20/hour"),
+    },
 }
 
+# Reverse proxies in front of the app that append to X-Forwarded-For. The
+# client IP used for throttling and logging is taken that many entries from
+# the right; with 0 the header is ignored in favour of REMOTE_ADDR.
+NUM_PROXIES = config("NUM_PROXIES", default=0, cast=int)
+
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": config("CACHE_LOCATION", default="user-management"),
+    }
+}
+
+# Seconds an authenticated user may be served from the cache. Entries are
+# invalidated on every save, but only in processes sharing the cache backend,
+# so the default is 0 (disabled) unless CACHE_BACKEND is shared (Redis,
+# Memcached, database). The password hash is never cached.
+CACHE_IS_SHARED = CACHES["default"]["BACKEND"] not in {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+AUTH_USER_CACHE_TTL = config(
+    "AUTH_USER_CACHE_TTL", default=60 if CACHE_IS_SHARED else 0, cast=int
+)
+
+# Seconds /health/auth/ reuses a computed login summary within one process.
+AUTH_HEALTH_CACHE_SECONDS = config("AUTH_HEALTH_CACHE_SECONDS", default=5, cast=int)
+
+# Fraction of requests recorded by RequestMetricsMiddleware (0 disables it).
+# /metrics/ requires METRICS_TOKEN as a bearer token; without a token it is
+# closed unless METRICS_PUBLIC is set (for local development only).
+REQUEST_METRICS_SAMPLE_RATE = config(
+    "REQUEST_METRICS_SAMPLE_RATE", default=0.1, cast=float
+)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+METRICS_PUBLIC = env_bool("METRICS_PUBLIC", False)
+
+# Users updated per transaction by the admin bulk endpoint (users/bulk/).
+BULK_USER_BATCH_SIZE = config("BULK_USER_BATCH_SIZE", default=1000, cast=int)
+
+# Rows fetched per round trip by the streaming CSV/NDJSON exports.
+EXPORT_CHUNK_SIZE = config("EXPORT_CHUNK_SIZE", default=2000, cast=int)
+
+# Responses to GET/HEAD smaller than this many bytes are sent uncompressed
+# (accounts.compression). Brotli (0-11) is used when the brotli package is
+# installed and the client accepts it; otherwise gzip.
+COMPRESSION_MIN_SIZE = config("COMPRESSION_MIN_SIZE", default=1024, cast=int)
+COMPRESSION_BROTLI_QUALITY = config("COMPRESSION_BROTLI_QUALITY", default=4, cast=int)
+
+# Keyset pagination for list endpoints (?page_size= is capped at the maximum).
+API_PAGE_SIZE = config("API_PAGE_SIZE", default=50, cast=int)
+API_MAX_PAGE_SIZE = config("API_MAX_PAGE_SIZE", default=200, cast=int)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -205,6 +376,43 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
 }
 
+# In-process index in front of the refresh token blacklist (accounts/blacklist.py).
+# Other workers' revocations are picked up within TOKEN_BLACKLIST_SYNC_INTERVAL
+# seconds; 0 syncs before every check.
+TOKEN_BLACKLIST_BLOOM_CAPACITY = config(
+    "TOKEN_BLACKLIST_BLOOM_CAPACITY", default=100000, cast=int
+)
+TOKEN_BLACKLIST_BLOOM_ERROR_RATE = config(
+    "TOKEN_BLACKLIST_BLOOM_ERROR_RATE", default=0.001, cast=float
+)
+TOKEN_BLACKLIST_LRU_SIZE = config("TOKEN_BLACKLIST_LRU_SIZE", default=10000, cast=int)
+TOKEN_BLACKLIST_SYNC_INTERVAL = config(
+    "TOKEN_BLACKLIST_SYNC_INTERVAL", default=1.0, cast=float
+)
+
+# Activity log writes: "sync" inserts on the request path, "buffered" queues
+# events in-process and flushes them with bulk_create.
+ACTIVITY_LOG_MODE = config("ACTIVITY_LOG_MODE", default="sync").lower()
+ACTIVITY_LOG_BATCH_SIZE = config("ACTIVITY_LOG_BATCH_SIZE", default=200, cast=int)
+ACTIVITY_LOG_FLUSH_INTERVAL = config(
+    "ACTIVITY_LOG_FLUSH_INTERVAL", default=1.0, cast=float
+)
+ACTIVITY_LOG_MAX_QUEUE_SIZE = config(
+    "ACTIVITY_LOG_MAX_QUEUE_SIZE", default=10000, cast=int
+)
+
+# Activity log retention: `manage.py archive_activity_logs` moves older rows
+# into gzipped NDJSON files and deletes them in batches of this size.
+ACTIVITY_LOG_RETENTION_DAYS = config(
+    "ACTIVITY_LOG_RETENTION_DAYS", default=90, cast=int
+)
+ACTIVITY_LOG_ARCHIVE_DIR = config(
+    "ACTIVITY_LOG_ARCHIVE_DIR", default=str(BASE_DIR / "archive")
+)
+ACTIVITY_LOG_ARCHIVE_BATCH_SIZE = config(
+    "ACTIVITY_LOG_ARCHIVE_BATCH_SIZE", default=5000, cast=int
+)
+
 CORS_ALLOWED_ORIGINS = config(
     "CORS_ALLOWED_ORIGINS",
     default="http://localhost:3000,http://127.0.0.1:3000",
@@ -0,0 +1,58 @@
+"""
+API-only settings for the serverless entry point (``api/index.py``).
+
+Everything from ``settings`` applies, minus what only the admin and the
+browsable API need: the admin, sessions, messages and staticfiles apps, their
+middleware and the template-based renderers. Each cold start then skips
+importing and checking them. Clients authenticate with JWTs, so logins
+without a session behave the same apart from the session cookie.
+
+Select it with ``DJANGO_SETTINGS_MODULE=user_management.settings_api``; set
+``DJANGO_SETTINGS_MODULE=user_management.settings`` on the deployment to
+serve ``/admin/`` from the function again.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, TEMPLATES
+
+API_EXCLUDED_APPS = {
+    "django.contrib.admin",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+}
+API_EXCLUDED_MIDDLEWARE = {
+    "accounts.staticfiles.StaticFilesMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    # Only cookie-authenticated requests need CSRF checks; DRF views are
+    # exempt and the remaining views are read-only.
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_EXCLUDED_APPS]
+MIDDLEWARE = [name for name in MIDDLEWARE if name not in API_EXCLUDED_MIDDLEWARE]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "context_processors": [
+                processor
+                for processor in TEMPLATES[0]["OPTIONS"]["context_processors"]
+                if not processor.startswith("django.contrib.messages.")
+            ],
+        },
+    }
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": [
+        renderer
+        for renderer in REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"]
+        if renderer != "rest_framework.renderers.BrowsableAPIRenderer"
+    ],
+}
@@ -1,26 +1,27 @@
-from datetime import timedelta
-
 import django
-from accounts.models import UserActivityLog
+from accounts import metrics
+from accounts.activity import get_activity_log_writer
+from accounts.rollups import DEFAULT_WINDOW, WINDOWS as LOGIN_WINDOWS, login_summary
+from django.apps import apps
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib import admin
 from django.db import connection
 from django.db.utils import OperationalError
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
 from django.urls import include, path
 from django.utils import timezone
 
 
 def root_status(request):
-    return JsonResponse(
-        {
-            "status": "ok",
-            "service": "user_management_system_api",
-            "docs_hint": "/api/auth/",
-            "admin": "/admin/",
-        }
-    )
+    payload = {
+        "status": "ok",
+        "service": "user_management_system_api",
+        "docs_hint": "/api/auth/",
+    }
+    if apps.is_installed("django.contrib.admin"):
+        payload["admin"] = "/admin/"
+    return JsonResponse(payload)
 
 
 def api_status(request):
@@ -29,8 +30,10 @@ def api_status(request):
             "status": "ok",
             "service": "user_management_system_api",
             "base_path": "/api/auth/",
+            "async_base_path": "/api/async/auth/",
             "health": "/health/",
             "auth_health": "/health/auth/",
+            "metrics": "/metrics/",
         }
     )
 
@@ -62,24 +65,25 @@ def health_status(request):
 
 
 def auth_health_status(request):
+    window = request.GET.get("window", DEFAULT_WINDOW)
+    if window not in LOGIN_WINDOWS:
+        return JsonResponse(
+            {"error": f"window must be one of: {', '.join(LOGIN_WINDOWS)}"},
+            status=400,
+        )
+
     db_ok = True
     db_error = None
+    successful_logins = 0
     successful_logins_last_24h = 0
     last_successful_login = None
     now = timezone.now()
-    since = now - timedelta(hours=24)
 
     try:
-        successful_logins_last_24h = UserActivityLog.objects.filter(
-            activity_type="login",
-            timestamp__gte=since,
-        ).count()
-        last_successful_login = (
-            UserActivityLog.objects.filter(activity_type="login")
-            .order_by("-timestamp")
-            .values_list("timestamp", flat=True)
-            .first()
-        )
+        summary = login_summary(window)
+        successful_logins = summary["count"]
+        successful_logins_last_24h = summary["count_default"]
+        last_successful_login = summary["latest"]
     except OperationalError as exc:
         db_ok = False
         db_error = str(exc)
@@ -91,6 +95,8 @@ def auth_health_status(request):
         "auth": {
             "status": "ok" if db_ok else "error",
             "successful_logins_last_24h": successful_logins_last_24h,
+            "window": window,
+            "successful_logins": successful_logins,
             "last_successful_login_utc": (
                 last_successful_login.isoformat() if last_successful_login else None
             ),
@@ -102,14 +108,38 @@ def auth_health_status(request):
     return JsonResponse(payload, status=200 if db_ok else 503)
 
 
+def metrics_status(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        provided = request.META.get("HTTP_AUTHORIZATION", "").removeprefix("Bearer ")
+        if not constant_time_compare(provided, token):
+            return JsonResponse({"error": "Invalid metrics token"}, status=401)
+    elif not settings.METRICS_PUBLIC:
+        return JsonResponse(
+            {"error": "Metrics are disabled; set METRICS_TOKEN"}, status=403)
+
+    return HttpResponse(
+        metrics.render_prometheus()
+        + metrics.render_activity_log(get_activity_log_writer().stats()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 urlpatterns = [
     path("", root_status, name="root_status"),
     path("api/", api_status, name="api_status"),
     path("health/", health_status, name="health_status"),
     path("health/auth/", auth_health_status, name="auth_health_status"),
-    path("admin/", admin.site.urls),
+    path("metrics/", metrics_status, name="metrics"),
     path("api/auth/", include("accounts.urls")),
+    path("api/async/auth/", include("accounts.async_urls")),
 ]
 
+# Not installed in the API-only profile (settings_api).
+if apps.is_installed("django.contrib.admin"):
+    from django.contrib import admin
+
+    urlpatterns.append(path("admin/", admin.site.urls))
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
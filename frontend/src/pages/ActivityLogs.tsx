@@ -7,6 +7,7 @@ import {
   Table,
   Badge,
   Alert,
+  Button,
 } from "react-bootstrap";
 import { authAPI } from "../services/api";
 import { ActivityLog } from "../types";
@@ -14,14 +15,17 @@ import { FaHistory, FaClock, FaMapMarkerAlt } from "react-icons/fa";
 
 const ActivityLogs: React.FC = () => {
   const [logs, setLogs] = useState<ActivityLog[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [error, setError] = useState("");
 
   useEffect(() => {
     const fetchLogs = async () => {
       try {
-        const logsData = await authAPI.getActivityLogs();
-        setLogs(logsData);
+        const page = await authAPI.getActivityLogPage();
+        setLogs(page.results);
+        setNextCursor(page.next_cursor);
       } catch (error: any) {
         setError("Failed to load activity logs");
       } finally {
@@ -32,6 +36,22 @@ const ActivityLogs: React.FC = () => {
     fetchLogs();
   }, []);
 
+  const loadMore = async () => {
+    if (!nextCursor) {
+      return;
+    }
+    setIsLoadingMore(true);
+    try {
+      const page = await authAPI.getActivityLogPage(nextCursor);
+      setLogs((current) => [...current, ...page.results]);
+      setNextCursor(page.next_cursor);
+    } catch (error: any) {
+      setError("Failed to load more activity logs");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const getActivityBadge = (activityType: string) => {
     const badgeMap: { [key: string]: string } = {
       login: "success",
@@ -119,6 +139,17 @@ const ActivityLogs: React.FC = () => {
                   </tbody>
                 </Table>
               )}
+              {nextCursor && (
+                <div className="text-center p-3">
+                  <Button
+                    variant="outline-primary"
+                    onClick={loadMore}
+                    disabled={isLoadingMore}
+                  >
+                    {isLoadingMore ? "Loading..." : "Load more"}
+                  </Button>
+                </div>
+              )}
             </Card.Body>
           </Card>
         </Col>
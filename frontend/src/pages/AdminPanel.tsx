@@ -97,19 +97,22 @@ const UserDetailsModal: React.FC<{
 
 const AdminPanel: React.FC = () => {
   const [users, setUsers] = useState<User[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [stats, setStats] = useState<UserStats | null>(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [errorMessage, setErrorMessage] = useState("");
   const [selectedUser, setSelectedUser] = useState<User | null>(null);
 
   useEffect(() => {
     const loadAdminData = async () => {
       try {
-        const [allUsers, userStats] = await Promise.all([
-          authAPI.getAllUsers(),
+        const [userPage, userStats] = await Promise.all([
+          authAPI.getUserPage(),
           authAPI.getUserStats(),
         ]);
-        setUsers(allUsers);
+        setUsers(userPage.results);
+        setNextCursor(userPage.next_cursor);
         setStats(userStats);
       } catch {
         setErrorMessage("Failed to load admin data");
@@ -121,6 +124,22 @@ const AdminPanel: React.FC = () => {
     loadAdminData();
   }, []);
 
+  const loadMoreUsers = async () => {
+    if (!nextCursor) {
+      return;
+    }
+    setIsLoadingMore(true);
+    try {
+      const page = await authAPI.getUserPage(nextCursor);
+      setUsers((current) => [...current, ...page.results]);
+      setNextCursor(page.next_cursor);
+    } catch {
+      setErrorMessage("Failed to load more users");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   if (isLoading) {
     return (
       <Container>
@@ -225,6 +244,17 @@ const AdminPanel: React.FC = () => {
                   </tbody>
                 </Table>
               )}
+              {nextCursor && (
+                <div className="text-center p-3">
+                  <Button
+                    variant="outline-primary"
+                    onClick={loadMoreUsers}
+                    disabled={isLoadingMore}
+                  >
+                    {isLoadingMore ? "Loading..." : "Load more"}
+                  </Button>
+                </div>
+              )}
             </Card.Body>
           </Card>
         </Col>
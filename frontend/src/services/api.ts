@@ -5,12 +5,12 @@ import {
   AuthResponse,
   User,
   ActivityLog,
+  CursorPage,
   UserStats,
 } from "../types";
 import { authStorage } from "../utils/authStorage";
 
 type RetryableRequestConfig = AxiosRequestConfig & { _retry?: boolean };
-type PaginatedResponse<T> = { results: T[] };
 
 const defaultApiBaseUrl =
   window.location.hostname === "localhost" ? "http://localhost:8002/api" : "/api";
@@ -33,6 +33,8 @@ const api = axios.create({
   },
 });
 
+const REFRESH_PATH = "/auth/refresh/";
+
 const redirectToLogin = () => {
   authStorage.clearTokens();
   window.location.href = "/login";
@@ -41,16 +43,13 @@ const redirectToLogin = () => {
 const getResponseData = <T>(config: Promise<{ data: T }>): Promise<T> =>
   config.then((res) => res.data);
 
-const getListData = <T>(
-  config: Promise<{ data: T[] | PaginatedResponse<T> }>
-): Promise<T[]> =>
-  config.then((res) => ("results" in res.data ? res.data.results : res.data));
-
 api.interceptors.request.use(
   (config) => {
     const requestUrl = String(config.url ?? "");
     const isPublicAuthEndpoint =
-      requestUrl.includes("/auth/login/") || requestUrl.includes("/auth/register/");
+      requestUrl.includes("/auth/login/") ||
+      requestUrl.includes("/auth/register/") ||
+      requestUrl.includes(REFRESH_PATH);
     const token = authStorage.getAccessToken();
     if (token && !isPublicAuthEndpoint) {
       config.headers = config.headers ?? {};
@@ -61,22 +60,54 @@ api.interceptors.request.use(
   (error) => Promise.reject(error)
 );
 
+// Requests failing with 401 at the same time share one refresh call, since
+// the backend rotates (and blacklists) the refresh token on every use.
+let refreshInFlight: Promise<string> | null = null;
+
+const refreshAccessToken = (refreshToken: string): Promise<string> => {
+  if (!refreshInFlight) {
+    refreshInFlight = api
+      .post<{ access: string; refresh?: string }>(REFRESH_PATH, {
+        refresh: refreshToken,
+      })
+      .then(({ data }) => {
+        authStorage.setTokens({
+          access: data.access,
+          refresh: data.refresh ?? refreshToken,
+        });
+        return data.access;
+      })
+      .finally(() => {
+        refreshInFlight = null;
+      });
+  }
+  return refreshInFlight;
+};
+
 api.interceptors.response.use(
   (response) => response,
   async (error: AxiosError) => {
     const originalRequest = error.config as RetryableRequestConfig | undefined;
+    const requestUrl = String(originalRequest?.url ?? "");
 
     if (
       error.response?.status === 401 &&
       originalRequest &&
-      !originalRequest._retry
+      !originalRequest._retry &&
+      !requestUrl.includes(REFRESH_PATH)
     ) {
       originalRequest._retry = true;
 
       const refreshToken = authStorage.getRefreshToken();
       if (refreshToken) {
-        // Token refresh is not implemented yet; keep behavior unchanged.
-        redirectToLogin();
+        try {
+          const access = await refreshAccessToken(refreshToken);
+          originalRequest.headers = originalRequest.headers ?? {};
+          originalRequest.headers.Authorization = `Bearer ${access}`;
+          return api(originalRequest);
+        } catch {
+          redirectToLogin();
+        }
       }
     }
 
@@ -117,12 +148,15 @@ export const authAPI = {
   }): Promise<void> =>
     getResponseData(api.post("/auth/change-password/", data)),
 
-  getActivityLogs: (): Promise<ActivityLog[]> =>
-    getListData(api.get("/auth/activity-logs/")),
+  getActivityLogPage: (cursor?: string | null): Promise<CursorPage<ActivityLog>> =>
+    getResponseData(
+      api.get("/auth/activity-logs/", { params: cursor ? { cursor } : {} })
+    ),
 
   getUserStats: (): Promise<UserStats> => getResponseData(api.get("/auth/stats/")),
 
-  getAllUsers: (): Promise<User[]> => getListData(api.get("/auth/users/")),
+  getUserPage: (cursor?: string | null): Promise<CursorPage<User>> =>
+    getResponseData(api.get("/auth/users/", { params: cursor ? { cursor } : {} })),
 };
 
 export default api;
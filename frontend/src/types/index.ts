@@ -7,6 +7,7 @@ export interface User {
   full_name: string;
   role: "admin" | "user" | "moderator";
   profile_picture?: string;
+  profile_picture_variants?: Record<string, string>;
   phone_number?: string;
   date_of_birth?: string;
   bio?: string;
@@ -48,9 +49,19 @@ export interface ActivityLog {
   timestamp: string;
 }
 
+export interface CursorPage<T> {
+  next: string | null;
+  next_cursor: string | null;
+  has_more: boolean;
+  page_size: number;
+  results: T[];
+}
+
 export interface UserStats {
   total_users: number;
   active_users: number;
   admin_users: number;
   inactive_users: number;
+  users_by_role?: Record<User["role"], number>;
+  signups_by_day?: Record<string, number>;
 }